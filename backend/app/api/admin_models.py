@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
+
+from ..core.config import settings
+from ..core.security import Principal, require_admin
+from ..ml.gesture_model import (
+    activate_in_background,
+    active_model_version,
+    model_registry,
+    swap_status,
+)
+
+router = APIRouter(prefix="/admin/models", tags=["admin"])
+
+
+@router.get("")
+def list_models(admin: Principal = Depends(require_admin)):
+    """Các version trong registry, version CURRENT và version process này đang phục vụ."""
+    return {
+        "current": model_registry.current_version(),
+        "active": active_model_version(),
+        "swap": dict(swap_status),
+        "versions": [
+            {"version": mv.version, "engines": mv.engines(), "metadata": mv.metadata}
+            for mv in model_registry.list_versions()
+        ],
+    }
+
+
+@router.post("/{version}/activate", status_code=status.HTTP_202_ACCEPTED)
+def activate_model(version: str, admin: Principal = Depends(require_admin)):
+    """
+    Load + warm-up version ở nền rồi đổi sang (request đang chạy dùng nốt model cũ).
+    Thành công → ghi CURRENT, các process khác đổi theo qua watcher.
+    """
+    try:
+        mv = model_registry.get(version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Không có model version {version!r}")
+    if settings.INFER_ENGINE not in mv.engines():
+        raise HTTPException(
+            status_code=422,
+            detail=f"Version {version!r} không có file cho engine {settings.INFER_ENGINE!r}",
+        )
+
+    if settings.INFER_BACKEND == "process":
+        # model nằm trong worker process: chỉ ghi CURRENT, worker tự load + swap
+        model_registry.set_current(version)
+        return {"status": "scheduled", "version": version}
+
+    if not activate_in_background(version):
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={"status": "busy", "swap": dict(swap_status)},
+        )
+    return {"status": "loading", "version": version}
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from fastapi.responses import FileResponse
+from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import Session
 from datetime import datetime
 from pathlib import Path
@@ -8,7 +9,9 @@ import os
 
 from .. import models
 from ..db import get_db
+from ..core.security import Principal, get_current_principal
 from ..schemas.collect import CollectSampleBase64
+from .uploads import read_image_upload
 
 router = APIRouter(prefix="/collect", tags=["collect"])
 
@@ -26,8 +29,33 @@ async def collect_sample_base64(payload: CollectSampleBase64, db: Session = Depe
     except Exception:
         raise HTTPException(status_code=422, detail="image_base64 is invalid")
 
-    user_id = str(payload.user_id)
-    label = str(payload.label)
+    return save_sample(db, payload.user_id, payload.label, image_bytes)
+
+
+@router.post("/sample")
+async def collect_sample(
+    request: Request,
+    user_id: str | None = None,
+    label: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Lưu mẫu ảnh không qua base64:
+    - body `Content-Type: image/jpeg`, user_id & label trên query string, hoặc
+    - `multipart/form-data` với field `file`, `user_id`, `label`.
+    """
+    async with read_image_upload(request) as (image, fields):
+        user_id = fields.get("user_id", user_id)
+        label = fields.get("label", label)
+        if not user_id or not label:
+            raise HTTPException(status_code=422, detail="Thiếu user_id hoặc label")
+        return save_sample(db, user_id, label, image)
+
+
+def save_sample(db: Session, user_id, label, image_bytes) -> dict:
+    """Ghi ảnh (bytes hoặc memoryview) vào data/user_samples và thêm bản ghi GestureSample."""
+    user_id = str(user_id)
+    label = str(label)
 
     user_dir = DATA_DIR / user_id / label
     user_dir.mkdir(parents=True, exist_ok=True)
@@ -42,8 +70,8 @@ async def collect_sample_base64(payload: CollectSampleBase64, db: Session = Depe
     rel_path = file_path.relative_to(DATA_DIR.parent).as_posix()  # vd: user_samples/3/0/xxx.jpg
 
     new_sample = models.GestureSample(
-        user_id=payload.user_id,
-        label=payload.label,
+        user_id=user_id,
+        label=label,
         image_path=rel_path,
         source="manual_collect",
         created_at=datetime.now(),
@@ -74,16 +102,45 @@ async def get_sample_file(user_id: str, label: str, filename: str):
 
 
 @router.get("/my-samples")
-async def my_samples(user_id: str, db: Session = Depends(get_db)):
+async def my_samples(
+    user_id: str,
+    limit: int | None = Query(None, ge=1, le=500),
+    before_created_at: datetime | None = None,
+    before_id: int | None = None,
+    label: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Danh sách mẫu của user (lọc theo `label` nếu có), mới nhất trước.
+    Không gửi `limit` → trả toàn bộ như trước. Phân trang keyset: gửi `limit`, trang sau thêm
+    `before_created_at` + `before_id` = created_at / id của mẫu cuối trang trước.
+    Trả ít hơn `limit` mẫu nghĩa là đã hết.
+    """
+    if (before_created_at is None) != (before_id is None):
+        raise HTTPException(
+            status_code=422,
+            detail="Cursor phải gồm cả before_created_at và before_id",
+        )
+
     # ép kiểu để query chuẩn (cột user_id là INT)
     uid = int(user_id)
-
-    samples = (
-        db.query(models.GestureSample)
-        .filter(models.GestureSample.user_id == uid)
-        .order_by(models.GestureSample.created_at.desc())
-        .all()
-    )
+    S = models.GestureSample
+
+    q = db.query(S).filter(S.user_id == uid)
+    if label is not None:
+        q = q.filter(S.label == label)
+    if before_created_at is not None:
+        # (created_at, id) < (before_created_at, before_id), viết dạng OR để MySQL dùng range trên index
+        q = q.filter(
+            or_(
+                S.created_at < before_created_at,
+                and_(S.created_at == before_created_at, S.id < before_id),
+            )
+        )
+    q = q.order_by(S.created_at.desc(), S.id.desc())
+    if limit is not None:
+        q = q.limit(limit)
+    samples = q.all()
 
     out = []
     for s in samples:
@@ -103,6 +160,22 @@ async def my_samples(user_id: str, db: Session = Depends(get_db)):
     return out
 
 
+@router.get("/my-sample-counts")
+def my_sample_counts(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Số mẫu theo label của user hiện tại: [{label, count}] (GROUP BY trên index (user_id, label, ...))."""
+    rows = (
+        db.query(models.GestureSample.label, func.count(models.GestureSample.id))
+        .filter(models.GestureSample.user_id == current_user.id)
+        .group_by(models.GestureSample.label)
+        .order_by(models.GestureSample.label)
+        .all()
+    )
+    return [{"label": str(label), "count": count} for label, count in rows]
+
+
 @router.delete("/sample-file/{user_id}/{label}/{filename}")
 async def delete_sample_file(user_id: str, label: str, filename: str, db: Session = Depends(get_db)):
     file_path = DATA_DIR / user_id / label / filename
@@ -0,0 +1,68 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import settings
+from ..core.profiler import SamplingProfiler, profile_lock
+from ..core.security import Principal, require_admin
+from ..core.tracing import trace_buffer
+from ..ml.gesture_model import inference_executor
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.get("/traces")
+def list_traces(
+    limit: int = 50,
+    path: str | None = None,
+    admin: Principal = Depends(require_admin),
+):
+    """Các trace đã giữ lại (sample + request chậm), chậm nhất trước."""
+    return {
+        "sample_rate": settings.TRACE_SAMPLE_RATE,
+        "slow_ms": settings.TRACE_SLOW_MS,
+        "recorded": trace_buffer.recorded,
+        "kept": trace_buffer.kept,
+        "traces": trace_buffer.slowest(limit=max(1, min(limit, 500)), path=path),
+    }
+
+
+@router.post("/profile")
+async def profile(
+    seconds: float = 10.0,
+    requests: int | None = None,
+    interval_ms: float = 5.0,
+    output: Literal["collapsed", "speedscope"] = "collapsed",
+    admin: Principal = Depends(require_admin),
+):
+    """
+    Bật sampling profiler trên worker này trong `seconds` giây (tối đa 120)
+    hoặc tới khi xử lý xong `requests` frame, rồi trả file profile:
+    - `collapsed`: text `thread;frame;...;frame count` (flamegraph.pl / speedscope)
+    - `speedscope`: JSON mở trực tiếp trên https://www.speedscope.app
+    Chỉ 1 phiên mỗi lúc; với INFER_BACKEND="process" chỉ thấy phần chạy trong process API.
+    """
+    if not profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Đang có phiên profile khác")
+    try:
+        profiler = SamplingProfiler(interval_ms=interval_ms)
+        should_stop = None
+        if requests:
+            start = inference_executor.completed
+            should_stop = lambda: inference_executor.completed - start >= requests
+        await run_in_threadpool(profiler.run, min(max(seconds, 0.1), 120.0), should_stop)
+    finally:
+        profile_lock.release()
+
+    headers = {
+        "X-Profile-Samples": str(profiler.samples),
+        "X-Profile-Idle-Skipped": str(profiler.idle_skipped),
+        "X-Profile-Seconds": f"{profiler.duration:.2f}",
+    }
+    if output == "speedscope":
+        headers["Content-Disposition"] = 'attachment; filename="gesture.speedscope.json"'
+        return JSONResponse(profiler.speedscope(), headers=headers)
+    headers["Content-Disposition"] = 'attachment; filename="gesture.collapsed.txt"'
+    return PlainTextResponse(profiler.collapsed(), headers=headers)
@@ -83,7 +83,8 @@ from ..schemas.gesture import (
     GestureMappingEffective,
     UpdateUserGestureMapping,
 )
-from ..core.security import get_current_user  # hàm bạn đã có trong security.py
+from ..core.security import Principal, get_current_principal  # hàm bạn đã có trong security.py
+from ..core.gesture_texts import gesture_texts
 
 router = APIRouter(prefix="/gestures", tags=["gestures"])
 
@@ -91,7 +92,7 @@ router = APIRouter(prefix="/gestures", tags=["gestures"])
 @router.get("/my-mapping", response_model=List[GestureMappingEffective])
 def get_my_gesture_mapping(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Trả về danh sách cử chỉ cho user hiện tại:
@@ -137,7 +138,7 @@ def upsert_my_gesture_mapping(
     model_label: str,
     data: UpdateUserGestureMapping,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Tạo hoặc cập nhật custom_text cho 1 label cụ thể
@@ -175,6 +176,7 @@ def upsert_my_gesture_mapping(
 
     db.commit()
     db.refresh(m)
+    gesture_texts.invalidate_user(current_user.id)
 
     return GestureMappingEffective(
         model_label=model_label,
@@ -188,7 +190,7 @@ def upsert_my_gesture_mapping(
 def delete_my_gesture_mapping(
     model_label: str,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Xoá override, quay lại dùng default_text
@@ -208,4 +210,5 @@ def delete_my_gesture_mapping(
 
     db.delete(m)
     db.commit()
+    gesture_texts.invalidate_user(current_user.id)
 
@@ -1,15 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 import base64
 
 from ..db import get_db
-from .. import models
-from ..core.security import get_current_user
-from ..ml.gesture_model import predict_image_bytes
+from ..core.config import settings
+from ..core.gesture_texts import gesture_texts
+from ..core.prediction_log import prediction_log, prediction_log_sampler
+from ..core.metrics import STAGE_SECONDS, Counter
+from ..core.security import Principal, get_current_principal
+from ..core.tracing import span
+from ..ml.admission import DeadlineExceeded, Overloaded
+from ..ml.process_pool import WorkerUnavailable
+from ..ml.gesture_model import (
+    GesturePrediction,
+    cascade_stats,
+    inference_executor,
+    landmark_gate,
+    predict_image_bytes,
+)
 from ..schemas.gesture import GesturePredictRequest, GesturePredictResponse
+from .uploads import read_image_upload
 
 router = APIRouter(prefix="/gesture", tags=["gesture"])
 
+NO_HAND_TEXT = "Vui lòng giơ tay vào camera"
+
+_BASE64_SECONDS = STAGE_SECONDS.labels("base64_decode")
+_DB_TEXT_SECONDS = STAGE_SECONDS.labels("db_text")
+SHED_TOTAL = Counter("gesture_shed_total", "Số frame bị từ chối do quá tải", ["reason"])
+
 
 def get_effective_text(db: Session, user_id: int | None, model_label: str) -> str:
     """
@@ -17,39 +37,24 @@ def get_effective_text(db: Session, user_id: int | None, model_label: str) -> st
     - Nếu user có override trong user_gesture_mapping --> dùng custom_text
     - Nếu không --> dùng default_text trong gesture_dictionary
     - Nếu cũng không có --> fallback trả lại model_label
+
+    Đọc qua gesture_texts (cache trong process) → frame nhận diện thường không tốn query nào.
     """
-    # 1. default trong gesture_dictionary
-    d = (
-        db.query(models.GestureDictionary)
-        .filter(models.GestureDictionary.model_label == model_label)
-        .first()
-    )
-    default_text = d.default_text if d else None
-
-    # 2. override của user
-    if user_id is not None:
-        m = (
-            db.query(models.UserGestureMapping)
-            .filter(
-                models.UserGestureMapping.user_id == user_id,
-                models.UserGestureMapping.model_label == model_label,
-            )
-            .first()
-        )
-        if m and m.custom_text:
-            return m.custom_text
+    return gesture_texts.get_text(db, user_id, model_label)
+
 
-    # 3. fallback
-    if default_text:
-        return default_text
-    return model_label
+def _decode_and_predict(encoded: str, session_id: str | None):
+    # decode base64 trong thread executor, không chiếm event loop
+    with _BASE64_SECONDS.time(), span("base64_decode"):
+        image_bytes = base64.b64decode(encoded)
+    return predict_image_bytes(image_bytes, session_id=session_id)
 
 
 @router.post("/predict-base64", response_model=GesturePredictResponse)
-def predict_base64(
+async def predict_base64(
     data: GesturePredictRequest,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     # data.image: "data:image/jpeg;base64,xxxx"
     try:
@@ -60,28 +65,153 @@ def predict_base64(
             detail="Chuỗi base64 không hợp lệ",
         )
 
-    image_bytes = base64.b64decode(encoded)
+    pred = await run_prediction(_decode_and_predict, encoded, _session_id(current_user, data.stream_id))
+    return await run_in_threadpool(resolve_prediction, db, current_user, pred)
+
+
+@router.post("/predict", response_model=GesturePredictResponse)
+async def predict_upload(
+    request: Request,
+    stream_id: str | None = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Nhận ảnh không qua base64:
+    - body `Content-Type: image/jpeg` (bytes JPEG thô), hoặc
+    - `multipart/form-data` với field `file` (và `stream_id` tuỳ chọn).
+    Kích thước bị giới hạn bởi MAX_UPLOAD_BYTES trước khi đọc body.
+    """
+    async with read_image_upload(request) as (image, fields):
+        stream_id = fields.get("stream_id", stream_id)
+        pred = await run_prediction(predict_image_bytes, image, _session_id(current_user, stream_id))
+    return await run_in_threadpool(resolve_prediction, db, current_user, pred)
 
-    label, prob, has_hand = predict_image_bytes(image_bytes)
 
-    if not has_hand:
+def _session_id(user: Principal, stream_id: str | None) -> str | None:
+    # stream_id → tracking theo session riêng của (user, stream)
+    return f"{user.id}:{stream_id}" if stream_id else None
+
+
+async def run_prediction(fn, image, session_id: str | None) -> GesturePrediction:
+    """
+    Chạy nhận diện qua inference_executor (số frame đang chạy / chờ có giới hạn).
+    - Hàng đợi đầy / ước tính không kịp deadline → 429 ngay, kèm Retry-After.
+    - Chờ quá deadline trước khi tới lượt → 503, kèm Retry-After.
+    - Worker process chết / không trả kết quả kịp (INFER_BACKEND="process") → 503.
+    """
+    try:
+        return await inference_executor.run(fn, image, session_id)
+    except DeadlineExceeded as exc:
+        SHED_TOTAL.labels(exc.reason).inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server quá tải, frame đã quá hạn xử lý",
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    except Overloaded as exc:
+        SHED_TOTAL.labels(exc.reason).inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Server quá tải, vui lòng gửi lại sau",
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    except WorkerUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Worker suy luận đang khởi động lại, vui lòng gửi lại sau",
+            headers={"Retry-After": "1"},
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Không decode được ảnh",
+        )
+
+
+def log_prediction(user_id: int | None, pred: GesturePrediction, text: str | None, stream: str | None = None):
+    """
+    Đẩy kết quả vào hàng đợi prediction_logs (ghi nền theo batch, không chặn request).
+    `stream`: định danh luồng frame (WebSocket session); mặc định theo user.
+    Chỉ ghi khi nhãn của stream đổi / định kỳ (prediction_log_sampler), bỏ frame không có tay.
+    """
+    if not settings.PREDICTION_LOG_ENABLED:
+        return
+    label = pred.label if pred.has_hand else "no_hand"
+    # no_hand vẫn qua sampler (dù không ghi) → tay xuất hiện lại với cùng nhãn được ghi dòng mới
+    if not prediction_log_sampler.should_log(stream if stream is not None else user_id, label):
+        return
+    if not pred.has_hand and not settings.PREDICTION_LOG_NO_HAND:
+        return
+    prediction_log.log(
+        user_id=user_id,
+        gesture_label=label,
+        predicted_text=text,
+        confidence=pred.confidence if pred.has_hand else 0.0,
+        has_hand=pred.has_hand,
+        model_version=pred.model_version,
+    )
+
+
+def resolve_prediction(
+    db: Session,
+    current_user: Principal,
+    pred: GesturePrediction,
+) -> GesturePredictResponse:
+    """Lấy text hiệu lực của user cho kết quả nhận diện."""
+    user_id = current_user.id if current_user else None
+    if not pred.has_hand:
+        log_prediction(user_id, pred, None)
         return GesturePredictResponse(
             gesture="no_hand",
             confidence=0.0,
             has_hand=False,
-            text="Vui lòng giơ tay vào camera",
+            text=NO_HAND_TEXT,
         )
 
-    effective_text = get_effective_text(
-        db=db,
-        user_id=current_user.id if current_user else None,
-        model_label=label,
-    )
+    with _DB_TEXT_SECONDS.time():
+        effective_text = get_effective_text(
+            db=db,
+            user_id=user_id,
+            model_label=pred.label,
+        )
+    log_prediction(user_id, pred, effective_text)
 
     return GesturePredictResponse(
-        gesture=label,
-        confidence=prob,
+        gesture=pred.label,
+        confidence=pred.confidence,
         has_hand=True,
         text=effective_text,
+        reused=pred.reused,
+        model_version=pred.model_version,
     )
 
+
+@router.get("/landmark-gate/stats")
+def landmark_gate_stats(current_user: Principal = Depends(get_current_principal)):
+    """Tỉ lệ frame dùng lại kết quả (bỏ qua CNN) và thời gian ước tính tiết kiệm được."""
+    return landmark_gate.snapshot()
+
+
+@router.get("/cascade/stats")
+def cascade_stats_view(current_user: Principal = Depends(get_current_principal)):
+    """Tỉ lệ frame được MLP landmark xử lý luôn (không cần ResNet18)."""
+    return cascade_stats.snapshot()
+
+
+@router.get("/admission/stats")
+def admission_stats(current_user: Principal = Depends(get_current_principal)):
+    """Trạng thái executor suy luận: số frame đang chạy / chờ, số frame bị từ chối / quá hạn."""
+    return inference_executor.snapshot()
+
+
+@router.get("/text-cache/stats")
+def text_cache_stats(current_user: Principal = Depends(get_current_principal)):
+    """Tỉ lệ tra text cử chỉ trúng cache (không phải query DB)."""
+    return gesture_texts.snapshot()
+
+
+@router.get("/prediction-log/stats")
+def prediction_log_stats(current_user: Principal = Depends(get_current_principal)):
+    """Trạng thái hàng đợi ghi prediction_logs: đang chờ, đã ghi, bị bỏ, lỗi, bỏ qua do lấy mẫu."""
+    return {**prediction_log.snapshot(), "sampler": prediction_log_sampler.snapshot()}
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import settings
+from ..core.gesture_texts import gesture_texts
+from ..core.security import get_principal_from_token
+from ..db import SessionLocal
+from ..ml.admission import Overloaded
+from ..ml.process_pool import WorkerUnavailable
+from ..ml.gesture_model import end_tracking_session, inference_executor, predict_image_bytes
+from .gesture_predict import NO_HAND_TEXT, SHED_TOTAL, log_prediction
+
+router = APIRouter(prefix="/gesture", tags=["gesture"])
+logger = logging.getLogger(__name__)
+
+
+class LatestFrame:
+    """
+    Slot giữ đúng 1 frame mới nhất của kết nối.
+    Client gửi nhanh hơn tốc độ suy luận → frame cũ chưa xử lý bị ghi đè (drop).
+    """
+
+    def __init__(self):
+        self.data: bytes | None = None
+        self.seq = 0
+        self.dropped = 0
+        self._event = asyncio.Event()
+
+    def put(self, data: bytes):
+        if self.data is not None:
+            self.dropped += 1
+        self.data = data
+        self.seq += 1
+        self._event.set()
+
+    async def take(self) -> tuple[int, bytes]:
+        while self.data is None:
+            self._event.clear()
+            await self._event.wait()
+        data, self.data = self.data, None
+        return self.seq, data
+
+
+def _authenticate(token: str | None) -> int | None:
+    """Xác thực 1 lần cho cả kết nối, trả user_id."""
+    db = SessionLocal()
+    try:
+        user = get_principal_from_token(db, token)
+        return user.id if user is not None else None
+    finally:
+        db.close()
+
+
+def _resolve_text(user_id: int, label: str) -> str:
+    """
+    Text hiệu lực cho từng kết quả qua gesture_texts (cache LRU + TTL): sửa mapping
+    (invalidate_user) có hiệu lực ngay cả với kết nối đang mở. Cache hit không mở kết nối DB.
+    """
+    db = SessionLocal()
+    try:
+        return gesture_texts.get_text(db, user_id, label)
+    finally:
+        db.close()
+
+
+async def _process_frames(websocket: WebSocket, slot: LatestFrame, session_id: str, user_id: int):
+    while True:
+        seq, data = await slot.take()
+        t0 = time.perf_counter()
+        try:
+            pred = await inference_executor.run(predict_image_bytes, data, session_id)
+        except Overloaded as exc:
+            SHED_TOTAL.labels(exc.reason).inc()
+            # server quá tải: bỏ frame này, client gửi frame mới nhất sau
+            await websocket.send_json({"seq": seq, "error": "overloaded", "retry_after": exc.retry_after})
+            continue
+        except WorkerUnavailable:
+            # worker process chết và đang được spawn lại: bỏ frame, client gửi frame sau
+            await websocket.send_json({"seq": seq, "error": "worker_unavailable", "retry_after": 1})
+            continue
+        except ValueError:
+            await websocket.send_json({"seq": seq, "error": "Không decode được ảnh"})
+            continue
+
+        if pred.has_hand:
+            payload = {
+                "gesture": pred.label,
+                "confidence": pred.confidence,
+                "has_hand": True,
+                "text": await run_in_threadpool(_resolve_text, user_id, pred.label),
+            }
+        else:
+            payload = {"gesture": "no_hand", "confidence": 0.0, "has_hand": False, "text": NO_HAND_TEXT}
+        log_prediction(user_id, pred, payload["text"] if pred.has_hand else None, stream=session_id)
+
+        payload.update(
+            reused=pred.reused,
+            model_version=pred.model_version,
+            seq=seq,
+            dropped=slot.dropped,
+            latency_ms=round((time.perf_counter() - t0) * 1000.0, 1),
+        )
+        await websocket.send_json(payload)
+
+
+async def _run_processor(websocket: WebSocket, slot: LatestFrame, session_id: str, user_id: int):
+    """Chạy _process_frames; lỗi ngoài dự kiến → log và đóng kết nối 1011 thay vì im lặng ngừng trả kết quả."""
+    try:
+        await _process_frames(websocket, slot, session_id, user_id)
+    except WebSocketDisconnect:
+        pass  # client đã đóng khi đang gửi kết quả
+    except Exception:
+        logger.exception("Lỗi xử lý frame WebSocket (session %s)", session_id)
+        try:
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR, reason="Lỗi server khi nhận diện")
+        except Exception:
+            pass  # kết nối đã đóng
+
+
+@router.websocket("/stream")
+async def gesture_stream(websocket: WebSocket, token: str | None = None):
+    """
+    Nhận diện realtime qua WebSocket.
+
+    - Xác thực 1 lần: query `?token=<JWT>` hoặc message text đầu tiên {"token": "..."}.
+    - Sau đó client gửi từng frame JPEG dạng binary (không base64).
+    - Server trả JSON {seq, gesture, confidence, has_hand, text, reused, model_version, dropped, latency_ms}
+      cho frame mới nhất; frame đến khi đang bận xử lý sẽ bị bỏ qua.
+    """
+    await websocket.accept()
+
+    if token is None:
+        # trình duyệt không gửi được header Authorization cho WebSocket
+        try:
+            first = await websocket.receive()
+        except WebSocketDisconnect:
+            return
+        if first["type"] == "websocket.disconnect":
+            return
+        try:
+            payload = json.loads(first.get("text") or "")
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            # message xác thực phải là text JSON {"token": "..."} (không phải frame binary)
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Message đầu tiên phải là {\"token\": ...}")
+            return
+        token = payload.get("token")
+
+    user_id = await run_in_threadpool(_authenticate, token)
+    if user_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Không thể xác thực người dùng")
+        return
+
+    # mỗi kết nối 1 session tracking riêng
+    session_id = f"{user_id}:ws:{uuid.uuid4().hex}"
+    slot = LatestFrame()
+    processor = asyncio.create_task(_run_processor(websocket, slot, session_id, user_id))
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            data = message.get("bytes")
+            if data is None:
+                continue  # bỏ qua message text (vd: ping)
+            if len(data) > settings.STREAM_MAX_FRAME_BYTES:
+                await websocket.close(code=status.WS_1009_MESSAGE_TOO_BIG)
+                break
+            slot.put(data)
+            if processor.done():
+                break  # lỗi khi gửi kết quả (client đã đóng)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        processor.cancel()
+        await asyncio.gather(processor, return_exceptions=True)
+        # remove() chờ frame đang xử lý (nếu có) nhả session → không chặn event loop;
+        # INFER_BACKEND="process": session nằm trong worker → gửi lệnh đóng cho worker đó
+        await run_in_threadpool(end_tracking_session, session_id)
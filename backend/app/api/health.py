@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..core.config import settings
+from ..ml.gesture_model import is_ready, warmup_error
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live")
+def live():
+    """Process còn sống (không kiểm tra model)."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+def ready():
+    """
+    Chỉ trả 200 khi worker đã warm-up xong, để load balancer chỉ gửi traffic
+    tới worker sẵn sàng. Tắt warm-up lúc startup → luôn ready (load lazy).
+    """
+    if is_ready() or not settings.INFER_WARMUP_ON_STARTUP:
+        return {"status": "ready"}
+
+    error = warmup_error()
+    if error:
+        return JSONResponse(status_code=503, content={"status": "error", "detail": error})
+    return JSONResponse(status_code=503, content={"status": "warming_up"})
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..core.metrics import CONTENT_TYPE, REGISTRY
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Metric theo text format của Prometheus (mỗi process / worker có bộ đếm riêng)."""
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
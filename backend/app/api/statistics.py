@@ -0,0 +1,95 @@
+from datetime import date, datetime, timedelta
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from ..db import get_db
+from .. import models
+from ..core.gesture_texts import gesture_texts
+from ..core.prediction_stats import summarize
+from ..core.security import Principal, active_users, get_current_principal
+from ..schemas.statistics import PatientStatistics, StatisticsSummary
+
+router = APIRouter(prefix="/statistics", tags=["statistics"])
+
+
+def _period(days: int) -> tuple[date, date]:
+    # log ghi created_at theo UTC → ngày của bảng tổng hợp cũng là ngày UTC
+    until = datetime.utcnow().date()
+    return until - timedelta(days=days - 1), until
+
+
+def _summary(db: Session, user_id: int, days: int) -> dict:
+    since, until = _period(days)
+    return summarize(
+        db, user_id, since, until,
+        text_for=lambda label: gesture_texts.get_text(db, user_id, label),
+    )
+
+
+def _is_caregiver_of(db: Session, caregiver_id: int, patient_id: int) -> bool:
+    return (
+        db.query(models.CaregiverRelation.id)
+        .filter(
+            models.CaregiverRelation.caregiver_id == caregiver_id,
+            models.CaregiverRelation.patient_id == patient_id,
+        )
+        .first()
+        is not None
+    )
+
+
+@router.get("/me", response_model=StatisticsSummary)
+def my_statistics(
+    days: int = Query(7, ge=1, le=366),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Thống kê dự đoán của chính user trong `days` ngày gần nhất (tính cả hôm nay)."""
+    return _summary(db, current_user.id, days)
+
+
+@router.get("/users/{user_id}", response_model=StatisticsSummary)
+def user_statistics(
+    user_id: int,
+    days: int = Query(7, ge=1, le=366),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Thống kê của 1 user: chính user đó, admin, hoặc người chăm sóc của user."""
+    if current_user.id != user_id and not _is_caregiver_of(db, current_user.id, user_id):
+        # role trong Principal có thể lấy từ claim / cache → quyền admin đọc lại DB như require_admin
+        fresh = active_users.get(db, current_user.id, fresh=True)
+        if fresh is not None and fresh.role == "admin":
+            return _summary(db, user_id, days)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Không có quyền xem thống kê của người dùng này",
+        )
+    return _summary(db, user_id, days)
+
+
+@router.get("/caregiver/patients", response_model=List[PatientStatistics])
+def caregiver_patients_statistics(
+    days: int = Query(7, ge=1, le=366),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Thống kê từng bệnh nhân mà user hiện tại đang chăm sóc."""
+    patients = (
+        db.query(models.User.id, models.User.name, models.CaregiverRelation.relation_type)
+        .join(models.CaregiverRelation, models.CaregiverRelation.patient_id == models.User.id)
+        .filter(models.CaregiverRelation.caregiver_id == current_user.id)
+        .order_by(models.User.id)
+        .all()
+    )
+    return [
+        {
+            "user_id": p.id,
+            "name": p.name,
+            "relation_type": p.relation_type,
+            "summary": _summary(db, p.id, days),
+        }
+        for p in patients
+    ]
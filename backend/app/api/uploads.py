@@ -0,0 +1,141 @@
+import queue
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, Request, status
+from starlette.concurrency import run_in_threadpool
+# request.form() trả UploadFile của starlette (fastapi.UploadFile là lớp con → isinstance luôn sai)
+from starlette.datastructures import UploadFile
+
+from ..core.config import settings
+
+
+class UploadBufferPool:
+    """
+    Pool bytearray dung lượng cố định để nhận ảnh upload.
+    Body được ghi thẳng vào buffer có sẵn thay vì nối nhiều chunk bytes / copy lại.
+    """
+
+    def __init__(self, capacity: int, max_idle: int = 8):
+        self.capacity = capacity
+        self._idle: "queue.SimpleQueue[bytearray]" = queue.SimpleQueue()
+        self._max_idle = max_idle
+
+    def acquire(self) -> bytearray:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return bytearray(self.capacity)
+
+    def release(self, buf: bytearray):
+        if self._idle.qsize() < self._max_idle:
+            self._idle.put(buf)
+
+
+upload_buffers = UploadBufferPool(settings.MAX_UPLOAD_BYTES)
+
+# phần multipart ngoài file ảnh: boundary, header từng part, field text (user_id, label...)
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+RAW_IMAGE_TYPES = ("image/jpeg", "image/png", "image/webp", "application/octet-stream")
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Ảnh vượt quá {settings.MAX_UPLOAD_BYTES} bytes",
+    )
+
+
+def _check_content_length(request: Request, max_bytes: int):
+    # chặn trước khi đọc body vào bộ nhớ
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > max_bytes:
+        raise _too_large()
+
+
+def _limit_body(request: Request, max_bytes: int) -> Request:
+    """
+    Request mới đọc cùng body nhưng báo 413 ngay khi nhận quá `max_bytes`
+    (kể cả body chunked không có Content-Length) thay vì spool hết rồi mới kiểm tra.
+    """
+    receive = request.receive
+    received = 0
+
+    async def limited_receive():
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > max_bytes:
+                raise _too_large()
+        return message
+
+    return Request(request.scope, limited_receive)
+
+
+async def _read_stream_into(request: Request, buf: bytearray) -> int:
+    n = 0
+    async for chunk in request.stream():
+        end = n + len(chunk)
+        if end > len(buf):
+            raise _too_large()
+        buf[n:end] = chunk
+        n = end
+    return n
+
+
+def _read_file_into(file, buf: bytearray) -> int:
+    view = memoryview(buf)
+    n = 0
+    while True:
+        if n >= len(buf):
+            if file.read(1):
+                raise _too_large()
+            return n
+        got = file.readinto(view[n:])
+        if not got:
+            return n
+        n += got
+
+
+@asynccontextmanager
+async def read_image_upload(request: Request):
+    """
+    Đọc ảnh từ body `image/jpeg` (raw) hoặc `multipart/form-data` (field `file`).
+
+        async with read_image_upload(request) as (image, fields):
+            ...  # image: memoryview trỏ vào buffer dùng lại, fields: các field text của form
+
+    `image` chỉ hợp lệ trong khối `async with` (buffer được trả về pool sau đó).
+    """
+    max_bytes = settings.MAX_UPLOAD_BYTES
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    _check_content_length(
+        request, max_bytes + MULTIPART_OVERHEAD_BYTES if content_type == "multipart/form-data" else max_bytes
+    )
+    buf = upload_buffers.acquire()
+    try:
+        fields: dict[str, str] = {}
+        if content_type == "multipart/form-data":
+            limited = _limit_body(request, max_bytes + MULTIPART_OVERHEAD_BYTES)
+            form = await limited.form(max_files=1)
+            upload = form.get("file")
+            if not isinstance(upload, UploadFile):
+                raise HTTPException(status_code=422, detail="Thiếu field 'file'")
+            fields = {k: v for k, v in form.items() if isinstance(v, str)}
+            n = await run_in_threadpool(_read_file_into, upload.file, buf)
+            await upload.close()
+        elif content_type in RAW_IMAGE_TYPES:
+            n = await _read_stream_into(request, buf)
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Chỉ nhận image/jpeg hoặc multipart/form-data",
+            )
+
+        if n == 0:
+            raise HTTPException(status_code=422, detail="Ảnh rỗng")
+
+        yield memoryview(buf)[:n], fields
+    finally:
+        upload_buffers.release(buf)
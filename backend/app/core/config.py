@@ -1,3 +1,8 @@
+import json
+import os
+import platform
+from pathlib import Path
+
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI
 # from pydantic import BaseSettings
@@ -24,6 +29,181 @@ class Settings:
     MYSQL_PORT: int = 3306
     MYSQL_DB: str = "hand_gesture_KLTN_db"
 
+    # Engine suy luận: "eager" | "torchscript" | "onnx" (export bằng scripts/export_model.py)
+    # hoặc "int8" (quantize bằng scripts/quantize_model.py)
+    INFER_ENGINE: str = "eager"
+
+    # Quantization INT8: engine của PyTorch ("fbgemm" cho x86, "qnnpack" cho ARM)
+    QUANT_BACKEND: str = "fbgemm"
+    # Không publish model INT8 nếu accuracy giảm quá mức này (0.01 = 1 điểm %)
+    QUANT_MAX_ACCURACY_DROP: float = 0.01
+
+    # Load model + detector + chạy frame giả lúc startup (nền); tắt → load ở request đầu tiên
+    INFER_WARMUP_ON_STARTUP: bool = True
+
+    # Micro-batching cho ResNet18: gộp frame từ nhiều request vào 1 lần forward
+    INFER_BATCHING: bool = True
+    INFER_MAX_BATCH_SIZE: int = 8
+    INFER_MAX_WAIT_MS: float = 5.0
+
+    # Số thread xử lý endpoint đồng bộ (threadpool của FastAPI/anyio)
+    WORKER_THREADS: int = 40
+    # Số detector MediaPipe trong pool; 0 = bằng số thread của executor suy luận
+    HANDS_POOL_SIZE: int = 0
+
+    # Admission control: executor suy luận có giới hạn (0 thread = tự tính theo số core / backend).
+    # Hàng đợi đầy hoặc không kịp deadline → trả 429/503 + Retry-After thay vì xếp hàng vô hạn
+    INFER_EXECUTOR_THREADS: int = 0
+    INFER_QUEUE_DEPTH: int = 16
+    INFER_DEADLINE_MS: float = 1000.0
+    # Số thread intra-op của PyTorch; 0 = chia số core theo số forward chạy song song
+    TORCH_THREADS: int = 0
+    TORCH_INTEROP_THREADS: int = 1
+
+    # Autotune (scripts/autotune.py): profile thread / batch / độ phân giải / số worker
+    # tốt nhất cho máy hiện tại, được load lúc import config nếu khớp máy
+    AUTOTUNE_PROFILE_PATH: str = str(Path(__file__).resolve().parents[2] / "autotune_profile.json")
+    # Chưa có profile hợp lệ → chạy autotune nhanh trong warm-up rồi ghi profile
+    AUTOTUNE_ON_STARTUP: bool = False
+    # Chỉ chọn cấu hình có p99 latency 1 frame <= ngưỡng này
+    AUTOTUNE_LATENCY_BUDGET_MS: float = 250.0
+
+    # Tracking theo session (stream): số session tối đa và thời gian sống khi không có frame
+    TRACKING_MAX_SESSIONS: int = 256
+    TRACKING_SESSION_TTL_SECONDS: float = 30.0
+
+    # Xác thực nhẹ (get_current_principal): kết quả "user tồn tại + is_active + role" được cache
+    # theo user_id trong TTL giây (0 = luôn query DB).
+    # - Đổi role / is_active / xoá user qua ORM: invalidate ngay khi commit (trong process đó).
+    # - Sửa trực tiếp DB hoặc ở worker process khác: khoá tài khoản có hiệu lực sau tối đa TTL giây.
+    # - require_admin luôn đọc lại DB → hạ quyền admin có hiệu lực ngay, không chờ TTL.
+    AUTH_USER_CACHE_TTL_SECONDS: float = 30.0
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 10000
+    # False: Principal dựng hoàn toàn từ claim JWT (sub, email, role), không query DB khi xác thực;
+    # khoá tài khoản / đổi role chỉ có hiệu lực khi token hết hạn (require_admin vẫn đọc DB)
+    AUTH_CHECK_ACTIVE_USER: bool = True
+
+    # Ghi prediction_logs kiểu write-behind: hàng đợi RAM có giới hạn, thread nền INSERT theo
+    # batch khi đủ BATCH_SIZE dòng hoặc sau FLUSH_INTERVAL giây.
+    # Hàng đợi đầy: "drop_new" bỏ dòng mới, "drop_oldest" bỏ dòng cũ nhất
+    PREDICTION_LOG_ENABLED: bool = True
+    PREDICTION_LOG_QUEUE_SIZE: int = 10000
+    PREDICTION_LOG_BATCH_SIZE: int = 200
+    PREDICTION_LOG_FLUSH_INTERVAL_SECONDS: float = 1.0
+    PREDICTION_LOG_DROP_POLICY: str = "drop_new"
+    # Không ghi mọi frame: cùng 1 stream chỉ ghi khi nhãn đổi, cùng nhãn thì tối đa
+    # 1 dòng / REPEAT_INTERVAL giây (0 = ghi mọi frame). Frame không có tay mặc định không ghi
+    PREDICTION_LOG_REPEAT_INTERVAL_SECONDS: float = 5.0
+    PREDICTION_LOG_NO_HAND: bool = False
+
+    # Cache text hiệu lực của cử chỉ (gesture_dictionary + custom_text theo user).
+    # Worker sửa mapping thì invalidate ngay; worker khác thấy thay đổi sau tối đa TTL giây
+    GESTURE_TEXT_CACHE_TTL_SECONDS: float = 30.0
+    GESTURE_TEXT_CACHE_MAX_USERS: int = 1024
+
+    # Upload ảnh thô / multipart (/gesture/predict, /collect/sample): giới hạn kích thước body
+    MAX_UPLOAD_BYTES: int = 5 * 1024 * 1024
+
+    # Bỏ qua CNN khi landmark (đã normalize) dịch < ngưỡng so với frame đã phân loại gần nhất
+    # của cùng session; kết quả cũ chỉ được dùng lại trong MAX_AGE giây
+    LANDMARK_GATE_ENABLED: bool = True
+    LANDMARK_GATE_THRESHOLD: float = 0.04
+    LANDMARK_GATE_MAX_AGE_SECONDS: float = 1.0
+
+    # Tracing theo request (GET /debug/traces): giữ ngẫu nhiên SAMPLE_RATE request
+    # + mọi request chậm hơn SLOW_MS, tối đa BUFFER_SIZE trace trong RAM.
+    # EXPORT_PATH khác rỗng → ghi thêm từng trace ra file JSONL
+    TRACING_ENABLED: bool = True
+    TRACE_SAMPLE_RATE: float = 0.01
+    TRACE_SLOW_MS: float = 500.0
+    TRACE_BUFFER_SIZE: int = 200
+    TRACE_EXPORT_PATH: str = ""
+
+    # Chu kỳ (giây) đọc models/registry/CURRENT để tự đổi sang version mới; 0 = tắt
+    MODEL_WATCH_INTERVAL_SECONDS: float = 5.0
+
+    # Cascade: MLP trên landmark chạy trước, chỉ gọi ResNet18 khi độ tự tin < ngưỡng
+    # (cần file models/landmark_mlp.pth từ scripts/train_landmark_mlp.py)
+    LANDMARK_CASCADE_ENABLED: bool = True
+    LANDMARK_CASCADE_THRESHOLD: float = 0.9
+
+    # WebSocket /gesture/stream: kích thước tối đa 1 frame JPEG (bytes)
+    STREAM_MAX_FRAME_BYTES: int = 2 * 1024 * 1024
+
+    # Cạnh dài tối đa của frame đưa vào MediaPipe (0 = độ phân giải gốc).
+    # Crop tay vẫn lấy từ frame gốc. Xem benchmarks/bench_detect_resolution.py
+    DETECT_MAX_SIDE: int = 0
+
+    # Backend suy luận: "thread" (ngay trong process API) hoặc "process" (N worker + shared memory)
+    INFER_BACKEND: str = "thread"
+    INFER_PROCESSES: int = 0  # 0 = số core
+    INFER_SHM_SLOTS: int = 4  # số slot frame trong ring buffer của mỗi worker
+    INFER_MAX_FRAME_PIXELS: int = 1920 * 1080
+    # chờ slot / kết quả của worker tối đa N giây; worker chết được spawn lại
+    INFER_WORKER_TIMEOUT_SECONDS: float = 10.0
+
+    @property
+    def inference_processes(self) -> int:
+        if self.INFER_PROCESSES > 0:
+            return self.INFER_PROCESSES
+        return os.cpu_count() or 1
+
+    @property
+    def inference_threads(self) -> int:
+        if self.INFER_EXECUTOR_THREADS > 0:
+            return self.INFER_EXECUTOR_THREADS
+        if self.INFER_BACKEND == "process":
+            # thread chỉ chờ worker process: đủ để lấp đầy mọi slot shared memory
+            return self.inference_processes * self.INFER_SHM_SLOTS
+        return os.cpu_count() or 1
+
+    @property
+    def torch_threads(self) -> int:
+        if self.TORCH_THREADS > 0:
+            return self.TORCH_THREADS
+        cpus = os.cpu_count() or 1
+        if self.INFER_BATCHING:
+            # forward chạy tuần tự trên thread batcher; nửa số core còn lại cho MediaPipe
+            return max(1, cpus // 2)
+        # mỗi thread executor tự forward → chia đều số core, tránh oversubscription
+        return max(1, cpus // self.inference_threads)
+
+    @property
+    def hands_pool_size(self) -> int:
+        if self.HANDS_POOL_SIZE > 0:
+            return self.HANDS_POOL_SIZE
+        return max(1, self.inference_threads)
+
+    # các setting autotune được phép ghi đè
+    TUNABLE_KEYS = (
+        "TORCH_THREADS",
+        "TORCH_INTEROP_THREADS",
+        "INFER_MAX_BATCH_SIZE",
+        "DETECT_MAX_SIDE",
+        "INFER_EXECUTOR_THREADS",
+    )
+
+    def load_tuning_profile(self, path: str | None = None) -> dict | None:
+        """
+        Áp dụng profile autotune (nếu có và đo trên cùng loại máy).
+        Phải gọi trước khi import app.ml.gesture_model (pool / executor đọc setting lúc import).
+        """
+        path = Path(path or self.AUTOTUNE_PROFILE_PATH)
+        try:
+            profile = json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+        if profile.get("machine") != machine_fingerprint():
+            print(f"⚠️ Bỏ qua profile autotune {path}: đo trên máy khác")
+            return None
+        for key, value in profile.get("settings", {}).items():
+            if key in self.TUNABLE_KEYS:
+                setattr(self, key, value)
+        self.tuning_profile = profile
+        return profile
+
+    tuning_profile: dict | None = None
+
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
         return (
@@ -33,6 +213,17 @@ class Settings:
         )
 
 
+def machine_fingerprint() -> dict:
+    """Thông tin loại máy: profile autotune chỉ áp dụng lại trên máy giống vậy."""
+    return {
+        "cpu_count": os.cpu_count() or 1,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "system": platform.system(),
+    }
+
+
 settings = Settings()
+settings.load_tuning_profile()
 
 
@@ -0,0 +1,144 @@
+# app/core/gesture_texts.py
+
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from .config import settings
+
+
+class GestureTextCache:
+    """
+    Cache text hiệu lực của cử chỉ trong process:
+    - toàn bộ gesture_dictionary (label → default_text), load 1 lần
+    - custom_text theo user trong LRU giới hạn `max_users`
+
+    PUT / DELETE /gestures/my-mapping gọi invalidate_user() ngay sau commit; các
+    worker khác thấy thay đổi sau tối đa `ttl_seconds` (entry hết hạn thì load lại).
+    """
+
+    def __init__(self, ttl_seconds: float, max_users: int):
+        self.ttl = ttl_seconds
+        self.max_users = max(1, max_users)
+        self._lock = threading.Lock()
+        self._dictionary: dict[str, str] | None = None
+        self._dictionary_at = 0.0
+        self._dictionary_gen = 0
+        # user_id → (overrides, thời điểm load)
+        self._users: "OrderedDict[int, tuple[dict[str, str], float]]" = OrderedDict()
+        # generation của user đang được cache hoặc đang load; tăng khi invalidate để kết quả
+        # query bắt đầu trước đó không được ghi đè vào cache. Chỉ giữ key cho user trong
+        # _users / _loading → không phình theo số user từng bị invalidate
+        self._user_gen: dict[int, int] = {}
+        # user_id → số query đang chạy
+        self._loading: dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- đọc ----------
+    def dictionary(self, db: Session) -> dict[str, str]:
+        now = time.monotonic()
+        with self._lock:
+            if self._dictionary is not None and now - self._dictionary_at < self.ttl:
+                return self._dictionary
+            gen = self._dictionary_gen
+
+        texts = {d.model_label: d.default_text for d in db.query(models.GestureDictionary).all()}
+        with self._lock:
+            if gen == self._dictionary_gen:
+                self._dictionary, self._dictionary_at = texts, now
+        return texts
+
+    def user_overrides(self, db: Session, user_id: int) -> dict[str, str]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._users.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            gen = self._user_gen.setdefault(user_id, 0)
+            self._loading[user_id] = self._loading.get(user_id, 0) + 1
+
+        try:
+            overrides = {
+                m.model_label: m.custom_text
+                for m in db.query(models.UserGestureMapping)
+                .filter(models.UserGestureMapping.user_id == user_id)
+                .all()
+                if m.custom_text
+            }
+        except BaseException:
+            with self._lock:
+                self._finish_load(user_id)
+                self._drop_gen(user_id)
+            raise
+
+        with self._lock:
+            self._finish_load(user_id)
+            if gen == self._user_gen.get(user_id):
+                self._users[user_id] = (overrides, now)
+                self._users.move_to_end(user_id)
+                while len(self._users) > self.max_users:
+                    evicted, _ = self._users.popitem(last=False)
+                    self._drop_gen(evicted)
+            else:
+                self._drop_gen(user_id)
+        return overrides
+
+    def _finish_load(self, user_id: int):
+        n = self._loading.get(user_id, 0) - 1
+        if n > 0:
+            self._loading[user_id] = n
+        else:
+            self._loading.pop(user_id, None)
+
+    def _drop_gen(self, user_id: int):
+        # chỉ giữ generation khi user còn trong cache hoặc đang có query chạy
+        if user_id not in self._users and user_id not in self._loading:
+            self._user_gen.pop(user_id, None)
+
+    def get_text(self, db: Session, user_id: int | None, model_label: str) -> str:
+        """custom_text của user → default_text trong từ điển → chính model_label."""
+        if user_id is not None:
+            custom = self.user_overrides(db, user_id).get(model_label)
+            if custom:
+                return custom
+        return self.dictionary(db).get(model_label) or model_label
+
+    # ---------- invalidate ----------
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            self._users.pop(user_id, None)
+            if user_id in self._loading:
+                self._user_gen[user_id] += 1
+            else:
+                self._user_gen.pop(user_id, None)
+
+    def invalidate_dictionary(self):
+        with self._lock:
+            self._dictionary = None
+            self._dictionary_gen += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "users_cached": len(self._users),
+                "max_users": self.max_users,
+                "ttl_seconds": self.ttl,
+                "dictionary_loaded": self._dictionary is not None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+gesture_texts = GestureTextCache(
+    ttl_seconds=settings.GESTURE_TEXT_CACHE_TTL_SECONDS,
+    max_users=settings.GESTURE_TEXT_CACHE_MAX_USERS,
+)
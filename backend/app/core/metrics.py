@@ -0,0 +1,264 @@
+# app/core/metrics.py
+"""
+Metric kiểu Prometheus tối giản (không cần prometheus_client / service ngoài).
+
+    REQUESTS = Counter("x_total", "mô tả", ["label"])
+    REQUESTS.labels("a").inc()
+    with STAGE_SECONDS.labels("detect").time():
+        ...
+
+GET /metrics trả `REGISTRY.render()` theo text format 0.0.4.
+Mỗi child (1 bộ label) có lock riêng; nên gọi .labels() 1 lần rồi giữ lại ở hot path.
+"""
+
+import bisect
+import math
+import threading
+import time
+from typing import Callable, Iterable, Sequence
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket mặc định cho latency từng stage (giây): 0.5ms … 2.5s
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        lines: list[str] = []
+        for m in metrics:
+            lines.append(f"# HELP {m.name} {m.documentation}")
+            lines.append(f"# TYPE {m.name} {m.type}")
+            lines.extend(m.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        registry.register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name}: cần {len(self.labelnames)} label")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _items(self):
+        with self._lock:
+            return sorted(self._children.items())
+
+
+class _CounterChild:
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def get(self) -> float:
+        return self._value
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._children[()].inc(amount)
+
+    def collect(self):
+        for values, child in self._items():
+            yield f"{self.name}{_fmt_labels(self.labelnames, values)} {_fmt_value(child.get())}"
+
+
+class _GaugeChild:
+    __slots__ = ("_value", "_fn")
+
+    def __init__(self):
+        self._value = 0.0
+        self._fn: Callable[[], float] | None = None
+
+    def set(self, value: float):
+        self._value = value
+
+    def set_function(self, fn: Callable[[], float]):
+        """Giá trị đọc lúc scrape (vd: độ dài hàng đợi) → không tốn gì ở hot path."""
+        self._fn = fn
+
+    def get(self) -> float:
+        return float(self._fn()) if self._fn is not None else self._value
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._children[()].set(value)
+
+    def set_function(self, fn: Callable[[], float]):
+        self._children[()].set_function(fn)
+
+    def collect(self):
+        for values, child in self._items():
+            try:
+                value = child.get()
+            except Exception:
+                continue  # callback lỗi không làm hỏng cả trang /metrics
+            yield f"{self.name}{_fmt_labels(self.labelnames, values)} {_fmt_value(value)}"
+
+
+class _Timer:
+    __slots__ = ("_child", "_t0")
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._t0)
+        return False
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_counts", "_sum", "_lock")
+
+    def __init__(self, bounds: tuple):
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)  # phần tử cuối: +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        idx = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+    def snapshot(self) -> tuple[list[int], float]:
+        with self._lock:
+            return list(self._counts), self._sum
+
+    def merge(self, counts: Sequence[int], total: float):
+        """Cộng dồn số đo từ process khác (vd: worker suy luận) vào child này."""
+        with self._lock:
+            for i, c in enumerate(counts):
+                self._counts[i] += c
+            self._sum += total
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Sequence[float] = STAGE_BUCKETS, registry: Registry = REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._children[()].observe(value)
+
+    def time(self) -> _Timer:
+        return self._children[()].time()
+
+    def snapshot_all(self) -> dict[tuple, tuple[list[int], float]]:
+        return {values: child.snapshot() for values, child in self._items()}
+
+    def delta_since(self, before: dict) -> dict[tuple, tuple[list[int], float]]:
+        """Phần tăng thêm so với snapshot_all() trước đó; chỉ gồm child có số đo mới."""
+        deltas = {}
+        for values, (counts, total) in self.snapshot_all().items():
+            prev_counts, prev_total = before.get(values, (None, 0.0))
+            if prev_counts is not None:
+                counts = [c - p for c, p in zip(counts, prev_counts)]
+            if any(counts):
+                deltas[values] = (counts, total - prev_total)
+        return deltas
+
+    def merge_deltas(self, deltas: dict):
+        """Ghi delta_since() của process khác vào histogram của process này."""
+        for values, (counts, total) in deltas.items():
+            self.labels(*values).merge(counts, total)
+
+    def collect(self):
+        for values, child in self._items():
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_fmt_value(bound)}"'
+                yield f"{self.name}_bucket{_fmt_labels(self.labelnames, values, le)} {cumulative}"
+            yield f"{self.name}_sum{_fmt_labels(self.labelnames, values)} {_fmt_value(total)}"
+            yield f"{self.name}_count{_fmt_labels(self.labelnames, values)} {cumulative}"
+
+
+# Latency từng stage của đường nhận diện (dùng chung cho api/ và ml/)
+STAGE_SECONDS = Histogram(
+    "gesture_stage_seconds",
+    "Thời gian từng stage: auth, base64_decode, imdecode, detect, preprocess, forward, landmark_mlp, db_text",
+    ["stage"],
+)
@@ -0,0 +1,228 @@
+# app/core/prediction_log.py
+"""
+Ghi prediction_logs kiểu write-behind.
+
+Request chỉ đẩy 1 dict vào hàng đợi trong RAM (có giới hạn) rồi trả về ngay; thread nền
+gom thành batch và INSERT nhiều dòng 1 lần khi đủ PREDICTION_LOG_BATCH_SIZE dòng hoặc
+sau PREDICTION_LOG_FLUSH_INTERVAL_SECONDS. Hàng đợi đầy thì bỏ bớt theo
+PREDICTION_LOG_DROP_POLICY: "drop_new" (bỏ dòng mới) hoặc "drop_oldest" (bỏ dòng cũ nhất).
+Shutdown gọi close() để flush nốt phần còn lại.
+Stream gửi hàng chục frame/giây nên không ghi mọi frame: PredictionLogSampler chỉ cho qua
+khi nhãn của stream đổi hoặc cùng nhãn nhưng đã quá PREDICTION_LOG_REPEAT_INTERVAL_SECONDS;
+frame không có tay chỉ ghi khi PREDICTION_LOG_NO_HAND = True.
+Mỗi batch cũng cộng dồn vào bảng tổng hợp prediction_daily_stats (xem prediction_stats.py).
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Callable
+
+from .. import models
+from ..db import SessionLocal
+from .config import settings
+from .metrics import Counter, Gauge, Histogram
+from .prediction_stats import apply_prediction_rows
+
+logger = logging.getLogger(__name__)
+
+DROP_POLICIES = ("drop_new", "drop_oldest")
+
+LOG_QUEUE_DEPTH = Gauge("gesture_prediction_log_queue_depth", "Số dòng prediction_logs đang chờ ghi")
+LOG_FLUSH_SECONDS = Histogram("gesture_prediction_log_flush_seconds", "Thời gian ghi 1 batch prediction_logs")
+LOG_ROWS_TOTAL = Counter("gesture_prediction_log_rows_total", "Số dòng prediction_logs theo kết quả", ["result"])
+_ROWS_WRITTEN = LOG_ROWS_TOTAL.labels("written")
+_ROWS_DROPPED = LOG_ROWS_TOTAL.labels("dropped")
+_ROWS_FAILED = LOG_ROWS_TOTAL.labels("failed")
+_ROWS_SKIPPED = LOG_ROWS_TOTAL.labels("skipped")
+
+
+class PredictionLogSampler:
+    """
+    Nhớ nhãn ghi gần nhất theo stream (LRU tối đa `max_streams` key): should_log() trả True
+    khi nhãn đổi, hoặc cùng nhãn nhưng lần ghi trước đã quá `repeat_interval` giây.
+    repeat_interval <= 0 → ghi mọi frame.
+    """
+
+    def __init__(self, repeat_interval: float, max_streams: int = 10000):
+        self.repeat_interval = repeat_interval
+        self.max_streams = max(1, max_streams)
+        self._last: "OrderedDict[object, tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.skipped = 0
+
+    def should_log(self, stream, label: str, now: float | None = None) -> bool:
+        if self.repeat_interval <= 0:
+            return True
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            last = self._last.get(stream)
+            if last is not None and last[0] == label and now - last[1] < self.repeat_interval:
+                self._last.move_to_end(stream)
+                self.skipped += 1
+                _ROWS_SKIPPED.inc()
+                return False
+            self._last[stream] = (label, now)
+            self._last.move_to_end(stream)
+            while len(self._last) > self.max_streams:
+                self._last.popitem(last=False)
+            return True
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "repeat_interval_seconds": self.repeat_interval,
+                "streams": len(self._last),
+                "skipped": self.skipped,
+            }
+
+
+class PredictionLogWriter:
+    def __init__(
+        self,
+        max_queue: int,
+        batch_size: int,
+        flush_interval: float,
+        drop_policy: str = "drop_new",
+        session_factory: Callable = SessionLocal,
+    ):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"PREDICTION_LOG_DROP_POLICY phải là 1 trong {DROP_POLICIES}")
+        self.max_queue = max(1, max_queue)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.01, flush_interval)
+        self.drop_policy = drop_policy
+        self._session_factory = session_factory
+        self._queue: deque[dict] = deque()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        # gọi sau mỗi batch ghi thành công, cùng transaction (vd: cập nhật bảng tổng hợp)
+        self._on_flush: list[Callable] = []
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        LOG_QUEUE_DEPTH.set_function(lambda: len(self._queue))
+
+    def add_flush_hook(self, fn: Callable):
+        """fn(db, rows) chạy trong cùng transaction với INSERT của batch."""
+        self._on_flush.append(fn)
+
+    def log(
+        self,
+        user_id: int | None,
+        gesture_label: str,
+        predicted_text: str | None,
+        confidence: float,
+        has_hand: bool,
+        model_version: str | None,
+    ):
+        """Không chặn: chỉ đẩy vào hàng đợi."""
+        row = {
+            "user_id": user_id,
+            "gesture_label": gesture_label,
+            "predicted_text": predicted_text,
+            "confidence": float(confidence),
+            "has_hand": has_hand,
+            "model_version": model_version,
+            "created_at": datetime.utcnow(),
+        }
+        with self._cond:
+            if self._closed:
+                self.dropped += 1
+                _ROWS_DROPPED.inc()
+                return
+            if len(self._queue) >= self.max_queue:
+                self.dropped += 1
+                _ROWS_DROPPED.inc()
+                if self.drop_policy == "drop_new":
+                    return
+                self._queue.popleft()
+            self._queue.append(row)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="gesture-log-writer", daemon=True)
+                self._thread.start()
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+
+    def _take_batch(self) -> list[dict] | None:
+        """Chờ tới khi đủ batch / hết flush_interval / close(); None = dừng hẳn."""
+        with self._cond:
+            deadline = time.monotonic() + self.flush_interval
+            while len(self._queue) < self.batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if not self._queue:
+                return None if self._closed else []
+            n = min(self.batch_size, len(self._queue))
+            return [self._queue.popleft() for _ in range(n)]
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, rows: list[dict]):
+        db = self._session_factory()
+        try:
+            with LOG_FLUSH_SECONDS.time():
+                # executemany → pymysql gộp thành 1 câu INSERT ... VALUES (...), (...)
+                db.execute(models.PredictionLog.__table__.insert(), rows)
+                for hook in self._on_flush:
+                    hook(db, rows)
+                db.commit()
+            self.written += len(rows)
+            self.flushes += 1
+            _ROWS_WRITTEN.inc(len(rows))
+        except Exception:
+            db.rollback()
+            self.failed += len(rows)
+            _ROWS_FAILED.inc(len(rows))
+            logger.exception("Ghi %d dòng prediction_logs thất bại, bỏ batch", len(rows))
+        finally:
+            db.close()
+
+    def close(self, timeout: float = 10.0):
+        """Ngừng nhận dòng mới và flush hết hàng đợi (gọi lúc shutdown)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning("Còn %d dòng prediction_logs chưa ghi khi shutdown", len(self._queue))
+
+    def snapshot(self) -> dict:
+        return {
+            "queued": len(self._queue),
+            "max_queue": self.max_queue,
+            "batch_size": self.batch_size,
+            "flush_interval_seconds": self.flush_interval,
+            "drop_policy": self.drop_policy,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
+
+
+prediction_log = PredictionLogWriter(
+    max_queue=settings.PREDICTION_LOG_QUEUE_SIZE,
+    batch_size=settings.PREDICTION_LOG_BATCH_SIZE,
+    flush_interval=settings.PREDICTION_LOG_FLUSH_INTERVAL_SECONDS,
+    drop_policy=settings.PREDICTION_LOG_DROP_POLICY,
+)
+
+prediction_log_sampler = PredictionLogSampler(settings.PREDICTION_LOG_REPEAT_INTERVAL_SECONDS)
+
+# bảng tổng hợp prediction_daily_stats cập nhật cùng transaction với mỗi batch log
+prediction_log.add_flush_hook(apply_prediction_rows)
@@ -0,0 +1,219 @@
+# app/core/prediction_stats.py
+"""
+Bảng tổng hợp prediction_daily_stats: (user_id, ngày UTC, gesture_label) → số lần,
+số frame không có tay, tổng confidence.
+
+- apply_prediction_rows(): hook của PredictionLogWriter, gộp batch trong RAM rồi upsert
+  cộng dồn trong cùng transaction với INSERT log → bảng tổng hợp luôn khớp với log đã ghi.
+- rebuild(): dựng lại từ prediction_logs (backfill, hoặc sau khi xoá log thủ công), trong 1
+  transaction khoá bảng → batch log ghi song song không bị đếm thiếu / thừa.
+- summarize(): số liệu dashboard cho 1 user trong khoảng ngày, đọc tối đa
+  (số ngày × số label) dòng, không phụ thuộc số log thô.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import case, func, text
+from sqlalchemy.orm import Session
+
+from .. import models
+
+NO_HAND_LABEL = "no_hand"
+_COUNTERS = ("prediction_count", "no_hand_count", "confidence_sum")
+_KEY = ("user_id", "day", "gesture_label")
+
+
+def aggregate_rows(rows: list[dict]) -> list[dict]:
+    """Gộp các dòng prediction_logs (dict) theo (user_id, ngày, label); bỏ dòng không có user."""
+    acc: dict[tuple, dict] = defaultdict(lambda: dict.fromkeys(_COUNTERS, 0))
+    for r in rows:
+        if r.get("user_id") is None:
+            continue
+        key = (r["user_id"], r["created_at"].date(), r["gesture_label"])
+        a = acc[key]
+        a["prediction_count"] += 1
+        a["no_hand_count"] += 0 if r.get("has_hand", True) else 1
+        a["confidence_sum"] += r.get("confidence") or 0.0
+    return [dict(zip(_KEY, key), **a) for key, a in acc.items()]
+
+
+def _upsert(db: Session, values: list[dict]):
+    table = models.PredictionDailyStat.__table__
+    now = datetime.utcnow()
+    for v in values:
+        v["updated_at"] = now
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+
+        stmt = insert(table)
+        update = {c: table.c[c] + stmt.inserted[c] for c in _COUNTERS}
+        update["updated_at"] = stmt.inserted.updated_at
+        db.execute(stmt.on_duplicate_key_update(update), values)
+        return
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+
+        stmt = insert(table)
+        update = {c: table.c[c] + stmt.excluded[c] for c in _COUNTERS}
+        update["updated_at"] = stmt.excluded.updated_at
+        db.execute(stmt.on_conflict_do_update(index_elements=list(_KEY), set_=update), values)
+        return
+
+    # dialect khác: đọc rồi ghi từng key
+    S = models.PredictionDailyStat
+    for v in values:
+        row = db.query(S).filter(S.user_id == v["user_id"], S.day == v["day"], S.gesture_label == v["gesture_label"]).first()
+        if row is None:
+            db.add(S(**v))
+        else:
+            for c in _COUNTERS:
+                setattr(row, c, getattr(row, c) + v[c])
+            row.updated_at = now
+
+
+def apply_prediction_rows(db: Session, rows: list[dict]):
+    """Hook flush của PredictionLogWriter: cộng dồn batch log vào bảng tổng hợp (chưa commit)."""
+    values = aggregate_rows(rows)
+    if values:
+        _upsert(db, values)
+
+
+def _lock_for_rebuild(db: Session, dialect: str):
+    """
+    Chặn PredictionLogWriter (mọi process) ghi log / upsert tới khi rebuild commit: batch ghi xong
+    trước đó nằm trong kết quả đếm lại, batch sau đó cộng dồn lên dòng đã dựng lại.
+    SQLite: DELETE đầu tiên đã giữ khoá ghi của cả DB tới khi commit → không cần thêm.
+    """
+    stats = models.PredictionDailyStat.__tablename__
+    logs = models.PredictionLog.__tablename__
+    if dialect == "mysql":
+        db.execute(text(f"LOCK TABLES {stats} WRITE, {logs} READ"))
+    elif dialect == "postgresql":
+        db.execute(text(f"LOCK TABLE {stats}, {logs} IN SHARE ROW EXCLUSIVE MODE"))
+
+
+def rebuild(db: Session, since: date | None = None, until: date | None = None, user_id: int | None = None) -> int:
+    """
+    Xoá rồi dựng lại các dòng tổng hợp trong khoảng [since, until] (ngày UTC) từ prediction_logs,
+    trong 1 transaction có khoá bảng, rồi commit. Trả số dòng tổng hợp đã ghi.
+    Trong lúc rebuild, thread ghi log của server chờ khoá (hàng đợi RAM vẫn nhận dòng mới).
+    """
+    dialect = db.get_bind().dialect.name
+    try:
+        _lock_for_rebuild(db, dialect)
+        n = _rebuild_rows(db, since, until, user_id)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        if dialect == "mysql":
+            db.execute(text("UNLOCK TABLES"))
+            db.commit()
+    return n
+
+
+def _rebuild_rows(db: Session, since: date | None, until: date | None, user_id: int | None) -> int:
+    S = models.PredictionDailyStat
+    L = models.PredictionLog
+
+    delete_q = db.query(S)
+    if since is not None:
+        delete_q = delete_q.filter(S.day >= since)
+    if until is not None:
+        delete_q = delete_q.filter(S.day <= until)
+    if user_id is not None:
+        delete_q = delete_q.filter(S.user_id == user_id)
+    delete_q.delete(synchronize_session=False)
+
+    day = func.date(L.created_at)
+    q = (
+        db.query(
+            L.user_id,
+            day.label("day"),
+            L.gesture_label,
+            func.count(L.id),
+            func.sum(case((L.has_hand.is_(False), 1), else_=0)),
+            func.coalesce(func.sum(L.confidence), 0.0),
+        )
+        .filter(L.user_id.isnot(None))
+        .group_by(L.user_id, day, L.gesture_label)
+    )
+    if since is not None:
+        q = q.filter(L.created_at >= datetime.combine(since, time.min))
+    if until is not None:
+        q = q.filter(L.created_at < datetime.combine(until + timedelta(days=1), time.min))
+    if user_id is not None:
+        q = q.filter(L.user_id == user_id)
+
+    now = datetime.utcnow()
+    values = [
+        {
+            "user_id": uid,
+            # SQLite trả date() dạng chuỗi
+            "day": d if isinstance(d, date) else date.fromisoformat(str(d)),
+            "gesture_label": label,
+            "prediction_count": int(count),
+            "no_hand_count": int(no_hand or 0),
+            "confidence_sum": float(conf or 0.0),
+            "updated_at": now,
+        }
+        for uid, d, label, count, no_hand, conf in q.all()
+    ]
+    if values:
+        db.execute(S.__table__.insert(), values)
+    return len(values)
+
+
+def summarize(db: Session, user_id: int, since: date, until: date, text_for=None) -> dict:
+    """
+    Số liệu dashboard của 1 user trong [since, until]: tổng, theo cử chỉ, theo ngày.
+    `text_for(label)` (tuỳ chọn) trả text hiệu lực để hiển thị thay cho label.
+    """
+    S = models.PredictionDailyStat
+    rows = (
+        db.query(
+            S.day, S.gesture_label, S.prediction_count, S.no_hand_count, S.confidence_sum,
+        )
+        .filter(S.user_id == user_id, S.day >= since, S.day <= until)
+        .all()
+    )
+
+    by_day = {since + timedelta(days=i): [0, 0] for i in range((until - since).days + 1)}
+    by_gesture: dict[str, list] = {}
+    for r in rows:
+        hands = r.prediction_count - r.no_hand_count
+        by_day[r.day][0] += hands
+        by_day[r.day][1] += r.no_hand_count
+        if r.gesture_label == NO_HAND_LABEL:
+            continue
+        g = by_gesture.setdefault(r.gesture_label, [0, 0.0])
+        g[0] += r.prediction_count
+        g[1] += r.confidence_sum
+
+    gestures = sorted(by_gesture.items(), key=lambda kv: (-kv[1][0], kv[0]))
+    return {
+        "user_id": user_id,
+        "since": since,
+        "until": until,
+        "total_predictions": sum(v[0] for v in by_day.values()),
+        "no_hand": sum(v[1] for v in by_day.values()),
+        "most_used_gesture": gestures[0][0] if gestures else None,
+        "by_gesture": [
+            {
+                "gesture": label,
+                "text": text_for(label) if text_for else label,
+                "count": count,
+                "avg_confidence": conf / count if count else 0.0,
+            }
+            for label, (count, conf) in gestures
+        ],
+        "by_day": [{"day": d, "predictions": v[0], "no_hand": v[1]} for d, v in by_day.items()],
+    }
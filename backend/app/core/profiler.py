@@ -0,0 +1,138 @@
+# app/core/profiler.py
+"""
+Sampling profiler bật theo yêu cầu (POST /debug/profile).
+
+Một thread tạm đọc stack của các thread khác qua sys._current_frames() mỗi
+`interval_ms`; tắt thì không có thread / hook nào → không tốn gì.
+Thread đang rảnh (chờ trên lock / queue, ngủ) bị bỏ qua để profile chỉ gồm việc thật.
+Kết quả xuất dạng collapsed stack (flamegraph.pl, speedscope) hoặc JSON speedscope.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable
+
+# Chỉ lấy mẫu thread trên đường nhận diện: executor suy luận, batcher, threadpool của
+# FastAPI (auth + DB) và worker process pool
+DEFAULT_THREAD_PREFIXES = ("gesture-", "AnyIO worker", "ThreadPoolExecutor")
+
+# Thread chỉ ngủ theo chu kỳ (time.sleep là hàm C → không nhận ra qua frame lá): bỏ qua luôn
+IDLE_THREADS = ("gesture-model-watcher",)
+
+# Frame lá nằm trong các module này = thread đang chờ (Condition.wait, Queue.get,
+# multiprocessing Queue.get / poll, select) chứ không làm việc → không tính mẫu
+_IDLE_LEAF_MODULES = {"threading.py", "queue.py", "selectors.py"}
+_IDLE_LEAF_MP_MODULES = {"connection.py", "queues.py", "synchronize.py"}
+
+
+def _is_idle(frame) -> bool:
+    path = frame.f_code.co_filename
+    name = os.path.basename(path)
+    if name in _IDLE_LEAF_MODULES:
+        return True
+    return name in _IDLE_LEAF_MP_MODULES and os.path.basename(os.path.dirname(path)) == "multiprocessing"
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, interval_ms: float = 5.0, thread_prefixes: tuple[str, ...] = DEFAULT_THREAD_PREFIXES):
+        self.interval = max(0.001, interval_ms / 1000.0)
+        self.thread_prefixes = thread_prefixes
+        # (tên thread, stack từ gốc → lá) → số mẫu
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        # số stack thread bị bỏ vì đang chờ / ngủ
+        self.idle_skipped = 0
+        self.duration = 0.0
+
+    def _sample_once(self, names: dict[int, str], me: int):
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            name = names.get(ident)
+            if name is None or not name.startswith(self.thread_prefixes) or name in IDLE_THREADS:
+                continue
+            if _is_idle(frame):
+                self.idle_skipped += 1
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[(name, tuple(stack))] += 1
+        self.samples += 1
+
+    def run(self, max_seconds: float, should_stop: Callable[[], bool] | None = None):
+        """Lấy mẫu tới khi hết `max_seconds` hoặc `should_stop()` trả True (chạy ở thread gọi)."""
+        me = threading.get_ident()
+        t_start = time.perf_counter()
+        deadline = t_start + max_seconds
+        next_names = 0.0
+        names: dict[int, str] = {}
+        while True:
+            now = time.perf_counter()
+            if now >= deadline or (should_stop is not None and should_stop()):
+                break
+            if now >= next_names:
+                # threading.enumerate() tốn hơn → cập nhật tên thread mỗi 0.5s
+                names = {t.ident: t.name for t in threading.enumerate()}
+                next_names = now + 0.5
+            self._sample_once(names, me)
+            time.sleep(self.interval)
+        self.duration = time.perf_counter() - t_start
+
+    def collapsed(self) -> str:
+        """Mỗi dòng: `thread;frame1;frame2;... count` (gộp theo thread name bỏ số thứ tự)."""
+        merged: Counter = Counter()
+        for (name, stack), count in self.stacks.items():
+            merged[";".join((name.rstrip("0123456789-_ "),) + stack)] += count
+        return "\n".join(f"{line} {count}" for line, count in merged.most_common()) + "\n"
+
+    def speedscope(self, name: str = "gesture profile") -> dict:
+        frames: list[dict] = []
+        index: dict[str, int] = {}
+
+        def frame_id(label: str) -> int:
+            idx = index.get(label)
+            if idx is None:
+                func, _, loc = label.partition(" (")
+                file, _, line = loc.rstrip(")").rpartition(":")
+                idx = index[label] = len(frames)
+                frames.append({"name": func, "file": file, "line": int(line) if line.isdigit() else None})
+            return idx
+
+        interval_ms = self.interval * 1000.0
+        by_thread: dict[str, list] = {}
+        for (thread, stack), count in self.stacks.items():
+            by_thread.setdefault(thread, []).append(([frame_id(f) for f in stack], count * interval_ms))
+
+        profiles = []
+        for thread, entries in sorted(by_thread.items()):
+            total = sum(w for _, w in entries)
+            profiles.append({
+                "type": "sampled",
+                "name": thread,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": total,
+                "samples": [s for s, _ in entries],
+                "weights": [w for _, w in entries],
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "hand-gestures-backend",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+
+# chỉ 1 phiên profile mỗi lúc
+profile_lock = threading.Lock()
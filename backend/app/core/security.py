@@ -1,3 +1,6 @@
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -7,9 +10,12 @@ from .config import settings
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
 from ..db import get_db
 from .. import models
+from .metrics import STAGE_SECONDS
+from .tracing import span
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
@@ -39,32 +45,206 @@ def create_access_token(
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> models.User:
+_AUTH_SECONDS = STAGE_SECONDS.labels("auth")
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """
+    User đã xác thực, bản gọn: chỉ id / email / role.
+    Endpoint cần cả row User (quan hệ, profile...) thì dùng get_current_user.
+    """
+    id: int
+    email: str | None
+    role: str
+
+
+class ActiveUserCache:
     """
-    Lấy user hiện tại từ JWT Bearer token trong header Authorization.
+    Cache kết quả kiểm tra "user còn tồn tại và is_active" theo user_id trong `ttl` giây
+    → frame liên tục của cùng user không cần query DB để xác thực.
+    Chỉ query 4 cột của bảng users, không load quan hệ nào.
     """
-    credentials_exception = HTTPException(
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        # user_id → (Principal hoặc None nếu không hợp lệ, hạn dùng)
+        self._entries: dict[int, tuple[Principal | None, float]] = {}
+
+    def get(self, db: Session, user_id: int, fresh: bool = False) -> Principal | None:
+        """`fresh=True`: bỏ qua cache, luôn đọc DB (vẫn cập nhật cache)."""
+        now = time.monotonic()
+        if self.ttl > 0 and not fresh:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                return entry[0]
+
+        row = (
+            db.query(models.User.id, models.User.email, models.User.role, models.User.is_active)
+            .filter(models.User.id == user_id)
+            .first()
+        )
+        principal = Principal(row.id, row.email, row.role) if row is not None and row.is_active else None
+
+        if self.ttl > 0:
+            with self._lock:
+                if len(self._entries) >= self.max_entries:
+                    # bỏ entry hết hạn; vẫn đầy thì xoá hết (chỉ là cache)
+                    self._entries = {k: v for k, v in self._entries.items() if v[1] > now}
+                    if len(self._entries) >= self.max_entries:
+                        self._entries.clear()
+                self._entries[user_id] = (principal, now + self.ttl)
+        return principal
+
+    def invalidate(self, user_id: int | None = None):
+        """Gọi sau khi đổi role / khoá tài khoản (None = xoá toàn bộ)."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+active_users = ActiveUserCache(settings.AUTH_USER_CACHE_TTL_SECONDS, settings.AUTH_USER_CACHE_MAX_ENTRIES)
+
+
+_INVALIDATE_KEY = "auth_invalidate_user_ids"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_changes(session, flush_context):
+    """Ghi lại user vừa tạo / xoá / đổi role hoặc is_active trong transaction này."""
+    ids = session.info.setdefault(_INVALIDATE_KEY, set())
+    for obj in session.new:
+        if isinstance(obj, models.User):
+            ids.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, models.User):
+            ids.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, models.User):
+            attrs = inspect(obj).attrs
+            if attrs.role.history.has_changes() or attrs.is_active.history.has_changes():
+                ids.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    # sau commit: request khác đọc lại DB sẽ thấy giá trị mới, không cache lại giá trị cũ
+    for user_id in session.info.pop(_INVALIDATE_KEY, ()):
+        active_users.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_changes(session):
+    session.info.pop(_INVALIDATE_KEY, None)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Không thể xác thực người dùng",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> Principal:
+    """
+    Xác thực nhẹ cho hot path (mỗi frame): giải mã JWT + kiểm tra user active qua cache.
+    """
+    with _AUTH_SECONDS.time(), span("auth"):
+        principal = get_principal_from_token(db, token)
+    if principal is None:
+        raise _credentials_exception()
+    return principal
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> models.User:
+    """
+    Lấy user hiện tại (cả row User) từ JWT Bearer token trong header Authorization.
+    """
+    with _AUTH_SECONDS.time(), span("auth"):
+        user = get_user_from_token(db, token)
+    if user is None:
+        raise _credentials_exception()
+
+    return user
+
+
+def require_admin(
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+) -> Principal:
+    """
+    Chỉ cho phép user role "admin".
+    Đọc lại role từ DB (không qua cache): hạ quyền / khoá admin có hiệu lực ngay,
+    kể cả ở worker process khác. Endpoint admin ít gọi nên thêm 1 query không đáng kể.
+    """
+    principal = active_users.get(db, principal.id, fresh=True)
+    if principal is None:
+        raise _credentials_exception()
+    if principal.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Chỉ admin mới được thực hiện thao tác này",
+        )
+    return principal
+
+
+def decode_token_claims(token: str | None) -> tuple[int, dict] | None:
+    """Giải mã JWT, trả (user_id từ claim "sub", toàn bộ claim). None nếu token sai / hết hạn."""
+    if not token:
+        return None
     try:
         # Giải mã token
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = payload.get("sub")  # bạn đang set {"sub": str(user.id), ...}
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+        return (int(user_id), payload) if user_id is not None else None
+    except (JWTError, ValueError):
         # Token sai / hết hạn / không giải mã được
-        raise credentials_exception
+        return None
 
-    # Tìm user trong DB
-    user = db.query(models.User).filter(models.User.id == int(user_id)).first()
-    if user is None:
-        raise credentials_exception
 
-    return user
+def decode_token_user_id(token: str | None) -> int | None:
+    """Giải mã JWT, trả user_id (claim "sub"). None nếu token sai / hết hạn."""
+    decoded = decode_token_claims(token)
+    return decoded[0] if decoded is not None else None
+
+
+def get_principal_from_token(db: Session, token: str | None) -> Principal | None:
+    """
+    Như get_user_from_token nhưng trả Principal.
+    Dùng chung cho get_current_principal và WebSocket (không có header Authorization).
+
+    - AUTH_CHECK_ACTIVE_USER = False: dựng Principal từ claim (sub, email, role) do
+      /auth/login, /auth/token ghi vào token → không chạm DB.
+    - Mặc định: kiểm tra user còn tồn tại + is_active qua cache active_users
+      (cache miss / hết TTL = 1 query 4 cột theo khoá chính).
+    """
+    decoded = decode_token_claims(token)
+    if decoded is None:
+        return None
+    user_id, claims = decoded
+    if not settings.AUTH_CHECK_ACTIVE_USER and "role" in claims:
+        return Principal(user_id, claims.get("email"), claims["role"])
+    return active_users.get(db, user_id)
+
+
+def get_user_from_token(db: Session, token: str | None) -> models.User | None:
+    """
+    Giải mã JWT rồi tìm user. Trả None nếu token sai / hết hạn / user không tồn tại.
+    """
+    user_id = decode_token_user_id(token)
+    if user_id is None:
+        return None
+
+    # Tìm user trong DB
+    return db.query(models.User).filter(models.User.id == user_id).first()
@@ -0,0 +1,172 @@
+# app/core/tracing.py
+"""
+Tracing theo request, lưu trong RAM.
+
+- Middleware tạo 1 Trace cho mỗi request HTTP và đặt vào contextvar; code ở các
+  tầng dưới gọi `with span("detect"): ...` để ghi 1 span (không có trace → no-op).
+- Context được copy sang threadpool của FastAPI / InferenceExecutor nên span ghi
+  từ thread khác vẫn vào đúng trace.
+- Kết thúc request: giữ trace nếu được sample (TRACE_SAMPLE_RATE) hoặc chậm
+  (>= TRACE_SLOW_MS) vào ring buffer có giới hạn; tuỳ chọn ghi thêm ra file JSONL.
+"""
+
+import contextvars
+import json
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import nullcontext
+from pathlib import Path
+
+from .config import settings
+
+_current: contextvars.ContextVar["Trace | None"] = contextvars.ContextVar("gesture_trace", default=None)
+_NOOP = nullcontext()
+
+
+class Trace:
+    __slots__ = ("trace_id", "method", "path", "start_wall", "t0", "spans", "status", "duration_ms")
+
+    def __init__(self, method: str, path: str):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.start_wall = time.time()
+        self.t0 = time.perf_counter()
+        self.spans: list[dict] = []
+        self.status: int | None = None
+        self.duration_ms = 0.0
+
+    def add(self, name: str, t_start: float, t_end: float, detail: str | None = None):
+        s = {
+            "name": name,
+            "start_ms": round((t_start - self.t0) * 1000.0, 3),
+            "duration_ms": round((t_end - t_start) * 1000.0, 3),
+            "thread": threading.current_thread().name,
+        }
+        if detail:
+            s["detail"] = detail
+        self.spans.append(s)  # list.append an toàn giữa các thread
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "method": self.method,
+            "path": self.path,
+            "start": self.start_wall,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 3),
+            "spans": sorted(self.spans, key=lambda s: s["start_ms"]),
+        }
+
+
+class _Span:
+    __slots__ = ("_trace", "_name", "_detail", "_t0")
+
+    def __init__(self, trace: Trace, name: str, detail: str | None):
+        self._trace = trace
+        self._name = name
+        self._detail = detail
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._trace.add(self._name, self._t0, time.perf_counter(), self._detail)
+        return False
+
+
+def span(name: str, detail: str | None = None):
+    """`with span("detect"):` — ghi span vào trace của request hiện tại (nếu có)."""
+    trace = _current.get()
+    if trace is None:
+        return _NOOP
+    return _Span(trace, name, detail)
+
+
+def current_trace() -> Trace | None:
+    return _current.get()
+
+
+class TraceBuffer:
+    """Ring buffer các trace đã giữ lại + (tuỳ chọn) ghi JSONL ở thread nền."""
+
+    def __init__(self, capacity: int, export_path: str = ""):
+        self._traces: deque = deque(maxlen=max(1, capacity))
+        self._lock = threading.Lock()
+        self._export_path = Path(export_path) if export_path else None
+        self._export_q: "queue.SimpleQueue[dict]" = queue.SimpleQueue()
+        self._writer: threading.Thread | None = None
+        self.recorded = 0
+        self.kept = 0
+
+    def start(self, method: str, path: str) -> tuple[Trace, contextvars.Token]:
+        trace = Trace(method, path)
+        return trace, _current.set(trace)
+
+    def finish(self, trace: Trace, token: contextvars.Token, status: int | None):
+        _current.reset(token)
+        trace.status = status
+        trace.duration_ms = (time.perf_counter() - trace.t0) * 1000.0
+        self.recorded += 1
+        keep = trace.duration_ms >= settings.TRACE_SLOW_MS or random.random() < settings.TRACE_SAMPLE_RATE
+        if not keep:
+            return
+        self.kept += 1
+        data = trace.to_dict()
+        with self._lock:
+            self._traces.append(data)
+        if self._export_path is not None:
+            self._ensure_writer()
+            self._export_q.put(data)
+
+    def slowest(self, limit: int = 50, path: str | None = None) -> list[dict]:
+        with self._lock:
+            traces = list(self._traces)
+        if path:
+            traces = [t for t in traces if t["path"] == path]
+        return sorted(traces, key=lambda t: t["duration_ms"], reverse=True)[:limit]
+
+    def _ensure_writer(self):
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="trace-export", daemon=True)
+                    self._writer.start()
+
+    def _write_loop(self):
+        self._export_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._export_path, "a", encoding="utf-8") as f:
+            while True:
+                f.write(json.dumps(self._export_q.get(), ensure_ascii=False) + "\n")
+                # gom các trace đang chờ rồi mới flush
+                while True:
+                    try:
+                        f.write(json.dumps(self._export_q.get_nowait(), ensure_ascii=False) + "\n")
+                    except queue.Empty:
+                        break
+                f.flush()
+
+
+trace_buffer = TraceBuffer(settings.TRACE_BUFFER_SIZE, settings.TRACE_EXPORT_PATH)
+
+
+def instrument_sqlalchemy(engine):
+    """Mỗi câu SQL thành 1 span "db" (kèm 120 ký tự đầu của statement)."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("trace_t0", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        trace = _current.get()
+        stack = conn.info.get("trace_t0")
+        if trace is not None and stack:
+            trace.add("db", stack.pop(), time.perf_counter(), " ".join(statement.split())[:120])
@@ -14,6 +14,20 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Base cho các model kế thừa
 Base = declarative_base()
 
+def create_missing_indexes():
+    """create_all() không thêm index mới vào bảng đã tồn tại → tạo bổ sung các index còn thiếu."""
+    from sqlalchemy import inspect
+
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
+
+
 # Dependency cho FastAPI
 def get_db():
     from sqlalchemy.orm import Session
@@ -1,21 +1,39 @@
-from fastapi import FastAPI, Depends
+import time
+
+import anyio.to_thread
+from fastapi import FastAPI, Depends, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
-from .core.config import setup_cors
-from .db import engine, Base, get_db
+from .core.config import setup_cors, settings
+from .core.metrics import Histogram
+from .core.prediction_log import prediction_log
+from .core.tracing import instrument_sqlalchemy, trace_buffer
+from .db import engine, Base, create_missing_indexes, get_db
 from . import models
+from .ml.gesture_model import (
+    configure_torch_threads,
+    inference_executor,
+    shutdown_process_pool,
+    start_model_watcher,
+    tracking_sessions,
+    warmup_in_background,
+)
 
 from .api.gesture import router as gesture_router
 from .api.collect import router as collect_router
 from .api.tts import router as tts_router
 from .api.auth import router as auth_router
+from .api.health import router as health_router
+from .api.admin_models import router as admin_models_router
+from .api.metrics import router as metrics_router
+from .api.debug import router as debug_router
+from .api.statistics import router as statistics_router
 
 from .api.gesture_predict import router as gesture_predict_router
+from .api.gesture_stream import router as gesture_stream_router
 from .api.gesture import router as gesture_mapping_router
 
-Base.metadata.create_all(bind=engine)
-
 app = FastAPI(
     title="V-HAND API Documentation",
     version="1.0.0",
@@ -23,6 +41,75 @@ app = FastAPI(
 
 setup_cors(app)
 
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Thời gian xử lý request HTTP theo route",
+    ["method", "route", "status"],
+)
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    t0 = time.perf_counter()
+    response = await call_next(request)
+    # dùng path template của route (không phải URL thật) để số label có giới hạn
+    route = request.scope.get("route")
+    path = getattr(route, "path", "unmatched")
+    HTTP_REQUEST_SECONDS.labels(request.method, path, response.status_code).observe(time.perf_counter() - t0)
+    return response
+
+
+if settings.TRACING_ENABLED:
+    instrument_sqlalchemy(engine)
+
+    @app.middleware("http")
+    async def trace_requests(request: Request, call_next):
+        trace, token = trace_buffer.start(request.method, request.url.path)
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            response.headers["X-Trace-Id"] = trace.trace_id
+            return response
+        finally:
+            trace_buffer.finish(trace, token, status_code)
+
+
+@app.on_event("startup")
+async def configure_threadpool():
+    # threadpool cho endpoint sync = WORKER_THREADS (kích thước pool detector tính theo số này)
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = settings.WORKER_THREADS
+    if settings.INFER_BACKEND != "process":
+        # PyTorch chạy ngay trong process API: chia core với các thread executor suy luận
+        configure_torch_threads()
+
+
+@app.on_event("startup")
+def init_db():
+    # tạo bảng lúc startup thay vì lúc import module
+    Base.metadata.create_all(bind=engine)
+    create_missing_indexes()
+
+
+@app.on_event("startup")
+def start_inference_backend():
+    # load model / detector (hoặc spawn worker process) ở nền; /health/ready báo khi xong
+    if settings.INFER_WARMUP_ON_STARTUP:
+        warmup_in_background()
+    if settings.INFER_BACKEND != "process":
+        # đổi version model khi CURRENT trong registry thay đổi (worker process tự theo dõi)
+        start_model_watcher()
+
+
+@app.on_event("shutdown")
+def stop_inference_backend():
+    inference_executor.close()
+    shutdown_process_pool()
+    tracking_sessions.close_all()
+    # flush nốt prediction_logs đang chờ trong hàng đợi
+    prediction_log.close()
+
 
 @app.get("/")
 def root():
@@ -37,9 +124,15 @@ def db_test(db: Session = Depends(get_db)):
 
 
 # gắn các router
+app.include_router(health_router)
+app.include_router(metrics_router)
+app.include_router(debug_router)
+app.include_router(admin_models_router)
 app.include_router(auth_router)
 app.include_router(gesture_predict_router)
+app.include_router(gesture_stream_router)
 app.include_router(gesture_mapping_router)
 app.include_router(gesture_router)
+app.include_router(statistics_router)
 app.include_router(collect_router)
 app.include_router(tts_router)
@@ -0,0 +1,196 @@
+# app/ml/admission.py
+
+import asyncio
+import collections
+import contextvars
+import math
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from ..core.tracing import current_trace
+
+
+class Overloaded(Exception):
+    """Từ chối ngay lúc nhận: hàng đợi đầy hoặc ước tính không kịp deadline."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Overloaded):
+    """Đã vào hàng đợi nhưng tới lượt thì quá deadline → bỏ, không chạy."""
+
+
+class InferenceExecutor:
+    """
+    Executor có giới hạn cho đường suy luận (decode + MediaPipe + CNN).
+
+    - `max_workers` thread chạy job; tối đa `max_queue` job chờ.
+    - Mỗi job có deadline (mặc định `deadline_ms` tính từ lúc submit).
+    - Hàng đợi đầy, hoặc thời gian chờ ước tính (EWMA thời gian chạy 1 job ×
+      số job phía trước / số worker) vượt deadline → raise Overloaded ngay.
+    - Job hết hạn khi đang chờ → DeadlineExceeded, worker không tốn công chạy.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, deadline_ms: float, name: str = "gesture-infer"):
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self.deadline = max(0.0, float(deadline_ms)) / 1000.0
+        self.name = name
+
+        self._queue: collections.deque = collections.deque()
+        self._cond = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._closed = False
+        self._busy = 0
+        # EWMA thời gian chạy 1 job (giây); None cho tới khi có job đầu tiên
+        self._service_time: float | None = None
+
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.expired = 0
+
+    # ---------- public API ----------
+    def submit(self, fn: Callable[..., Any], *args, deadline_ms: float | None = None) -> Future:
+        deadline = self.deadline if deadline_ms is None else deadline_ms / 1000.0
+        now = time.monotonic()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("InferenceExecutor đã bị đóng")
+            self._ensure_started()
+
+            wait = self._estimated_wait()
+            if len(self._queue) >= self.max_queue and self._busy >= self.max_workers:
+                self.rejected += 1
+                raise Overloaded("queue_full", self._retry_after(wait))
+            if self._service_time is not None and wait + self._service_time > deadline:
+                self.rejected += 1
+                raise Overloaded("deadline", self._retry_after(wait))
+
+            fut: Future = Future()
+            # copy context (trace của request, ...) sang thread worker
+            ctx = contextvars.copy_context()
+            self._queue.append((fn, args, fut, now + deadline, time.perf_counter(), ctx))
+            self.submitted += 1
+            self._cond.notify()
+        return fut
+
+    async def run(self, fn: Callable[..., Any], *args, deadline_ms: float | None = None) -> Any:
+        """
+        Dùng trong endpoint async: chờ kết quả mà không chiếm thread của event loop.
+        Client ngắt giữa chừng: job chưa chạy thì huỷ; đang chạy thì chờ chạy xong
+        (args có thể trỏ vào buffer mà caller sẽ trả lại pool khi thoát).
+        """
+        fut = self.submit(fn, *args, deadline_ms=deadline_ms)
+        try:
+            return await asyncio.shield(asyncio.wrap_future(fut))
+        except asyncio.CancelledError:
+            if not fut.cancel():
+                try:
+                    await asyncio.wrap_future(fut)
+                except Exception:
+                    pass
+            raise
+
+    def resize(self, max_workers: int):
+        """Đổi số worker lúc đang chạy (vd: sau autotune); thread thừa tự thoát khi rảnh."""
+        with self._cond:
+            self.max_workers = max(1, int(max_workers))
+            if self._threads:
+                del self._threads[self.max_workers:]
+                self._start_threads()
+            self._cond.notify_all()
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "workers": self.max_workers,
+                "busy": self._busy,
+                "queued": len(self._queue),
+                "max_queue": self.max_queue,
+                "deadline_ms": self.deadline * 1000.0,
+                "service_ms_avg": round((self._service_time or 0.0) * 1000.0, 2),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "expired": self.expired,
+            }
+
+    def close(self, timeout: float | None = 5.0):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+            threads = list(self._threads)
+        for t in threads:
+            t.join(timeout)
+
+    # ---------- internal ----------
+    def _ensure_started(self):
+        # gọi khi đang giữ self._cond
+        if not self._threads:
+            self._start_threads()
+
+    def _start_threads(self):
+        for i in range(len(self._threads), self.max_workers):
+            t = threading.Thread(target=self._loop, args=(i,), name=f"{self.name}-{i}", daemon=True)
+            self._threads.append(t)
+            t.start()
+
+    def _retired(self, idx: int) -> bool:
+        # thread bị bỏ khỏi danh sách sau resize() → thoát
+        return idx >= len(self._threads) or self._threads[idx] is not threading.current_thread()
+
+    def _estimated_wait(self) -> float:
+        if self._service_time is None:
+            return 0.0
+        ahead = len(self._queue) + self._busy - self.max_workers + 1
+        return max(0, ahead) * self._service_time / self.max_workers
+
+    @staticmethod
+    def _retry_after(wait: float) -> float:
+        # Retry-After (giây, số nguyên) — ít nhất 1s
+        return max(1, math.ceil(wait))
+
+    @staticmethod
+    def _run_job(fn, args, enqueued: float):
+        trace = current_trace()
+        if trace is not None:
+            trace.add("queue_wait", enqueued, time.perf_counter())
+        return fn(*args)
+
+    def _loop(self, idx: int):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed and not self._retired(idx):
+                    self._cond.wait()
+                if self._retired(idx) or not self._queue:
+                    return
+                fn, args, fut, deadline, enqueued, ctx = self._queue.popleft()
+
+                if not fut.set_running_or_notify_cancel():
+                    continue  # caller đã huỷ
+                if time.monotonic() > deadline:
+                    self.expired += 1
+                    fut.set_exception(DeadlineExceeded("expired", self._retry_after(self._estimated_wait())))
+                    continue
+                self._busy += 1
+
+            t0 = time.perf_counter()
+            try:
+                fut.set_result(ctx.run(self._run_job, fn, args, enqueued))
+            except BaseException as exc:
+                fut.set_exception(exc)
+            elapsed = time.perf_counter() - t0
+
+            with self._cond:
+                self._busy -= 1
+                self.completed += 1
+                st = self._service_time
+                self._service_time = elapsed if st is None else 0.9 * st + 0.1 * elapsed
@@ -0,0 +1,288 @@
+# app/ml/autotune.py
+
+import itertools
+import json
+import os
+import statistics
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+from ..core.config import machine_fingerprint, settings
+from .sample_store import iter_labeled_samples
+
+
+@dataclass
+class TuneConfig:
+    torch_threads: int
+    batch_size: int
+    detect_max_side: int
+    workers: int
+
+
+@dataclass
+class TuneResult:
+    torch_threads: int
+    interop_threads: int
+    batch_size: int
+    detect_max_side: int
+    workers: int
+    fps: float
+    p50_ms: float
+    p99_ms: float
+    within_budget: bool
+
+
+def default_grid(quick: bool = False) -> dict[str, list[int]]:
+    cpus = os.cpu_count() or 1
+    # tắt micro-batching thì kích thước batch không có tác dụng
+    batch_sizes = [1, 4, 8, 16] if settings.INFER_BATCHING else [1]
+    if quick:
+        # autotune lúc startup: ít cấu hình để không kéo dài warm-up
+        return {
+            "torch_threads": sorted({max(1, cpus // 2), cpus}),
+            "batch_size": [b for b in batch_sizes if b in (1, 8)],
+            "detect_max_side": [0],
+            "workers": sorted({max(1, cpus // 2), cpus}),
+        }
+    threads = sorted({1, 2, 4, max(1, cpus // 2), cpus} & set(range(1, cpus + 1)))
+    return {
+        "torch_threads": threads,
+        "batch_size": batch_sizes,
+        # chỉ các độ phân giải đã kiểm tra độ chính xác (benchmarks/bench_detect_resolution.py)
+        "detect_max_side": [0, 480],
+        "workers": sorted({1, 2, max(1, cpus // 2), cpus, cpus * 2}),
+    }
+
+
+def iter_grid(grid: dict[str, list[int]]):
+    for values in itertools.product(
+        grid["torch_threads"], grid["batch_size"], grid["detect_max_side"], grid["workers"]
+    ):
+        yield TuneConfig(*values)
+
+
+def load_frames(limit: int = 16) -> list[np.ndarray]:
+    """Ảnh mẫu đã thu thập (có tay → chạy cả CNN); không có thì dùng frame nhiễu."""
+    frames = []
+    for path, _ in iter_labeled_samples(limit=limit):
+        frame = cv2.imread(str(path))
+        if frame is not None:
+            frames.append(cv2.resize(frame, (640, 480)))
+    if not frames:
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(limit)]
+    return frames
+
+
+def apply_config(cfg: TuneConfig):
+    """Áp dụng cấu hình vào setting + các object đang chạy (không cần restart)."""
+    from . import gesture_model
+
+    settings.TORCH_THREADS = cfg.torch_threads
+    settings.INFER_MAX_BATCH_SIZE = cfg.batch_size
+    settings.DETECT_MAX_SIDE = cfg.detect_max_side
+    settings.INFER_EXECUTOR_THREADS = cfg.workers
+
+    torch.set_num_threads(cfg.torch_threads)
+    gesture_model.batch_scheduler.max_batch_size = max(1, cfg.batch_size)
+    # mỗi thread suy luận cần 1 detector; thu nhỏ pool khi cấu hình có ít worker hơn
+    gesture_model.hands_static_pool.resize(settings.HANDS_POOL_SIZE or cfg.workers)
+    gesture_model.inference_executor.resize(cfg.workers)
+
+
+_TUNED_SETTINGS = ("TORCH_THREADS", "INFER_MAX_BATCH_SIZE", "DETECT_MAX_SIDE", "INFER_EXECUTOR_THREADS")
+
+
+def snapshot_runtime() -> dict:
+    """Cấu hình đang chạy (setting + object live) để khôi phục sau khi sweep."""
+    from . import gesture_model
+
+    return {
+        "settings": {k: getattr(settings, k) for k in _TUNED_SETTINGS},
+        "torch_threads": torch.get_num_threads(),
+        "batch_size": gesture_model.batch_scheduler.max_batch_size,
+        "hands_pool_size": gesture_model.hands_static_pool.size,
+        "workers": gesture_model.inference_executor.max_workers,
+    }
+
+
+def restore_runtime(state: dict):
+    from . import gesture_model
+
+    for key, value in state["settings"].items():
+        setattr(settings, key, value)
+    torch.set_num_threads(state["torch_threads"])
+    gesture_model.batch_scheduler.max_batch_size = state["batch_size"]
+    gesture_model.hands_static_pool.resize(state["hands_pool_size"])
+    gesture_model.inference_executor.resize(state["workers"])
+
+
+def _frame_workload(frame: np.ndarray):
+    from . import gesture_model
+
+    pred = gesture_model.predict_from_bgr(frame, use_static_detector=True)
+    if not pred.has_hand:
+        # frame nhiễu không có tay: vẫn tính chi phí preprocess + CNN trên 1 crop
+        gesture_model.classify_tensor(gesture_model.preprocess_from_cv2(frame[120:344, 200:424]))
+
+
+def measure(frames: list[np.ndarray], workers: int, duration: float) -> tuple[float, list[float]]:
+    """`workers` thread gọi pipeline liên tục trong `duration` giây → (fps, latencies_ms)."""
+    latencies: list[float] = []
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def worker(offset: int):
+        local = []
+        i = offset
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            _frame_workload(frames[i % len(frames)])
+            local.append((time.perf_counter() - t0) * 1000.0)
+            i += 1
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(workers)]
+    t_start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t_start
+    return len(latencies) / wall, latencies
+
+
+def _percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def sweep(
+    grid: dict[str, list[int]],
+    duration: float,
+    budget_ms: float,
+    frames: list[np.ndarray] | None = None,
+    interop_threads: int | None = None,
+    log=print,
+) -> list[TuneResult]:
+    """
+    Đo lần lượt mọi cấu hình trong grid trên model đã load của process hiện tại.
+    Xong (hoặc lỗi) thì khôi phục cấu hình trước khi sweep.
+    """
+    from . import gesture_model
+
+    frames = frames or load_frames()
+    gesture_model.get_active_model()
+    interop = interop_threads or torch.get_num_interop_threads()
+
+    rows = []
+    original = snapshot_runtime()
+    try:
+        for cfg in iter_grid(grid):
+            apply_config(cfg)
+            measure(frames, cfg.workers, min(0.5, duration))  # làm nóng detector / batch mới
+            fps, lats = measure(frames, cfg.workers, duration)
+            row = TuneResult(
+                torch_threads=cfg.torch_threads,
+                interop_threads=interop,
+                batch_size=cfg.batch_size,
+                detect_max_side=cfg.detect_max_side,
+                workers=cfg.workers,
+                fps=round(fps, 2),
+                p50_ms=round(statistics.median(lats), 2),
+                p99_ms=round(_percentile(lats, 0.99), 2),
+                within_budget=_percentile(lats, 0.99) <= budget_ms,
+            )
+            rows.append(row)
+            log(format_row(row))
+    finally:
+        # sweep không để lại cấu hình của điểm grid cuối; caller tự apply_config() cấu hình được chọn
+        restore_runtime(original)
+    return rows
+
+
+def run_sweep_in_child(interop: int, grid: dict, duration: float, budget_ms: float) -> list[dict]:
+    """
+    Chạy trong process con (spawn): số thread inter-op chỉ đặt được 1 lần,
+    trước khi PyTorch chạy op song song đầu tiên.
+    """
+    torch.set_num_interop_threads(interop)
+    settings.INFER_BACKEND = "thread"
+    return [asdict(r) for r in sweep(grid, duration, budget_ms, interop_threads=interop)]
+
+
+def pick_best(rows: list[TuneResult]) -> TuneResult | None:
+    """Throughput cao nhất trong các cấu hình đạt latency budget (hoà → p99 thấp hơn)."""
+    ok = [r for r in rows if r.within_budget]
+    if not ok:
+        return None
+    return max(ok, key=lambda r: (r.fps, -r.p99_ms))
+
+
+HEADER = (
+    f"{'threads':>7} {'interop':>7} {'batch':>5} {'side':>5} {'workers':>7} "
+    f"{'fps':>8} {'p50(ms)':>8} {'p99(ms)':>8} {'budget':>6}"
+)
+
+
+def format_row(r: TuneResult) -> str:
+    return (
+        f"{r.torch_threads:>7} {r.interop_threads:>7} {r.batch_size:>5} {r.detect_max_side or 'full':>5} "
+        f"{r.workers:>7} {r.fps:>8.1f} {r.p50_ms:>8.1f} {r.p99_ms:>8.1f} {'ok' if r.within_budget else '-':>6}"
+    )
+
+
+def build_profile(rows: list[TuneResult], best: TuneResult, budget_ms: float, duration: float) -> dict:
+    return {
+        "machine": machine_fingerprint(),
+        "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "engine": settings.INFER_ENGINE,
+        "latency_budget_ms": budget_ms,
+        "duration_s": duration,
+        "settings": {
+            "TORCH_THREADS": best.torch_threads,
+            "TORCH_INTEROP_THREADS": best.interop_threads,
+            "INFER_MAX_BATCH_SIZE": best.batch_size,
+            "DETECT_MAX_SIDE": best.detect_max_side,
+            "INFER_EXECUTOR_THREADS": best.workers,
+        },
+        "best": asdict(best),
+        "sweep": [asdict(r) for r in rows],
+    }
+
+
+def save_profile(profile: dict, path: str | Path | None = None) -> Path:
+    path = Path(path or settings.AUTOTUNE_PROFILE_PATH)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(profile, indent=2))
+    os.replace(tmp, path)
+    return path
+
+
+def autotune_on_startup(duration: float = 1.0) -> dict | None:
+    """
+    Autotune nhanh (grid nhỏ, giữ nguyên số thread inter-op) trong warm-up,
+    áp dụng ngay cấu hình tốt nhất rồi ghi profile cho các lần khởi động sau.
+    """
+    budget = settings.AUTOTUNE_LATENCY_BUDGET_MS
+    print("⏱️ Autotune lúc startup...")
+    rows = sweep(default_grid(quick=True), duration, budget)
+    best = pick_best(rows)
+    if best is None:
+        print(f"⚠️ Autotune: không cấu hình nào đạt p99 <= {budget}ms, giữ setting hiện tại")
+        return None
+    apply_config(TuneConfig(best.torch_threads, best.batch_size, best.detect_max_side, best.workers))
+    profile = build_profile(rows, best, budget, duration)
+    settings.tuning_profile = profile
+    print(f"✅ Autotune: {profile['settings']} → {save_profile(profile)}")
+    return profile
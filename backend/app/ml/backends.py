@@ -0,0 +1,103 @@
+# app/ml/backends.py
+
+from pathlib import Path
+
+import numpy as np
+import torch
+
+ENGINES = ("eager", "torchscript", "onnx", "int8")
+
+
+class InferenceBackend:
+    """
+    Giao diện chung cho engine suy luận: nhận batch (N, 3, H, W) float32, trả logits (N, C).
+    """
+
+    name = "base"
+
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        raise NotImplementedError
+
+
+class EagerBackend(InferenceBackend):
+    """PyTorch eager mode (torchvision.resnet18 như cũ)."""
+
+    name = "eager"
+
+    def __init__(self, model: torch.nn.Module):
+        self.model = model.eval()
+
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        with torch.inference_mode():
+            return self.model(batch)
+
+
+class TorchScriptBackend(InferenceBackend):
+    """TorchScript đã freeze + optimize_for_inference (file do export_torchscript tạo)."""
+
+    name = "torchscript"
+
+    def __init__(self, path: Path, device: str = "cpu"):
+        self.model = torch.jit.load(str(path), map_location=device).eval()
+
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        with torch.inference_mode():
+            return self.model(batch)
+
+
+class OnnxBackend(InferenceBackend):
+    """ONNX Runtime trên CPU (onnxruntime là dependency tuỳ chọn)."""
+
+    name = "onnx"
+
+    def __init__(self, path: Path, intra_op_threads: int = 0):
+        try:
+            import onnxruntime as ort
+        except ImportError as exc:
+            raise RuntimeError(
+                "INFER_ENGINE='onnx' cần cài onnxruntime: pip install onnxruntime"
+            ) from exc
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads > 0:
+            opts.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(
+            str(path), sess_options=opts, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        x = np.ascontiguousarray(batch.detach().cpu().numpy(), dtype=np.float32)
+        (logits,) = self.session.run(None, {self.input_name: x})
+        return torch.from_numpy(logits)
+
+
+# ---------- export từ checkpoint eager ----------
+def _example_input(image_size: int, batch_size: int = 1) -> torch.Tensor:
+    return torch.randn(batch_size, 3, image_size, image_size)
+
+
+def export_torchscript(model: torch.nn.Module, path: Path, image_size: int = 224) -> Path:
+    model = model.eval().cpu()
+    with torch.no_grad():
+        traced = torch.jit.trace(model, _example_input(image_size))
+        frozen = torch.jit.freeze(traced)
+        optimized = torch.jit.optimize_for_inference(frozen)
+    optimized.save(str(path))
+    return path
+
+
+def export_onnx(model: torch.nn.Module, path: Path, image_size: int = 224, opset: int = 17) -> Path:
+    model = model.eval().cpu()
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            _example_input(image_size),
+            str(path),
+            input_names=["input"],
+            output_names=["logits"],
+            dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+            opset_version=opset,
+        )
+    return path
@@ -0,0 +1,150 @@
+# app/ml/batching.py
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Sequence
+
+# Sentinel để dừng worker thread
+_STOP = object()
+
+
+class MicroBatchScheduler:
+    """
+    Gộp các input từ nhiều request đồng thời thành 1 batch rồi chạy 1 lần forward.
+
+    - submit(item) trả về Future, caller gọi .result() để lấy kết quả của riêng mình.
+    - Worker lấy item đầu tiên, sau đó chờ thêm tối đa `max_wait_ms`
+      hoặc tới khi đủ `max_batch_size` item thì chạy `run_batch(items)`.
+    - `run_batch` nhận list item, trả về list kết quả cùng thứ tự.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        name: str = "gesture-batcher",
+    ):
+        self._run_batch = run_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # thống kê đơn giản (phục vụ benchmark / debug)
+        self.batches_run = 0
+        self.items_run = 0
+
+    # ---------- public API ----------
+    def submit(self, item: Any) -> Future:
+        if self._closed:
+            raise RuntimeError("MicroBatchScheduler đã bị đóng")
+        self._ensure_started()
+        fut: Future = Future()
+        self._queue.put((item, fut))
+        return fut
+
+    def run(self, item: Any) -> Any:
+        """Tiện ích: submit rồi chờ kết quả luôn."""
+        return self.submit(item).result()
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.items_run / self.batches_run if self.batches_run else 0.0
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def close(self, timeout: float | None = 5.0):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    # ---------- internal ----------
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                t = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                t.start()
+                self._thread = t
+
+    def _collect_batch(self, first) -> tuple[list, bool]:
+        batch = [first]
+        stop = False
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    nxt = self._queue.get(timeout=remaining)
+                else:
+                    nxt = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if nxt is _STOP:
+                stop = True
+                break
+            batch.append(nxt)
+
+        return batch, stop
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+
+            batch, stop = self._collect_batch(first)
+            self._dispatch(batch)
+            if stop:
+                break
+
+        # đóng: huỷ các request còn sót trong hàng đợi
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                item[1].set_exception(RuntimeError("MicroBatchScheduler đã bị đóng"))
+
+    def _dispatch(self, batch: list):
+        # bỏ qua các Future đã bị cancel từ phía caller
+        live = [(item, fut) for item, fut in batch if fut.set_running_or_notify_cancel()]
+        if not live:
+            return
+
+        items = [item for item, _ in live]
+        try:
+            results = self._run_batch(items)
+        except BaseException as exc:  # trả lỗi về cho từng caller
+            for _, fut in live:
+                fut.set_exception(exc)
+            return
+
+        # run_batch trả thiếu / thừa dòng → không ghép được kết quả với caller, báo lỗi cho cả batch
+        if len(results) != len(live):
+            exc = RuntimeError(f"run_batch trả {len(results)} kết quả cho {len(live)} input")
+            for _, fut in live:
+                fut.set_exception(exc)
+            return
+
+        self.batches_run += 1
+        self.items_run += len(items)
+
+        for (_, fut), res in zip(live, results):
+            fut.set_result(res)
@@ -0,0 +1,129 @@
+# app/ml/detector_pool.py
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable
+
+
+class HandsDetectorPool:
+    """
+    Pool có giới hạn các detector MediaPipe Hands.
+
+    Mỗi graph MediaPipe không an toàn khi nhiều thread gọi .process() cùng lúc,
+    nên mỗi request mượn riêng 1 detector (checkout) rồi trả lại khi xong.
+    Detector được tạo dần khi cần, tối đa `size` cái; hết detector rảnh thì chờ.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int):
+        self._factory = factory
+        self.size = max(1, int(size))
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @property
+    def created(self) -> int:
+        return self._created
+
+    def idle_count(self) -> int:
+        return self._idle.qsize()
+
+    def _acquire(self, timeout: float | None):
+        # ưu tiên detector đang rảnh (LIFO → detector "nóng" được dùng lại)
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+
+        if create:
+            try:
+                return self._factory()
+            except BaseException:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("Hết detector MediaPipe rảnh trong pool") from None
+
+    def _release(self, detector):
+        with self._lock:
+            surplus = self._created > self.size
+            if surplus:
+                self._created -= 1
+        if surplus:
+            # pool vừa bị thu nhỏ (resize) → đóng detector thừa thay vì trả về pool
+            self._close(detector)
+        else:
+            self._idle.put(detector)
+
+    @staticmethod
+    def _close(detector):
+        close = getattr(detector, "close", None)
+        if close is not None:
+            close()
+
+    def resize(self, size: int):
+        """
+        Đổi số detector tối đa lúc đang chạy (vd: autotune).
+        Thu nhỏ: đóng ngay detector rảnh dư, detector đang được mượn bị đóng khi trả lại.
+        """
+        with self._lock:
+            self.size = max(1, int(size))
+        while True:
+            with self._lock:
+                if self._created <= self.size:
+                    return
+                try:
+                    detector = self._idle.get_nowait()
+                except queue.Empty:
+                    return
+                self._created -= 1
+            self._close(detector)
+
+    def prefill(self):
+        """Tạo sẵn đủ `size` detector (dùng khi warmup)."""
+        while True:
+            with self._lock:
+                if self._created >= self.size:
+                    return
+                self._created += 1
+            try:
+                self._idle.put(self._factory())
+            except BaseException:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+    @contextmanager
+    def checkout(self, timeout: float | None = None):
+        """
+        with pool.checkout() as hands:
+            hands.process(frame_rgb)
+        """
+        detector = self._acquire(timeout)
+        try:
+            yield detector
+        finally:
+            self._release(detector)
+
+    def close(self):
+        """Đóng các detector đang rảnh (gọi khi shutdown)."""
+        while True:
+            try:
+                detector = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close(detector)
+            with self._lock:
+                self._created -= 1
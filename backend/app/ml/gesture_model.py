@@ -1,18 +1,31 @@
 # app/ml/gesture_model.py
 
 import os
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
 
 import cv2
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
-from torchvision import transforms
 from torchvision.models import resnet18
-from PIL import Image
 import numpy as np
 import mediapipe as mp
 
+from ..core.config import settings
+from ..core.metrics import STAGE_SECONDS, Counter, Gauge, Histogram
+from ..core.tracing import span
+from .admission import InferenceExecutor
+from .backends import EagerBackend, InferenceBackend, OnnxBackend, TorchScriptBackend
+from .batching import MicroBatchScheduler
+from .detector_pool import HandsDetectorPool
+from .landmark_classifier import CascadeStats, LandmarkClassifier
+from .landmarks import LandmarkGate, normalize_landmarks
+from .model_registry import ModelRegistry, ModelVersion
+from .session_tracker import SessionTrackerRegistry
+
 # 1. Cấu hình chung
 
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
@@ -27,25 +40,83 @@ IMAGENET_STD  = [0.229, 0.224, 0.225]
 # Tìm đường dẫn tới file .pth trong thư mục backend/models/
 ROOT_DIR = Path(__file__).resolve().parents[2]   # .../backend
 MODEL_PATH = ROOT_DIR / "models" / "ResNet18_merged_phase2_epoch14_loss3_17_11_2025_09_27_35.pth"
+# File export từ checkpoint trên (scripts/export_model.py)
+TORCHSCRIPT_PATH = MODEL_PATH.with_suffix(".torchscript.pt")
+ONNX_PATH = MODEL_PATH.with_suffix(".onnx")
+# Checkpoint INT8 (scripts/quantize_model.py), chỉ chạy trên CPU
+QUANTIZED_MODEL_PATH = MODEL_PATH.with_suffix(".int8.pth")
+# MLP trên landmark (scripts/train_landmark_mlp.py); không có file → bỏ qua tầng cascade
+LANDMARK_MLP_PATH = ROOT_DIR / "models" / "landmark_mlp.pth"
+
+# Registry checkpoint theo version (scripts/publish_model.py); chưa có CURRENT → dùng các file ở trên
+MODEL_REGISTRY_DIR = ROOT_DIR / "models" / "registry"
+LEGACY_MODEL_VERSION = "legacy"
+model_registry = ModelRegistry(MODEL_REGISTRY_DIR)
+
+# Metric (GET /metrics): child theo stage bind sẵn để hot path chỉ còn 1 lần observe
+_IMDECODE_SECONDS = STAGE_SECONDS.labels("imdecode")
+_DETECT_SECONDS = STAGE_SECONDS.labels("detect")
+_PREPROCESS_SECONDS = STAGE_SECONDS.labels("preprocess")
+_FORWARD_SECONDS = STAGE_SECONDS.labels("forward")
+_LANDMARK_MLP_SECONDS = STAGE_SECONDS.labels("landmark_mlp")
+PREDICTIONS_TOTAL = Counter(
+    "gesture_predictions_total", "Số frame có tay theo nhãn và tầng cho ra kết quả", ["label", "source"]
+)
+NO_HAND_TOTAL = Counter("gesture_no_hand_total", "Số frame không phát hiện tay")
+REUSED_TOTAL = Counter("gesture_reused_total", "Số frame dùng lại kết quả nhờ landmark gate")
+FORWARD_BATCH_SIZE = Histogram(
+    "gesture_forward_batch_size", "Số crop trong 1 lần forward ResNet18", buckets=(1, 2, 4, 8, 16, 32)
+)
+MODEL_INFO = Gauge("gesture_model_info", "Version model đang phục vụ (1 = active)", ["version"])
 
 # Mediapipe
 mp_hands = mp.solutions.hands
 
-# detector dùng chung (realtime/webcam / frame)
-hands_detector = mp_hands.Hands(
-    static_image_mode=False,
-    max_num_hands=1,
-    min_detection_confidence=0.5,
-    min_tracking_confidence=0.5
-)
 
-# detector riêng cho ảnh tĩnh
-hands_static = mp_hands.Hands(
-    static_image_mode=True,
-    max_num_hands=1,
-    min_detection_confidence=0.5
+def make_static_hands():
+    """Detector cho ảnh tĩnh: mỗi frame chạy palm detection đầy đủ."""
+    return mp_hands.Hands(
+        static_image_mode=True,
+        max_num_hands=1,
+        min_detection_confidence=0.5
+    )
+
+
+# Pool detector ảnh tĩnh: mỗi request (thread) mượn 1 graph riêng
+hands_static_pool = HandsDetectorPool(make_static_hands, size=settings.hands_pool_size)
+
+def make_tracking_hands():
+    """Detector tracking: frame sau dùng landmark của frame trước, chỉ detect lại khi mất tay."""
+    return mp_hands.Hands(
+        static_image_mode=False,
+        max_num_hands=1,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+
+# Detector tracking theo session (user / stream) cho client streaming
+tracking_sessions = SessionTrackerRegistry(
+    make_tracking_hands,
+    max_sessions=settings.TRACKING_MAX_SESSIONS,
+    ttl_seconds=settings.TRACKING_SESSION_TTL_SECONDS,
 )
 
+# detector tracking (realtime/webcam) cho 1 luồng video duy nhất, ví dụ demo_webcam.
+# Có state tracking nên không chia sẻ giữa nhiều client → khoá khi dùng.
+# Tạo lazy ở lần dùng đầu tiên.
+_hands_detector = None
+_hands_detector_lock = threading.Lock()
+
+
+def get_tracking_detector():
+    global _hands_detector
+    if _hands_detector is None:
+        with _hands_detector_lock:
+            if _hands_detector is None:
+                _hands_detector = make_tracking_hands()
+    return _hands_detector
+
 # 2. Build & load model
 def build_model(num_classes: int):
     model = resnet18(weights=None)
@@ -54,6 +125,9 @@ def build_model(num_classes: int):
     return model
 
 def load_trained_model(model_path=MODEL_PATH, device=DEVICE):
+    if str(model_path).endswith(".int8.pth"):
+        return load_quantized_model(model_path)
+
     model = build_model(NUM_CLASSES)
     state = torch.load(model_path, map_location=device)
     model.load_state_dict(state)
@@ -62,43 +136,386 @@ def load_trained_model(model_path=MODEL_PATH, device=DEVICE):
     print(f"✅ Loaded model from {model_path}")
     return model
 
-# Model global, load 1 lần
-model = load_trained_model()
+def load_quantized_model(model_path=QUANTIZED_MODEL_PATH):
+    """Load checkpoint INT8: dựng khung model đã fuse + convert rồi nạp state_dict."""
+    from .quantize import build_quantized_skeleton
+
+    model = build_quantized_skeleton(NUM_CLASSES, backend=settings.QUANT_BACKEND)
+    state = torch.load(model_path, map_location="cpu")
+    model.load_state_dict(state)
+    model.eval()
+    print(f"✅ Loaded INT8 model from {model_path}")
+    return model
+
+def load_inference_backend(engine: str | None = None, model_version: ModelVersion | None = None):
+    """
+    Tạo engine suy luận theo settings.INFER_ENGINE:
+    - "eager": PyTorch eager từ checkpoint .pth
+    - "torchscript": TORCHSCRIPT_PATH (freeze + optimize_for_inference)
+    - "onnx": ONNX_PATH chạy bằng ONNX Runtime CPU
+    - "int8": QUANTIZED_MODEL_PATH (ResNet18 quantized static INT8, CPU)
+    Có `model_version` → lấy file tương ứng trong thư mục version của registry.
+    """
+    engine = engine or settings.INFER_ENGINE
+    if model_version is not None:
+        paths = {e: model_version.checkpoint(e) for e in ("eager", "torchscript", "onnx", "int8")}
+    else:
+        paths = {"eager": MODEL_PATH, "torchscript": TORCHSCRIPT_PATH, "onnx": ONNX_PATH, "int8": QUANTIZED_MODEL_PATH}
+
+    if engine == "eager":
+        return EagerBackend(load_trained_model(paths["eager"]))
+    if engine == "torchscript":
+        backend = TorchScriptBackend(paths["torchscript"], device=DEVICE)
+        print(f"✅ Loaded TorchScript model from {paths['torchscript']}")
+        return backend
+    if engine == "onnx":
+        backend = OnnxBackend(paths["onnx"])
+        print(f"✅ Loaded ONNX model from {paths['onnx']}")
+        return backend
+    if engine == "int8":
+        return EagerBackend(load_quantized_model(paths["int8"]))
+    raise ValueError(f"INFER_ENGINE không hợp lệ: {engine!r}")
+
+
+@dataclass
+class LoadedModel:
+    """1 version đã load: ResNet18 (engine theo settings) + MLP landmark (nếu có)."""
+
+    version: str
+    backend: InferenceBackend
+    landmark_clf: LandmarkClassifier | None = None
+
+
+def load_model_version(version: str | None = None) -> LoadedModel:
+    """
+    Load 1 version trong registry (mặc định: version ghi trong CURRENT).
+    Registry chưa có CURRENT → model cũ MODEL_PATH / LANDMARK_MLP_PATH, version "legacy".
+    """
+    version = version or model_registry.current_version()
+    if version is None:
+        mlp_path = LANDMARK_MLP_PATH
+        loaded = LoadedModel(LEGACY_MODEL_VERSION, load_inference_backend())
+    else:
+        mv = model_registry.get(version)
+        mlp_path = mv.landmark_mlp
+        loaded = LoadedModel(version, load_inference_backend(model_version=mv))
+
+    if mlp_path.is_file():
+        loaded.landmark_clf = LandmarkClassifier.load(mlp_path)
+        print(f"✅ Loaded landmark MLP from {mlp_path}")
+    return loaded
+
+
+def _set_active(loaded: LoadedModel):
+    global _active
+    previous, _active = _active, loaded
+    if previous is not None and previous.version != loaded.version:
+        MODEL_INFO.labels(previous.version).set(0)
+    MODEL_INFO.labels(loaded.version).set(1)
+
+
+def _warmup_model(loaded: LoadedModel):
+    # chạy forward với các kích thước batch hay gặp trước khi nhận traffic thật
+    for n in {1, max(1, settings.INFER_MAX_BATCH_SIZE)}:
+        with torch.no_grad():
+            loaded.backend(torch.zeros(n, 3, IMAGE_SIZE, IMAGE_SIZE, device=DEVICE))
+    if loaded.landmark_clf is not None:
+        loaded.landmark_clf.predict(np.zeros((21, 3), dtype=np.float32))
+
+
+# Model đang phục vụ: load 1 lần ở lần dùng đầu tiên (hoặc khi warmup() lúc startup),
+# để import module này không phải trả chi phí load checkpoint.
+# Hot-swap chỉ gán lại tham chiếu: request đang chạy giữ tham chiếu cũ và chạy nốt trên model cũ.
+_active: LoadedModel | None = None
+_model_lock = threading.Lock()
+
+
+def get_active_model() -> LoadedModel:
+    if _active is None:
+        with _model_lock:
+            if _active is None:
+                _set_active(load_model_version())
+    return _active
+
+
+def active_model_version() -> str | None:
+    """Version process này đang phục vụ (None nếu chưa load)."""
+    return _active.version if _active is not None else None
+
+
+def get_model() -> InferenceBackend:
+    return get_active_model().backend
+
+
+def get_landmark_classifier() -> LandmarkClassifier | None:
+    return get_active_model().landmark_clf
+
+
+# Trạng thái lần đổi version gần nhất (GET /admin/models).
+# _swap_lock giữ suốt lúc load; _swap_status_lock chỉ bảo vệ swap_status (kiểm tra + đặt "loading")
+_swap_lock = threading.Lock()
+_swap_status_lock = threading.Lock()
+swap_status: dict = {"state": "idle", "version": None, "error": None}
+
+
+def _set_swap_status(**fields):
+    with _swap_status_lock:
+        swap_status.update(**fields)
+
+
+def activate_model_version(version: str) -> LoadedModel:
+    """
+    Load + warm-up version mới ở thread hiện tại rồi thay model đang phục vụ (atomic).
+    Mỗi lúc chỉ 1 lần đổi version.
+    """
+    with _swap_lock:
+        _set_swap_status(state="loading", version=version, error=None)
+        try:
+            loaded = load_model_version(version)
+            _warmup_model(loaded)
+        except Exception as exc:
+            _set_swap_status(state="failed", error=repr(exc))
+            raise
+        _set_active(loaded)
+        _set_swap_status(state="idle")
+        print(f"✅ Đang phục vụ model version {version}")
+        return loaded
+
+
+def activate_in_background(version: str, publish: bool = True) -> bool:
+    """
+    Đổi version ở thread nền. `publish=True`: thành công thì ghi CURRENT để các
+    process khác (uvicorn worker / inference worker) đổi theo qua watcher.
+    Trả False nếu đang có 1 lần đổi version khác.
+    """
+    # kiểm tra + đặt "loading" trong 1 lần giữ lock: 2 lời gọi đồng thời chỉ 1 cái được chạy
+    with _swap_status_lock:
+        if swap_status["state"] == "loading":
+            return False
+        swap_status.update(state="loading", version=version, error=None)
+
+    def _run():
+        try:
+            activate_model_version(version)
+        except Exception as exc:
+            print(f"❌ Không load được model version {version}: {exc!r}")
+            return
+        if publish:
+            model_registry.set_current(version)
+
+    threading.Thread(target=_run, name="gesture-model-swap", daemon=True).start()
+    return True
+
+
+def start_model_watcher(interval: float | None = None) -> threading.Thread | None:
+    """
+    Thread nền đọc CURRENT mỗi `interval` giây; version đổi → load + swap.
+    interval <= 0 → không chạy.
+    """
+    interval = settings.MODEL_WATCH_INTERVAL_SECONDS if interval is None else interval
+    if interval <= 0:
+        return None
+
+    def _run():
+        failed = None
+        while True:
+            time.sleep(interval)
+            version = model_registry.current_version()
+            if version is None or version == failed or _active is None or version == _active.version:
+                continue
+            try:
+                activate_model_version(version)
+                failed = None
+            except Exception as exc:
+                # không thử lại liên tục với cùng 1 version hỏng
+                failed = version
+                print(f"❌ Không load được model version {version}: {exc!r}")
+
+    t = threading.Thread(target=_run, name="gesture-model-watcher", daemon=True)
+    t.start()
+    return t
+
+
+def forward_batch(tensors: list, active: LoadedModel | None = None) -> list:
+    """
+    Chạy 1 lần forward cho nhiều tensor (3, H, W) (hoặc 1 tensor (N, 3, H, W))
+    → list (label, prob, model_version) cùng thứ tự.
+    `active`: model đã chọn trước cho frame (mặc định: model đang phục vụ).
+    """
+    batch = tensors if isinstance(tensors, torch.Tensor) else torch.stack(tensors)
+    batch = batch.to(DEVICE)
+    # lấy tham chiếu 1 lần: cả batch chạy trên cùng 1 version dù có hot-swap giữa chừng
+    if active is None:
+        active = get_active_model()
+    FORWARD_BATCH_SIZE.observe(len(batch))
+    with _FORWARD_SECONDS.time(), torch.no_grad():
+        logits = active.backend(batch)
+        probs = F.softmax(logits, dim=1)
+        pred_prob, pred_idx = probs.max(dim=1)
+
+    return [
+        (CLASS_NAMES[idx], prob, active.version)
+        for idx, prob in zip(pred_idx.tolist(), pred_prob.tolist())
+    ]
+
+
+def _forward_items(items: list) -> list:
+    """
+    run_batch của batch_scheduler: item = (tensor, LoadedModel của frame).
+    Lúc hot-swap 1 batch có thể lẫn 2 version → forward riêng từng nhóm, giữ thứ tự.
+    """
+    results: list = [None] * len(items)
+    groups: dict[int, list[int]] = {}
+    for i, (_, active) in enumerate(items):
+        groups.setdefault(id(active), []).append(i)
+    for idxs in groups.values():
+        out = forward_batch([items[i][0] for i in idxs], items[idxs[0]][1])
+        for i, res in zip(idxs, out):
+            results[i] = res
+    return results
+
+
+# Scheduler gộp crop tay từ các request đồng thời (thread worker start khi submit lần đầu)
+batch_scheduler = MicroBatchScheduler(
+    _forward_items,
+    max_batch_size=settings.INFER_MAX_BATCH_SIZE,
+    max_wait_ms=settings.INFER_MAX_WAIT_MS,
+)
+
+
+# Admission control cho endpoint: giới hạn số frame đang chạy / chờ, bỏ frame quá deadline
+inference_executor = InferenceExecutor(
+    max_workers=settings.inference_threads,
+    max_queue=settings.INFER_QUEUE_DEPTH,
+    deadline_ms=settings.INFER_DEADLINE_MS,
+)
+
+Gauge("gesture_executor_queue_depth", "Số frame đang chờ trong executor suy luận").set_function(
+    lambda: inference_executor.snapshot()["queued"]
+)
+Gauge("gesture_executor_busy", "Số frame đang được xử lý").set_function(
+    lambda: inference_executor.snapshot()["busy"]
+)
+Gauge("gesture_batcher_queue_depth", "Số crop chờ micro-batching").set_function(batch_scheduler.qsize)
+
+
+def configure_torch_threads():
+    """Số thread PyTorch khớp với số forward chạy song song (gọi 1 lần lúc startup)."""
+    torch.set_num_threads(settings.torch_threads)
+    try:
+        torch.set_num_interop_threads(max(1, settings.TORCH_INTEROP_THREADS))
+    except RuntimeError:
+        pass  # chỉ đặt được trước khi PyTorch chạy op song song đầu tiên
+
+
+def classify_tensor(input_tensor: torch.Tensor, active: LoadedModel | None = None):
+    """Phân loại 1 tensor (1, 3, H, W), qua micro-batching nếu được bật."""
+    if active is None:
+        active = get_active_model()
+    # span gồm cả thời gian chờ gom batch + forward (forward chạy trên thread batcher)
+    with span("inference"):
+        if settings.INFER_BATCHING:
+            return batch_scheduler.run((input_tensor[0], active))
+        return forward_batch(input_tensor, active)[0]
+
+# 3. Tiền xử lý ảnh đầu vào
+# Gộp Resize + ToTensor + Normalize: resize bằng OpenCV rồi chuẩn hoá thẳng vào
+# tensor NCHW float32 cấp phát sẵn, không qua PIL.
+_NORM_MEAN = (np.array(IMAGENET_MEAN, dtype=np.float32) * 255.0)[:, None, None]
+_NORM_INV_STD = (1.0 / (np.array(IMAGENET_STD, dtype=np.float32) * 255.0))[:, None, None]
+
+_thread_buffers = threading.local()
+
+
+def _normalize_into(crop_rgb: np.ndarray, out: torch.Tensor):
+    """crop RGB uint8 (H, W, 3) → ghi vào out (3, IMAGE_SIZE, IMAGE_SIZE) float32 (CPU)."""
+    h, w = crop_rgb.shape[:2]
+    # thu nhỏ: INTER_AREA (gần với Resize có antialias của torchvision); phóng to: bilinear
+    interp = cv2.INTER_AREA if h > IMAGE_SIZE or w > IMAGE_SIZE else cv2.INTER_LINEAR
+    resized = cv2.resize(crop_rgb, (IMAGE_SIZE, IMAGE_SIZE), interpolation=interp)
+
+    out_np = out.numpy()
+    # HWC uint8 → CHW float32: (x - mean*255) / (std*255), in-place trên out
+    np.subtract(resized.transpose(2, 0, 1), _NORM_MEAN, out=out_np)
+    np.multiply(out_np, _NORM_INV_STD, out=out_np)
+
+
+def preprocess_rgb(crop_rgb: np.ndarray, out: torch.Tensor | None = None) -> torch.Tensor:
+    """Crop RGB → tensor (1, 3, H, W). Truyền `out` để dùng lại buffer có sẵn."""
+    if out is None:
+        out = torch.empty(1, 3, IMAGE_SIZE, IMAGE_SIZE)
+    with _PREPROCESS_SECONDS.time(), span("preprocess"):
+        _normalize_into(crop_rgb, out[0])
+    return out
+
+
+def preprocess_batch(crops_rgb: list, out: torch.Tensor | None = None) -> torch.Tensor:
+    """Nhiều crop RGB → 1 tensor (N, 3, H, W) cấp phát 1 lần."""
+    if out is None:
+        out = torch.empty(len(crops_rgb), 3, IMAGE_SIZE, IMAGE_SIZE)
+    for i, crop in enumerate(crops_rgb):
+        _normalize_into(crop, out[i])
+    return out
+
+
+def _thread_input_buffer() -> torch.Tensor:
+    """
+    Buffer (1, 3, H, W) riêng cho mỗi thread. An toàn để dùng lại vì thread gọi
+    classify_tensor() luôn chờ có kết quả (batch đã copy xong) rồi mới xử lý frame tiếp.
+    """
+    buf = getattr(_thread_buffers, "input", None)
+    if buf is None:
+        buf = _thread_buffers.input = torch.empty(1, 3, IMAGE_SIZE, IMAGE_SIZE)
+    return buf
 
-# 3. Transform cho ảnh đầu vào
-transform_infer = transforms.Compose([
-    transforms.Resize((IMAGE_SIZE, IMAGE_SIZE)),
-    transforms.ToTensor(),
-    transforms.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD),
-])
 
 def preprocess_from_cv2(frame_bgr: np.ndarray) -> torch.Tensor:
     """Chuyển frame BGR (OpenCV) thành tensor cho model."""
     frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-    pil_img = Image.fromarray(frame_rgb)
-    tensor = transform_infer(pil_img).unsqueeze(0)
-    return tensor
+    return preprocess_rgb(frame_rgb)
+
+def downscale_for_detection(frame_rgb: np.ndarray, max_side: int) -> np.ndarray:
+    """Thu nhỏ frame để cạnh dài nhất <= max_side (0 = giữ nguyên)."""
+    h, w = frame_rgb.shape[:2]
+    longest = max(h, w)
+    if max_side <= 0 or longest <= max_side:
+        return frame_rgb
+    scale = max_side / float(longest)
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    return cv2.resize(frame_rgb, size, interpolation=cv2.INTER_AREA)
 
-def get_hand_bbox_from_mediapipe(frame_bgr, hands):
+
+def detect_hand(frame_bgr, hands, frame_rgb=None, max_side: int | None = None):
+    """
+    Chạy MediaPipe, trả (bbox, landmarks) của bàn tay đầu tiên hoặc None.
+    landmarks: mảng (21, 3) toạ độ chuẩn hoá (x, y trong [0, 1], z tương đối).
+    """
     h, w = frame_bgr.shape[:2]
 
-    # Mediapipe dùng RGB
-    frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-    results = hands.process(frame_rgb)
+    # Mediapipe dùng RGB (truyền frame_rgb nếu đã convert sẵn)
+    if frame_rgb is None:
+        frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+
+    # Chạy MediaPipe trên bản thu nhỏ; landmark là toạ độ chuẩn hoá [0, 1]
+    # nên nhân với (w, h) của frame gốc là ra bbox ở độ phân giải đầy đủ.
+    if max_side is None:
+        max_side = settings.DETECT_MAX_SIDE
+    with _DETECT_SECONDS.time(), span("detect"):
+        results = hands.process(downscale_for_detection(frame_rgb, max_side))
 
     if not results.multi_hand_landmarks:
         return None
 
     # Lấy bàn tay đầu tiên
     hand_landmarks = results.multi_hand_landmarks[0]
+    points = np.array(
+        [(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark], dtype=np.float32
+    )
 
-    xs = [lm.x for lm in hand_landmarks.landmark]
-    ys = [lm.y for lm in hand_landmarks.landmark]
-
-    x_min = min(xs) * w
-    x_max = max(xs) * w
-    y_min = min(ys) * h
-    y_max = max(ys) * h
+    x_min = float(points[:, 0].min()) * w
+    x_max = float(points[:, 0].max()) * w
+    y_min = float(points[:, 1].min()) * h
+    y_max = float(points[:, 1].max()) * h
 
     # mở rộng box
     margin = 0.2
@@ -113,7 +530,12 @@ def get_hand_bbox_from_mediapipe(frame_bgr, hands):
     if x_max <= x_min or y_max <= y_min:
         return None
 
-    return x_min, y_min, x_max, y_max
+    return (x_min, y_min, x_max, y_max), points
+
+
+def get_hand_bbox_from_mediapipe(frame_bgr, hands, frame_rgb=None, max_side: int | None = None):
+    detection = detect_hand(frame_bgr, hands, frame_rgb=frame_rgb, max_side=max_side)
+    return detection[0] if detection is not None else None
 
 # # 4. Hàm core: dự đoán từ 1 frame BGR (OpenCV)
 # def predict_from_bgr(frame_bgr: np.ndarray, use_static_detector: bool = True):
@@ -159,48 +581,256 @@ def get_hand_bbox_from_mediapipe(frame_bgr, hands):
 #     return label,
 
 # 4. Hàm core: dự đoán từ 1 frame BGR (OpenCV)
-def predict_from_bgr(frame_bgr: np.ndarray, use_static_detector: bool = True):
-    """
-    Nhận frame BGR (ảnh đã đọc bằng cv2), trả về (label, prob, has_hand).
-    Dùng Mediapipe để crop tay nếu phát hiện được.
-    """
-    hands = hands_static if use_static_detector else hands_detector
+@dataclass
+class GesturePrediction:
+    """Kết quả nhận diện 1 frame."""
 
-    bbox = get_hand_bbox_from_mediapipe(frame_bgr, hands)
+    label: str
+    confidence: float
+    has_hand: bool
+    # True: tay gần như đứng yên so với frame trước → dùng lại kết quả, không chạy CNN
+    reused: bool = False
+    # tầng đã cho ra nhãn: "resnet" hoặc "landmark_mlp" (cascade nhanh)
+    source: str = "resnet"
+    # version model (registry) đã cho ra kết quả; None khi không có tay
+    model_version: str | None = None
 
-    # ❗ Không thấy tay: không chạy model, trả luôn no_hand
-    if bbox is None:
-        return "no_hand", 0.0, False
 
+def _no_hand() -> GesturePrediction:
+    return GesturePrediction(label="no_hand", confidence=0.0, has_hand=False)
+
+
+# Bỏ qua CNN khi landmark gần như không đổi giữa các frame của 1 session
+landmark_gate = LandmarkGate(
+    threshold=settings.LANDMARK_GATE_THRESHOLD,
+    max_age_seconds=settings.LANDMARK_GATE_MAX_AGE_SECONDS,
+)
+
+
+# Thống kê tầng 1 của cascade (MLP trên landmark, load cùng version model)
+cascade_stats = CascadeStats()
+
+
+def _classify_crop(frame_rgb: np.ndarray, bbox, active: LoadedModel) -> tuple[str, float, str]:
     # Có tay -> crop vùng tay
     x1, y1, x2, y2 = bbox
-    hand_bgr = frame_bgr[y1:y2, x1:x2]
+    hand_rgb = frame_rgb[y1:y2, x1:x2]
+
+    input_tensor = preprocess_rgb(hand_rgb, out=_thread_input_buffer())
+    return classify_tensor(input_tensor, active)
+
+
+def _classify_hand(frame_rgb: np.ndarray, bbox, points: np.ndarray) -> GesturePrediction:
+    """
+    Cascade: MLP trên landmark trước; chỉ khi độ tự tin < LANDMARK_CASCADE_THRESHOLD
+    mới crop + chạy ResNet18.
+    """
+    # 1 snapshot cho cả frame: MLP và ResNet fallback cùng version dù có hot-swap giữa chừng
+    active = get_active_model()
+    clf = active.landmark_clf if settings.LANDMARK_CASCADE_ENABLED else None
+    if clf is not None:
+        with _LANDMARK_MLP_SECONDS.time(), span("landmark_mlp"):
+            label, prob = clf.predict(points)
+        fast = prob >= settings.LANDMARK_CASCADE_THRESHOLD
+        cascade_stats.record(fast)
+        if fast:
+            return GesturePrediction(label, prob, True, source="landmark_mlp", model_version=active.version)
+
+    label, prob, version = _classify_crop(frame_rgb, bbox, active)
+    return GesturePrediction(label, prob, True, model_version=version)
+
+
+def _predict_in_session(frame_bgr, frame_rgb, sess) -> GesturePrediction:
+    detection = detect_hand(frame_bgr, sess.hands, frame_rgb=frame_rgb)
+    if detection is None:
+        sess.state.pop("gate", None)
+        return _no_hand()
+
+    bbox, points = detection
+    if not settings.LANDMARK_GATE_ENABLED:
+        return _classify_hand(frame_rgb, bbox, points)
+
+    landmarks = normalize_landmarks(points)
+    now = time.monotonic()
+    cached = landmark_gate.lookup(sess.state, landmarks, now)
+    if cached is not None:
+        label, prob, source, version = cached
+        return GesturePrediction(label, prob, True, reused=True, source=source, model_version=version)
+
+    t0 = time.perf_counter()
+    pred = _classify_hand(frame_rgb, bbox, points)
+    landmark_gate.store(
+        sess.state, landmarks, (pred.label, pred.confidence, pred.source, pred.model_version), now,
+        (time.perf_counter() - t0) * 1000.0,
+    )
+    return pred
+
+
+def predict_from_bgr(
+    frame_bgr: np.ndarray,
+    use_static_detector: bool = True,
+    session_id: str | None = None,
+) -> GesturePrediction:
+    """
+    Nhận frame BGR (ảnh đã đọc bằng cv2), trả về GesturePrediction.
+    Dùng Mediapipe để crop tay nếu phát hiện được.
+    Có `session_id` (frame liên tiếp của 1 stream) → dùng detector tracking của session
+    và có thể dùng lại kết quả frame trước nếu tay không đổi tư thế.
+    """
+    # BGR → RGB 1 lần, dùng chung cho MediaPipe và tiền xử lý crop
+    frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
 
-    input_tensor = preprocess_from_cv2(hand_bgr).to(DEVICE)
+    if session_id is not None:
+        with tracking_sessions.session(session_id) as sess:
+            if sess is not None:
+                return _predict_in_session(frame_bgr, frame_rgb, sess)
+        # registry đầy và mọi session đang bận → fallback ảnh tĩnh
 
-    with torch.no_grad():
-        logits = model(input_tensor)
-        probs = F.softmax(logits, dim=1)[0]
-        pred_idx = int(torch.argmax(probs).item())
-        pred_prob = float(probs[pred_idx].item())
+    if use_static_detector or session_id is not None:
+        with hands_static_pool.checkout() as hands:
+            detection = detect_hand(frame_bgr, hands, frame_rgb=frame_rgb)
+    else:
+        hands = get_tracking_detector()
+        with _hands_detector_lock:
+            detection = detect_hand(frame_bgr, hands, frame_rgb=frame_rgb)
 
-    label = CLASS_NAMES[pred_idx]
-    return label, pred_prob, True
+    # ❗ Không thấy tay: không chạy model, trả luôn no_hand
+    if detection is None:
+        return _no_hand()
+
+    bbox, points = detection
+    return _classify_hand(frame_rgb, bbox, points)
 
 
 # 5. Hàm dùng cho FastAPI: từ bytes ảnh (upload hoặc base64 decode)
-def predict_image_bytes(image_bytes: bytes):
+def predict_image_bytes(image_bytes: bytes | memoryview, session_id: str | None = None):
     """
-    Nhận image_bytes (từ UploadFile hoặc base64 decode) → trả (label, prob, has_hand).
+    Nhận image_bytes (từ UploadFile hoặc base64 decode; memoryview cũng được, không copy)
+    → trả GesturePrediction.
+    `session_id`: định danh stream (vd "3:webcam") để dùng tracking giữa các frame.
     """
 
     # đọc bytes thành mảng np.uint8
     nparr = np.frombuffer(image_bytes, np.uint8)
-    frame_bgr = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    with _IMDECODE_SECONDS.time(), span("decode"):
+        frame_bgr = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
 
     if frame_bgr is None:
         raise ValueError("Không decode được ảnh từ bytes")
 
-    label, prob, has_hand = predict_from_bgr(frame_bgr, use_static_detector=True)
-    return label, prob, has_hand
+    if settings.INFER_BACKEND == "process":
+        pred = get_process_pool().predict(frame_bgr, session_id=session_id)
+    else:
+        pred = predict_from_bgr(frame_bgr, use_static_detector=True, session_id=session_id)
+
+    if not pred.has_hand:
+        NO_HAND_TOTAL.inc()
+    else:
+        PREDICTIONS_TOTAL.labels(pred.label, pred.source).inc()
+        if pred.reused:
+            REUSED_TOTAL.inc()
+    return pred
+
+
+# 6. Warm-up: load model + detector và chạy thử frame giả qua toàn bộ pipeline
+_ready = threading.Event()
+
+
+def warmup(num_frames: int = 2):
+    """
+    Gọi lúc startup để request thật đầu tiên không bị chậm:
+    load checkpoint, tạo đủ detector trong pool, chạy forward với frame giả.
+    """
+    if settings.INFER_BACKEND == "process":
+        # mỗi worker tự warmup trước khi báo ready
+        get_process_pool()
+        _ready.set()
+        return
+
+    get_active_model()
+    hands_static_pool.prefill()
+
+    dummy = np.zeros((480, 640, 3), dtype=np.uint8)
+    for _ in range(max(1, num_frames)):
+        # frame giả không có tay → chạy detection; crop giả → chạy preprocess + forward
+        predict_from_bgr(dummy, use_static_detector=True)
+        classify_tensor(preprocess_from_cv2(dummy[:200, :200]))
+
+    if settings.AUTOTUNE_ON_STARTUP and settings.tuning_profile is None:
+        from .autotune import autotune_on_startup
+
+        autotune_on_startup()
+
+    _ready.set()
+
+
+_warmup_error: str | None = None
+
+
+def warmup_in_background() -> threading.Thread:
+    """Chạy warmup() trong thread nền để server nhận /health/live ngay."""
+
+    def _run():
+        global _warmup_error
+        try:
+            warmup()
+        except Exception as exc:
+            _warmup_error = repr(exc)
+            print(f"❌ Warm-up thất bại: {exc!r}")
+
+    t = threading.Thread(target=_run, name="gesture-warmup", daemon=True)
+    t.start()
+    return t
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def warmup_error() -> str | None:
+    return _warmup_error
+
+
+# 7. Backend đa process (INFER_BACKEND = "process")
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    """Khởi tạo (1 lần) pool worker process, mỗi worker có model + detector riêng."""
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                from .process_pool import InferenceProcessPool
+
+                pool = InferenceProcessPool(
+                    num_workers=settings.inference_processes,
+                    slots_per_worker=settings.INFER_SHM_SLOTS,
+                    max_frame_pixels=settings.INFER_MAX_FRAME_PIXELS,
+                    # mỗi worker forward tuần tự → chia đều số core cho các worker
+                    torch_threads=settings.TORCH_THREADS
+                    or max(1, (os.cpu_count() or 1) // settings.inference_processes),
+                    timeout=settings.INFER_WORKER_TIMEOUT_SECONDS,
+                )
+                pool.start()
+                _process_pool = pool
+    return _process_pool
+
+
+def end_tracking_session(session_id: str):
+    """Đóng session tracking của 1 stream, ở process đang giữ session (thread hoặc worker)."""
+    if settings.INFER_BACKEND == "process":
+        if _process_pool is not None:
+            _process_pool.end_session(session_id)
+        return
+    tracking_sessions.remove(session_id)
+
+
+def shutdown_process_pool():
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.close()
+            _process_pool = None
 
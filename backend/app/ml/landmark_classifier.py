@@ -0,0 +1,106 @@
+# app/ml/landmark_classifier.py
+
+import threading
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from .landmarks import NUM_LANDMARKS, normalize_landmarks
+
+NUM_FEATURES = NUM_LANDMARKS * 3
+
+
+def landmark_features(points: np.ndarray) -> np.ndarray:
+    """21 landmark (x, y, z) → vector 63 chiều đã normalize (đầu vào của MLP)."""
+    return normalize_landmarks(points).reshape(-1)
+
+
+def mirror_points(points: np.ndarray) -> np.ndarray:
+    """Lật ngang (tay trái ↔ tay phải), dùng để augment khi train."""
+    mirrored = points.copy()
+    mirrored[:, 0] = 1.0 - mirrored[:, 0]
+    return mirrored
+
+
+def build_mlp(num_classes: int, hidden: tuple[int, ...] = (128, 64)) -> nn.Sequential:
+    layers: list[nn.Module] = []
+    in_features = NUM_FEATURES
+    for h in hidden:
+        layers += [nn.Linear(in_features, h), nn.ReLU()]
+        in_features = h
+    layers.append(nn.Linear(in_features, num_classes))
+    return nn.Sequential(*layers)
+
+
+def save_classifier(model: nn.Sequential, path: Path, class_names: list[str], hidden: tuple[int, ...]):
+    torch.save(
+        {"state_dict": model.state_dict(), "class_names": list(class_names), "hidden": list(hidden)},
+        path,
+    )
+
+
+class LandmarkClassifier:
+    """
+    MLP nhỏ trên landmark, chạy bằng numpy (batch 1 nhanh hơn gọi torch nhiều).
+    Trọng số lấy từ nn.Sequential đã train bằng scripts/train_landmark_mlp.py.
+    """
+
+    def __init__(self, state_dict: dict, class_names: list[str]):
+        self.class_names = list(class_names)
+        indices = sorted({int(k.split(".")[0]) for k in state_dict})
+        self.layers = [
+            (
+                state_dict[f"{i}.weight"].detach().cpu().numpy().astype(np.float32).T.copy(),
+                state_dict[f"{i}.bias"].detach().cpu().numpy().astype(np.float32),
+            )
+            for i in indices
+        ]
+
+    @classmethod
+    def load(cls, path: Path) -> "LandmarkClassifier":
+        ckpt = torch.load(path, map_location="cpu")
+        return cls(ckpt["state_dict"], ckpt["class_names"])
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        x = features.astype(np.float32, copy=False)
+        last = len(self.layers) - 1
+        for i, (w, b) in enumerate(self.layers):
+            x = x @ w + b
+            if i < last:
+                np.maximum(x, 0.0, out=x)
+        x = x - x.max(axis=-1, keepdims=True)
+        e = np.exp(x)
+        return e / e.sum(axis=-1, keepdims=True)
+
+    def predict(self, points: np.ndarray) -> tuple[str, float]:
+        probs = self.predict_proba(landmark_features(points))
+        idx = int(probs.argmax())
+        return self.class_names[idx], float(probs[idx])
+
+
+class CascadeStats:
+    """Đếm số frame được MLP xử lý luôn vs phải chuyển sang ResNet18."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.fast = 0
+        self.fallback = 0
+
+    def record(self, fast: bool):
+        with self._lock:
+            if fast:
+                self.fast += 1
+            else:
+                self.fallback += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            total = self.fast + self.fallback
+            return {
+                "frames": total,
+                "fast_path": self.fast,
+                "resnet_fallback": self.fallback,
+                "fast_path_rate": self.fast / total if total else 0.0,
+            }
@@ -0,0 +1,77 @@
+# app/ml/landmarks.py
+
+import threading
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+
+def normalize_landmarks(points: np.ndarray) -> np.ndarray:
+    """
+    21 landmark (x, y, z) của MediaPipe → dạng không phụ thuộc vị trí / kích thước tay:
+    gốc toạ độ tại cổ tay (điểm 0), chia cho khoảng cách xa nhất tới cổ tay trên mặt phẳng ảnh.
+    """
+    rel = points.astype(np.float32) - points[0]
+    scale = float(np.linalg.norm(rel[:, :2], axis=1).max())
+    if scale > 1e-6:
+        rel /= scale
+    return rel
+
+
+def landmark_delta(a: np.ndarray, b: np.ndarray) -> float:
+    """Độ dịch trung bình (x, y) giữa 2 bộ landmark đã normalize."""
+    return float(np.linalg.norm(a[:, :2] - b[:, :2], axis=1).mean())
+
+
+class LandmarkGate:
+    """
+    Bỏ qua CNN khi tay gần như đứng yên giữa các frame của cùng 1 session.
+
+    State lưu trong dict của session (TrackingSession.state): landmark + kết quả
+    của frame gần nhất đã chạy CNN. Frame mới có độ dịch < `threshold` và kết quả
+    cũ chưa quá `max_age_seconds` → dùng lại nhãn / độ tự tin.
+    """
+
+    def __init__(self, threshold: float, max_age_seconds: float):
+        self.threshold = threshold
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.hits = 0
+        self.saved_ms = 0.0
+        # EWMA thời gian preprocess + CNN, dùng ước lượng thời gian tiết kiệm mỗi lần hit
+        self._cnn_ms: float | None = None
+
+    def lookup(self, state: dict, landmarks: np.ndarray, now: float):
+        """Trả kết quả cũ (tuple đã store) nếu dùng lại được, ngược lại None."""
+        cached = state.get("gate")
+        hit = None
+        if cached is not None:
+            last_landmarks, result, ts = cached
+            if now - ts <= self.max_age_seconds and landmark_delta(landmarks, last_landmarks) < self.threshold:
+                hit = result
+
+        with self._lock:
+            self.checks += 1
+            if hit is not None:
+                self.hits += 1
+                self.saved_ms += self._cnn_ms or 0.0
+        return hit
+
+    def store(self, state: dict, landmarks: np.ndarray, result, now: float, cnn_ms: float):
+        state["gate"] = (landmarks, result, now)
+        with self._lock:
+            self._cnn_ms = cnn_ms if self._cnn_ms is None else 0.9 * self._cnn_ms + 0.1 * cnn_ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "threshold": self.threshold,
+                "max_age_seconds": self.max_age_seconds,
+                "checks": self.checks,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.checks if self.checks else 0.0,
+                "saved_ms_total": round(self.saved_ms, 1),
+                "cnn_ms_avg": round(self._cnn_ms or 0.0, 2),
+            }
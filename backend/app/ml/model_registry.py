@@ -0,0 +1,132 @@
+# app/ml/model_registry.py
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+# Cấu trúc thư mục registry:
+#   models/registry/CURRENT              ← tên version đang phục vụ
+#   models/registry/<version>/metadata.json
+#   models/registry/<version>/model.pth  (+ model.torchscript.pt / model.onnx / model.int8.pth / landmark_mlp.pth tuỳ chọn)
+CURRENT_FILE = "CURRENT"
+METADATA_FILE = "metadata.json"
+CHECKPOINT_FILES = {
+    "eager": "model.pth",
+    "torchscript": "model.torchscript.pt",
+    "onnx": "model.onnx",
+    "int8": "model.int8.pth",
+}
+LANDMARK_MLP_FILE = "landmark_mlp.pth"
+
+# tên version dùng làm tên thư mục + ghi vào prediction_logs.model_version (String(50))
+_VERSION_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,49}$")
+
+
+def is_valid_version(version: str) -> bool:
+    return bool(_VERSION_RE.match(version))
+
+
+@dataclass
+class ModelVersion:
+    version: str
+    path: Path
+    metadata: dict = field(default_factory=dict)
+
+    def checkpoint(self, engine: str) -> Path:
+        return self.path / CHECKPOINT_FILES[engine]
+
+    def engines(self) -> list[str]:
+        return [e for e, name in CHECKPOINT_FILES.items() if (self.path / name).is_file()]
+
+    @property
+    def landmark_mlp(self) -> Path:
+        return self.path / LANDMARK_MLP_FILE
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Thư mục chứa các version checkpoint + metadata.
+    Đổi version đang phục vụ = ghi file CURRENT (atomic); mọi process đều đọc cùng file.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def list_versions(self) -> list[ModelVersion]:
+        if not self.root.is_dir():
+            return []
+        return [
+            self.get(p.name)
+            for p in sorted(self.root.iterdir())
+            if p.is_dir() and is_valid_version(p.name) and (p / METADATA_FILE).is_file()
+        ]
+
+    def get(self, version: str) -> ModelVersion:
+        if not is_valid_version(version):
+            raise KeyError(version)
+        path = self.root / version
+        meta_path = path / METADATA_FILE
+        if not meta_path.is_file():
+            raise KeyError(version)
+        return ModelVersion(version, path, json.loads(meta_path.read_text()))
+
+    def current_version(self) -> str | None:
+        try:
+            version = (self.root / CURRENT_FILE).read_text().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def set_current(self, version: str):
+        self.get(version)  # KeyError nếu version không tồn tại
+        tmp = self.root / (CURRENT_FILE + ".tmp")
+        tmp.write_text(version + "\n")
+        os.replace(tmp, self.root / CURRENT_FILE)
+
+    def publish(
+        self,
+        version: str,
+        checkpoint: Path,
+        metadata: dict | None = None,
+        extra_files: dict[str, Path] | None = None,
+    ) -> ModelVersion:
+        """
+        Copy checkpoint (+ file export / landmark MLP) vào thư mục version mới.
+        Ghi vào thư mục tạm rồi rename → không bao giờ thấy version ghi dở.
+        """
+        if not is_valid_version(version):
+            raise ValueError(f"Tên version không hợp lệ: {version!r}")
+        target = self.root / version
+        if target.exists():
+            raise ValueError(f"Version {version!r} đã tồn tại")
+
+        tmp = self.root / f".{version}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        shutil.copy2(checkpoint, tmp / CHECKPOINT_FILES["eager"])
+        for name, src in (extra_files or {}).items():
+            shutil.copy2(src, tmp / name)
+
+        meta = {
+            "version": version,
+            "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "source": checkpoint.name,
+            "sha256": _sha256(checkpoint),
+            **(metadata or {}),
+        }
+        (tmp / METADATA_FILE).write_text(json.dumps(meta, indent=2, ensure_ascii=False))
+        os.replace(tmp, target)
+        return ModelVersion(version, target, meta)
@@ -0,0 +1,408 @@
+# app/ml/process_pool.py
+
+import itertools
+import logging
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from multiprocessing import get_context, resource_tracker, shared_memory
+from typing import Any
+
+import cv2
+import numpy as np
+
+from ..core.metrics import STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+# task điều khiển: ("end_session", session_id) → worker đóng detector tracking của session
+_END_SESSION = "end_session"
+
+
+class WorkerUnavailable(RuntimeError):
+    """Worker chết giữa chừng hoặc không trả kết quả / slot kịp thời hạn."""
+
+
+def _worker_main(idx: int, gen: int, shm_name: str, slot_bytes: int, task_q, result_q, torch_threads: int):
+    """
+    Vòng lặp của 1 worker process: có ResNet18 + detector riêng,
+    đọc frame trực tiếp từ slot trong shared memory (không pickle pixel).
+    """
+    import torch
+
+    torch.set_num_threads(max(1, torch_threads))
+
+    from ..core.config import settings
+
+    # worker xử lý tuần tự từng frame: chạy trực tiếp trong process, 1 detector,
+    # không micro-batching (chỉ thêm độ trễ)
+    settings.INFER_BACKEND = "thread"
+    settings.INFER_BATCHING = False
+    settings.HANDS_POOL_SIZE = 1
+    from . import gesture_model
+
+    gesture_model.warmup()
+    # process cha không giữ model: đổi version qua file CURRENT, mỗi worker tự theo dõi
+    gesture_model.start_model_watcher(settings.MODEL_WATCH_INTERVAL_SECONDS or 2.0)
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    # process cha sở hữu & unlink vùng nhớ; worker không đăng ký lại với resource tracker
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+    result_q.put(("ready", idx, gen))
+    try:
+        while True:
+            task = task_q.get()
+            if task is None:
+                break
+            if task[0] == _END_SESSION:
+                gesture_model.tracking_sessions.remove(task[1])
+                continue
+            req_id, slot, shape, session_id = task
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+            # histogram stage (detect, preprocess, forward, ...) của worker không lên /metrics
+            # của process cha → gửi phần tăng thêm của frame này kèm kết quả
+            before = STAGE_SECONDS.snapshot_all()
+            try:
+                res = gesture_model.predict_from_bgr(frame, use_static_detector=True, session_id=session_id)
+                err = None
+            except Exception as exc:
+                res, err = None, repr(exc)
+            finally:
+                del frame
+            result_q.put(("result", idx, gen, req_id, slot, res, err, STAGE_SECONDS.delta_since(before)))
+    finally:
+        shm.close()
+
+
+@dataclass
+class _WorkerHandle:
+    idx: int
+    gen: int  # tăng mỗi lần respawn; message của process cũ (gen khác) bị bỏ qua
+    process: Any
+    shm: shared_memory.SharedMemory
+    task_q: Any
+    free_slots: "queue.Queue[int]" = field(default_factory=queue.Queue)
+    inflight: int = 0
+    # req_id → slot của các frame đã gửi cho process này, chưa có kết quả
+    pending: dict[int, int] = field(default_factory=dict)
+    # True khi đã nhận ("ready", idx, gen): process đã load xong model, được nhận frame
+    ready: bool = False
+    dead: bool = False
+
+
+class InferenceProcessPool:
+    """
+    Backend suy luận đa process.
+
+    - Mỗi worker process giữ ResNet18 + MediaPipe riêng → không bị GIL giới hạn.
+    - Mỗi worker có 1 ring buffer gồm `slots_per_worker` slot trong shared memory;
+      process API copy frame BGR đã decode vào slot, chỉ gửi (req_id, slot, shape) qua queue.
+    - Request được gửi tới worker đang có ít frame in-flight nhất
+      (frame có session_id luôn về cùng 1 worker để giữ state tracking).
+    - Worker chết (OOM, segfault trong MediaPipe / torch): collector phát hiện qua
+      process.is_alive(), fail các frame đang chờ của worker đó rồi spawn worker mới ở thread
+      riêng; worker mới chỉ nhận frame sau khi gửi "ready" (load xong model).
+    - Thời gian từng stage đo trong worker (detect, preprocess, forward, ...) gửi kèm kết quả
+      và cộng vào STAGE_SECONDS của process cha → /metrics đủ stage ở cả mode "process".
+      Chờ slot và chờ kết quả đều có `timeout` → thread suy luận không bị treo mãi.
+    """
+
+    def __init__(
+        self,
+        num_workers: int,
+        slots_per_worker: int = 4,
+        max_frame_pixels: int = 1920 * 1080,
+        torch_threads: int = 1,
+        timeout: float = 10.0,
+    ):
+        self.num_workers = max(1, int(num_workers))
+        self.slots_per_worker = max(1, int(slots_per_worker))
+        self.max_frame_pixels = int(max_frame_pixels)
+        self.slot_bytes = self.max_frame_pixels * 3
+        self.torch_threads = torch_threads
+        self.timeout = timeout
+
+        self._ctx = None
+        self._workers: list[_WorkerHandle] = []
+        self._result_q = None
+        self._collector: threading.Thread | None = None
+        self._pending: dict[int, Future] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._started = False
+        self._closing = False
+        # shm của worker đã chết: đã unlink, chỉ close khi đóng pool (thread submit có thể còn đang ghi)
+        self._retired_shm: list[shared_memory.SharedMemory] = []
+        self.restarts = 0
+
+    # ---------- lifecycle ----------
+    def _spawn(self, idx: int, gen: int) -> _WorkerHandle:
+        shm = shared_memory.SharedMemory(create=True, size=self.slots_per_worker * self.slot_bytes)
+        task_q = self._ctx.Queue()
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(idx, gen, shm.name, self.slot_bytes, task_q, self._result_q, self.torch_threads),
+            name=f"gesture-infer-{idx}",
+            daemon=True,
+        )
+        proc.start()
+        handle = _WorkerHandle(idx=idx, gen=gen, process=proc, shm=shm, task_q=task_q)
+        for slot in range(self.slots_per_worker):
+            handle.free_slots.put(slot)
+        return handle
+
+    def start(self, timeout: float = 120.0):
+        if self._started:
+            return
+        self._closing = False
+        self._ctx = get_context("spawn")
+        self._result_q = self._ctx.Queue()
+
+        for i in range(self.num_workers):
+            self._workers.append(self._spawn(i, 0))
+
+        # chờ tất cả worker load xong model
+        while not all(w.ready for w in self._workers):
+            try:
+                msg = self._result_q.get(timeout=timeout)
+            except queue.Empty:
+                self.close()
+                raise RuntimeError("Worker suy luận không khởi động kịp") from None
+            if msg[0] == "ready":
+                self._mark_ready(msg[1], msg[2])
+
+        self._collector = threading.Thread(target=self._collect_results, name="gesture-infer-results", daemon=True)
+        self._collector.start()
+        self._started = True
+
+    def close(self, timeout: float = 5.0):
+        with self._lock:
+            # thread respawn kiểm tra _closing dưới lock → không thêm worker sau thời điểm này
+            self._closing = True
+            workers = list(self._workers)
+        for w in workers:
+            try:
+                w.task_q.put(None)
+            except Exception:
+                pass
+        for w in workers:
+            w.process.join(timeout)
+            if w.process.is_alive():
+                w.process.terminate()
+            if not w.dead:  # shm của worker chết đã unlink, nằm trong _retired_shm
+                w.shm.close()
+                w.shm.unlink()
+        for shm in self._retired_shm:
+            shm.close()
+        self._retired_shm = []
+
+        if self._result_q is not None:
+            self._result_q.put(None)
+        if self._collector is not None:
+            self._collector.join(timeout)
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for fut in pending.values():
+            if not fut.done():
+                fut.set_exception(WorkerUnavailable("InferenceProcessPool đã bị đóng"))
+
+        self._workers = []
+        self._started = False
+
+    # ---------- dispatch ----------
+    def _fit_frame(self, frame_bgr: np.ndarray) -> np.ndarray:
+        h, w = frame_bgr.shape[:2]
+        if h * w <= self.max_frame_pixels:
+            return frame_bgr
+        # frame lớn hơn slot → thu nhỏ giữ tỉ lệ
+        scale = (self.max_frame_pixels / float(h * w)) ** 0.5
+        new_size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        return cv2.resize(frame_bgr, new_size, interpolation=cv2.INTER_AREA)
+
+    def _acquire_slot(self, worker: _WorkerHandle) -> int:
+        """Chờ worker trả slot (ring buffer đầy), tối đa self.timeout giây."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            if worker.dead:
+                raise WorkerUnavailable(f"Worker {worker.idx} đã chết")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise WorkerUnavailable(f"Worker {worker.idx} không trả slot sau {self.timeout:.1f}s")
+            try:
+                return worker.free_slots.get(timeout=min(0.5, remaining))
+            except queue.Empty:
+                continue
+
+    def submit(self, frame_bgr: np.ndarray, session_id: str | None = None) -> Future:
+        if not self._started:
+            raise RuntimeError("InferenceProcessPool chưa được start()")
+
+        frame_bgr = self._fit_frame(frame_bgr)
+
+        with self._lock:
+            if session_id is not None:
+                # state tracking nằm trong worker → frame cùng session luôn về 1 worker
+                worker = self._session_worker(session_id)
+                if not worker.ready or worker.dead:
+                    raise WorkerUnavailable(f"Worker {worker.idx} đang khởi động lại")
+            else:
+                available = [w for w in self._workers if w.ready and not w.dead]
+                if not available:
+                    raise WorkerUnavailable("Không có worker suy luận nào sẵn sàng")
+                worker = min(available, key=lambda w: w.inflight)
+            worker.inflight += 1
+
+        try:
+            slot = self._acquire_slot(worker)
+        except WorkerUnavailable:
+            with self._lock:
+                worker.inflight -= 1
+            raise
+
+        view = np.ndarray(
+            frame_bgr.shape, dtype=np.uint8, buffer=worker.shm.buf, offset=slot * self.slot_bytes
+        )
+        view[...] = frame_bgr
+        del view
+
+        with self._lock:
+            if worker.dead:
+                # worker chết trong lúc copy frame → handle mới đã thay chỗ, không gửi nữa
+                raise WorkerUnavailable(f"Worker {worker.idx} đã chết")
+            req_id = next(self._ids)
+            fut: Future = Future()
+            self._pending[req_id] = fut
+            worker.pending[req_id] = slot
+            worker.task_q.put((req_id, slot, frame_bgr.shape, session_id))
+        return fut
+
+    def _session_worker(self, session_id: str) -> _WorkerHandle:
+        return self._workers[zlib.crc32(session_id.encode()) % len(self._workers)]
+
+    def end_session(self, session_id: str):
+        """
+        Đóng session tracking (client ngắt kết nối) trong worker giữ session đó.
+        Cùng task_q với frame → worker xử lý xong các frame trước của session rồi mới đóng.
+        """
+        if not self._started:
+            return
+        with self._lock:
+            worker = self._session_worker(session_id)
+            if worker.dead:
+                return  # process chết → session mất theo
+            worker.task_q.put((_END_SESSION, session_id))
+
+    def predict(self, frame_bgr: np.ndarray, session_id: str | None = None):
+        """Trả GesturePrediction giống predict_from_bgr."""
+        fut = self.submit(frame_bgr, session_id=session_id)
+        try:
+            return fut.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise WorkerUnavailable(f"Worker không trả kết quả sau {self.timeout:.1f}s") from None
+
+    def inflight(self) -> list[int]:
+        return [w.inflight for w in self._workers]
+
+    def _mark_ready(self, idx: int, gen: int):
+        with self._lock:
+            worker = self._workers[idx]
+            if worker.gen != gen or worker.dead:
+                return  # "ready" muộn của process đã bị thay
+            worker.ready = True
+        if gen:
+            logger.info("Worker suy luận %d (gen %d) đã sẵn sàng", idx, gen)
+
+    def _respawn_dead_workers(self):
+        for worker in list(self._workers):
+            if worker.dead or worker.process.is_alive() or self._closing:
+                continue
+            exitcode = worker.process.exitcode
+            with self._lock:
+                # handle cũ vẫn nằm trong _workers (dead=True → submit bỏ qua) tới khi có handle mới
+                worker.dead = True
+                failed = [self._pending.pop(req_id, None) for req_id in worker.pending]
+                worker.pending.clear()
+                self.restarts += 1
+            worker.shm.unlink()
+            self._retired_shm.append(worker.shm)
+            logger.error(
+                "Worker suy luận %d chết (exitcode=%s), fail %d frame, spawn lại",
+                worker.idx, exitcode, len(failed),
+            )
+            for fut in failed:
+                if fut is not None and not fut.done():
+                    fut.set_exception(WorkerUnavailable(f"Worker {worker.idx} chết (exitcode={exitcode})"))
+            # tạo shm + start process ở thread riêng: không giữ _lock, collector vẫn trả kết quả
+            threading.Thread(
+                target=self._replace_worker,
+                args=(worker,),
+                name=f"gesture-infer-respawn-{worker.idx}",
+                daemon=True,
+            ).start()
+
+    def _replace_worker(self, dead: _WorkerHandle):
+        try:
+            replacement = self._spawn(dead.idx, dead.gen + 1)
+        except Exception:
+            logger.exception("Không spawn lại được worker suy luận %d", dead.idx)
+            return
+        with self._lock:
+            if not self._closing:
+                # ready=False: chỉ nhận frame khi collector nhận ("ready", idx, gen + 1)
+                self._workers[dead.idx] = replacement
+                return
+        # pool đã đóng trong lúc spawn → dừng luôn process mới
+        replacement.process.terminate()
+        replacement.process.join(1.0)
+        replacement.shm.close()
+        replacement.shm.unlink()
+
+    def _collect_results(self):
+        next_check = 0.0
+        while True:
+            try:
+                msg = self._result_q.get(timeout=0.5)
+            except queue.Empty:
+                msg = ()
+            if msg is None:
+                break
+
+            now = time.monotonic()
+            if now >= next_check:
+                self._respawn_dead_workers()
+                next_check = now + 0.5
+
+            if not msg:
+                continue
+            if msg[0] == "ready":
+                self._mark_ready(msg[1], msg[2])
+                continue
+            _, idx, gen, req_id, slot, res, error, stages = msg
+            STAGE_SECONDS.merge_deltas(stages)
+
+            worker = self._workers[idx]
+            if gen != worker.gen:
+                continue  # kết quả muộn của process đã chết, frame đã bị fail
+            with self._lock:
+                if worker.pending.pop(req_id, None) is None:
+                    continue
+                worker.inflight -= 1
+                fut = self._pending.pop(req_id, None)
+            worker.free_slots.put(slot)
+
+            if fut is None:
+                continue
+            if error is not None:
+                fut.set_exception(RuntimeError(f"Worker {idx} lỗi: {error}"))
+            else:
+                fut.set_result(res)
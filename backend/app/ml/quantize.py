@@ -0,0 +1,61 @@
+# app/ml/quantize.py
+
+from typing import Iterable
+
+import torch
+import torch.nn as nn
+from torch.ao.quantization import convert, get_default_qconfig, prepare
+from torchvision.models.quantization import resnet18 as quantizable_resnet18
+
+
+def build_quantizable_model(num_classes: int) -> nn.Module:
+    """
+    ResNet18 bản quantizable của torchvision: cùng tên tham số với resnet18 thường
+    (load được checkpoint fp32), có QuantStub/DeQuantStub và fuse_model().
+    """
+    model = quantizable_resnet18(weights=None, quantize=False)
+    model.fc = nn.Linear(model.fc.in_features, num_classes)
+    return model
+
+
+def prepare_static(model: nn.Module, backend: str = "fbgemm") -> nn.Module:
+    """Fuse conv/bn/relu và chèn observer (model phải ở eval, CPU)."""
+    torch.backends.quantized.engine = backend
+    model.eval().cpu()
+    model.fuse_model(is_qat=False)
+    model.qconfig = get_default_qconfig(backend)
+    prepare(model, inplace=True)
+    return model
+
+
+def calibrate(model: nn.Module, batches: Iterable[torch.Tensor]) -> int:
+    """Chạy dữ liệu thật qua observer để đo dải giá trị activation."""
+    seen = 0
+    with torch.inference_mode():
+        for batch in batches:
+            model(batch)
+            seen += batch.shape[0]
+    return seen
+
+
+def quantize_static(
+    fp32_state: dict,
+    num_classes: int,
+    calibration_batches: Iterable[torch.Tensor],
+    backend: str = "fbgemm",
+) -> nn.Module:
+    """Post-training static INT8: fuse → observer → calibration → convert."""
+    model = build_quantizable_model(num_classes)
+    model.load_state_dict(fp32_state)
+    prepare_static(model, backend)
+    if calibrate(model, calibration_batches) == 0:
+        raise ValueError("Không có dữ liệu calibration")
+    convert(model, inplace=True)
+    return model
+
+
+def build_quantized_skeleton(num_classes: int, backend: str = "fbgemm") -> nn.Module:
+    """Khung model INT8 rỗng (đúng cấu trúc sau convert) để load state_dict đã lưu."""
+    model = prepare_static(build_quantizable_model(num_classes), backend)
+    convert(model, inplace=True)
+    return model
@@ -0,0 +1,81 @@
+# app/ml/sample_store.py
+
+import random
+from datetime import datetime
+from pathlib import Path
+from typing import Hashable, Iterator, Sequence, TypeVar
+
+# Cùng thư mục mà /collect/sample-base64 ghi ảnh: data/user_samples/<user_id>/<label>/*.jpg
+SAMPLES_DIR = Path(__file__).resolve().parents[2] / "data" / "user_samples"
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png"}
+
+# tên file do save_sample đặt: thời điểm chụp
+FILENAME_TIME_FORMAT = "%Y%m%d_%H%M%S_%f"
+# 2 ảnh cùng user + label cách nhau quá khoảng này → phiên thu thập khác
+SESSION_GAP_SECONDS = 5.0
+
+T = TypeVar("T")
+
+
+def iter_labeled_samples(root: Path = SAMPLES_DIR, limit: int | None = None) -> Iterator[tuple[Path, str]]:
+    """Duyệt ảnh mẫu đã thu thập, trả (đường dẫn, label) theo thứ tự ổn định."""
+    count = 0
+    for path in sorted(root.glob("*/*/*")):
+        if path.suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        yield path, path.parent.name
+        count += 1
+        if limit is not None and count >= limit:
+            return
+
+
+def capture_session_keys(paths: Sequence[Path], gap_seconds: float = SESSION_GAP_SECONDS) -> list[str]:
+    """
+    Key phiên thu thập cho từng ảnh ("<user>/<label>/<n>"): các frame liên tiếp gần như trùng nhau
+    nên ảnh cùng user + label chụp cách nhau <= gap_seconds được gộp chung 1 phiên.
+    Ảnh không đọc được thời điểm từ tên file là 1 phiên riêng.
+    """
+    stamped = []
+    keys: list[str] = [""] * len(paths)
+    for i, path in enumerate(paths):
+        try:
+            ts = datetime.strptime(path.stem, FILENAME_TIME_FORMAT)
+        except ValueError:
+            keys[i] = str(path)
+            continue
+        stamped.append((path.parent.parent.name, path.parent.name, ts, i))
+
+    stamped.sort()
+    prev = None
+    session = 0
+    for user, label, ts, i in stamped:
+        if prev is None or prev[:2] != (user, label) or (ts - prev[2]).total_seconds() > gap_seconds:
+            session += 1
+        keys[i] = f"{user}/{label}/{session}"
+        prev = (user, label, ts)
+    return keys
+
+
+def split_by_group(
+    items: Sequence[T], groups: Sequence[Hashable], holdout_size: int, seed: int = 0
+) -> tuple[list[T], list[T]]:
+    """
+    Chia (holdout, rest) sao cho mỗi nhóm (user / phiên) chỉ nằm ở 1 phía.
+    Lấy ngẫu nhiên từng nhóm theo seed cho tới khi holdout có >= holdout_size phần tử;
+    luôn chừa lại ít nhất 1 nhóm cho rest.
+    """
+    members: dict[Hashable, list[T]] = {}
+    for item, group in zip(items, groups):
+        members.setdefault(group, []).append(item)
+    order = list(members)
+    random.Random(seed).shuffle(order)
+
+    holdout: list[T] = []
+    rest: list[T] = []
+    for n, group in enumerate(order):
+        if len(holdout) < holdout_size and n < len(order) - 1:
+            holdout.extend(members[group])
+        else:
+            rest.extend(members[group])
+    return holdout, rest
@@ -0,0 +1,149 @@
+# app/ml/session_tracker.py
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+
+@dataclass
+class TrackingSession:
+    """State tracking của 1 client/stream: detector MediaPipe tracking mode riêng."""
+
+    session_id: str
+    hands: Any = None
+    last_used: float = 0.0
+    closed: bool = False
+    # chỗ để các bước sau lưu state theo session (vd: kết quả frame trước)
+    state: dict = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class SessionTrackerRegistry:
+    """
+    Registry detector tracking theo session (user hoặc stream ID).
+
+    - Mỗi session có 1 detector `static_image_mode=False` riêng → frame liên tiếp
+      của cùng client đi đường tracking rẻ của MediaPipe, không lẫn state giữa user.
+    - Session không dùng quá `ttl_seconds` bị đóng; vượt `max_sessions` thì đóng
+      session ít dùng nhất (LRU) đang rảnh.
+    - Hết chỗ mà mọi session đều đang bận → session() trả None, caller tự fallback
+      sang detector ảnh tĩnh.
+    """
+
+    def __init__(self, factory: Callable[[], Any], max_sessions: int = 256, ttl_seconds: float = 30.0):
+        self._factory = factory
+        self.max_sessions = max(1, int(max_sessions))
+        self.ttl_seconds = float(ttl_seconds)
+        self._sessions: "OrderedDict[str, TrackingSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.created = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @contextmanager
+    def session(self, session_id: str):
+        """
+        with registry.session("user:3") as sess:
+            if sess is not None:
+                sess.hands.process(frame_rgb)
+        """
+        sess = self._checkout(session_id)
+        if sess is None:
+            yield None
+            return
+        try:
+            yield sess
+        finally:
+            sess.last_used = time.monotonic()
+            sess.lock.release()
+
+    def remove(self, session_id: str):
+        """Đóng session chủ động (vd: client ngắt kết nối)."""
+        with self._lock:
+            sess = self._sessions.pop(session_id, None)
+        if sess is not None:
+            with sess.lock:
+                self._close(sess)
+
+    def close_all(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for sess in sessions:
+            with sess.lock:
+                self._close(sess)
+
+    # ---------- internal ----------
+    def _checkout(self, session_id: str) -> TrackingSession | None:
+        while True:
+            to_close: list[TrackingSession] = []
+            now = time.monotonic()
+            with self._lock:
+                to_close += self._pop_expired(now)
+                sess = self._sessions.get(session_id)
+                if sess is None:
+                    if len(self._sessions) >= self.max_sessions:
+                        victim = self._pop_lru_idle()
+                        if victim is None:
+                            self._close_all_of(to_close)
+                            return None
+                        to_close.append(victim)
+                    sess = TrackingSession(session_id=session_id)
+                    self._sessions[session_id] = sess
+                else:
+                    self._sessions.move_to_end(session_id)
+                sess.last_used = now
+
+            # đóng detector ngoài lock của registry (các session này đã bị khoá riêng)
+            self._close_all_of(to_close)
+
+            # khoá session: frame cùng session xử lý tuần tự
+            sess.lock.acquire()
+            if sess.closed:
+                # bị evict giữa chừng → thử lại
+                sess.lock.release()
+                continue
+            if sess.hands is None:
+                try:
+                    sess.hands = self._factory()
+                except BaseException:
+                    sess.lock.release()
+                    raise
+                self.created += 1
+            return sess
+
+    def _pop_expired(self, now: float) -> list[TrackingSession]:
+        expired = []
+        for sid, sess in list(self._sessions.items()):
+            if now - sess.last_used < self.ttl_seconds:
+                break  # OrderedDict theo thứ tự dùng gần nhất → phần sau còn mới hơn
+            if sess.lock.acquire(blocking=False):
+                del self._sessions[sid]
+                expired.append(sess)
+        return expired
+
+    def _pop_lru_idle(self) -> TrackingSession | None:
+        for sid, sess in self._sessions.items():
+            if sess.lock.acquire(blocking=False):
+                del self._sessions[sid]
+                return sess
+        return None
+
+    def _close_all_of(self, sessions: list[TrackingSession]):
+        # các session truyền vào đã được acquire lock
+        for sess in sessions:
+            self._close(sess)
+            sess.lock.release()
+
+    def _close(self, sess: TrackingSession):
+        sess.closed = True
+        if sess.hands is not None:
+            sess.hands.close()
+            sess.hands = None
+        self.evicted += 1
@@ -3,6 +3,7 @@ from .gesture_samples import GestureSample
 from .prediction_logs import PredictionLog
 from .caregiver_relations import CaregiverRelation
 from .gesture_mapping import GestureDictionary, UserGestureMapping
+from .prediction_stats import PredictionDailyStat
 
 __all__ = [
     "User",
@@ -11,4 +12,5 @@ __all__ = [
     "CaregiverRelation",
     "GestureDictionary",
     "UserGestureMapping",
+    "PredictionDailyStat",
 ]
@@ -7,6 +7,7 @@ from sqlalchemy import (
     Text,
     DateTime,
     ForeignKey,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from ..db import Base
@@ -23,3 +24,11 @@ class GestureSample(Base):
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
     user = relationship("User", back_populates="gesture_samples")
+
+    __table_args__ = (
+        # /collect/my-samples: keyset theo (created_at, id) giảm dần trong 1 user
+        Index("ix_gesture_samples_user_created_id", "user_id", "created_at", "id"),
+        # /collect/my-samples?label=...: keyset trong 1 label; /collect/my-sample-counts:
+        # GROUP BY label chỉ đọc phần đầu (user_id, label) của index
+        Index("ix_gesture_samples_user_label_created_id", "user_id", "label", "created_at", "id"),
+    )
@@ -0,0 +1,37 @@
+from datetime import datetime
+from sqlalchemy import (
+    Column,
+    BigInteger,
+    Integer,
+    String,
+    Float,
+    Date,
+    DateTime,
+    ForeignKey,
+    UniqueConstraint,
+)
+
+from ..db import Base
+
+
+class PredictionDailyStat(Base):
+    """
+    Bảng tổng hợp prediction_logs theo (user, ngày UTC, gesture_label).
+    Cập nhật cộng dồn mỗi lần ghi 1 batch log; dựng lại bằng scripts/rebuild_prediction_stats.py.
+    """
+    __tablename__ = "prediction_daily_stats"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    gesture_label = Column(String(50), nullable=False)
+
+    prediction_count = Column(Integer, nullable=False, default=0)
+    no_hand_count = Column(Integer, nullable=False, default=0)
+    confidence_sum = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", "gesture_label", name="uq_stat_user_day_label"),
+    )
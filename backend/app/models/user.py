@@ -34,14 +34,16 @@ class User(Base):
         onupdate=datetime.utcnow,
     )
 
-    # Quan hệ tới các bảng khác (đảm bảo GestureSample & PredictionLog có back_populates="user")
-    gesture_samples = relationship("GestureSample", back_populates="user", lazy="selectin")
-    prediction_logs = relationship("PredictionLog", back_populates="user", lazy="selectin")
+    # Quan hệ tới các bảng khác (đảm bảo GestureSample & PredictionLog có back_populates="user").
+    # Load lazy: chỉ query khi code truy cập thuộc tính (hoặc dùng selectinload() khi cần),
+    # tránh kéo toàn bộ lịch sử của user mỗi lần lấy row User
+    gesture_samples = relationship("GestureSample", back_populates="user", lazy="select")
+    prediction_logs = relationship("PredictionLog", back_populates="user", lazy="select")
 
     gesture_mappings = relationship(
         "UserGestureMapping",
         back_populates="user",
-        lazy="selectin",
+        lazy="select",
         cascade="all, delete-orphan",
     )
 
@@ -81,6 +81,8 @@ class UpdateUserGestureMapping(BaseModel):
 class GesturePredictRequest(BaseModel):
     # khớp với frontend: body { "image": "data:image/jpeg;base64,..." }
     image: str  # base64 image string
+    # client streaming gửi kèm id stream (vd: "webcam") → server dùng tracking giữa các frame
+    stream_id: Optional[str] = None
 
 
 class GesturePredictResponse(BaseModel):
@@ -88,3 +90,7 @@ class GesturePredictResponse(BaseModel):
     text: str
     confidence: float
     has_hand: bool
+    # True: tay gần như đứng yên so với frame trước, server dùng lại kết quả (không chạy CNN)
+    reused: bool = False
+    # version model đã cho ra kết quả (None khi không có tay)
+    model_version: Optional[str] = None
@@ -0,0 +1,36 @@
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+# ------------- Thống kê dự đoán (đọc từ bảng prediction_daily_stats) -------------
+class GestureCount(BaseModel):
+    gesture: str          # model_label
+    text: str             # text hiệu lực của user cho label
+    count: int
+    avg_confidence: float
+
+
+class DailyCount(BaseModel):
+    day: date
+    predictions: int      # số frame có tay
+    no_hand: int
+
+
+class StatisticsSummary(BaseModel):
+    user_id: int
+    since: date
+    until: date
+    total_predictions: int
+    no_hand: int
+    most_used_gesture: Optional[str] = None
+    by_gesture: List[GestureCount]
+    by_day: List[DailyCount]
+
+
+class PatientStatistics(BaseModel):
+    user_id: int
+    name: str
+    relation_type: Optional[str] = None
+    summary: StatisticsSummary
@@ -0,0 +1,122 @@
+"""
+Đo chi phí xác thực mỗi request theo độ dài lịch sử của user (số gesture_samples +
+prediction_logs), trên SQLite in-memory:
+
+- selectin: load User kèm toàn bộ quan hệ (hành vi cũ, lazy="selectin")
+- full_user: get_user_from_token() — row User, quan hệ lazy
+- principal: get_principal_from_token() không cache (query 4 cột)
+- principal_cached: như trên, có cache active user (TTL)
+- principal_claims: AUTH_CHECK_ACTIVE_USER = False, Principal chỉ từ claim JWT (không query DB)
+
+Chi phí của 4 cách sau phải giữ gần như không đổi khi lịch sử tăng.
+
+Chạy từ thư mục backend/:
+    python -m benchmarks.bench_auth --history 0 1000 10000 50000
+"""
+
+import argparse
+import statistics
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import selectinload, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.core import security
+from app.core.config import settings
+from app.core.security import ActiveUserCache, create_access_token, decode_token_user_id
+from app.db import Base
+
+
+def make_session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+
+def add_user(Session, history: int) -> int:
+    with Session() as db:
+        user = models.User(email=f"bench{history}@example.com", password_hash="x", name="bench")
+        db.add(user)
+        db.flush()
+        now = datetime.utcnow()
+        db.bulk_insert_mappings(models.GestureSample, [
+            {"user_id": user.id, "label": str(i % 6), "image_path": f"{i}.jpg", "created_at": now}
+            for i in range(history // 2)
+        ])
+        db.bulk_insert_mappings(models.PredictionLog, [
+            {"user_id": user.id, "gesture_label": str(i % 6), "confidence": 0.9, "created_at": now}
+            for i in range(history - history // 2)
+        ])
+        db.commit()
+        return user.id
+
+
+def load_selectin(db, token):
+    user_id = decode_token_user_id(token)
+    return (
+        db.query(models.User)
+        .options(
+            selectinload(models.User.gesture_samples),
+            selectinload(models.User.prediction_logs),
+            selectinload(models.User.gesture_mappings),
+        )
+        .filter(models.User.id == user_id)
+        .first()
+    )
+
+
+def principal_from_claims(db, token):
+    settings.AUTH_CHECK_ACTIVE_USER = False
+    try:
+        return security.get_principal_from_token(db, token)
+    finally:
+        settings.AUTH_CHECK_ACTIVE_USER = True
+
+
+def bench(Session, fn, token, iters: int) -> list[float]:
+    times = []
+    for _ in range(iters):
+        t0 = time.perf_counter()
+        # mỗi request 1 session mới như get_db()
+        with Session() as db:
+            assert fn(db, token) is not None
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, nargs="+", default=[0, 1000, 10000, 50000])
+    parser.add_argument("--iters", type=int, default=200)
+    args = parser.parse_args()
+
+    Session = make_session_factory()
+    uncached = ActiveUserCache(ttl_seconds=0, max_entries=1)
+    cached = ActiveUserCache(ttl_seconds=30.0, max_entries=1024)
+
+    methods = {
+        "selectin": load_selectin,
+        "full_user": security.get_user_from_token,
+        "principal": lambda db, token: uncached.get(db, decode_token_user_id(token)),
+        "principal_cached": lambda db, token: cached.get(db, decode_token_user_id(token)),
+        "principal_claims": principal_from_claims,
+    }
+
+    print(f"{'history':>8} " + " ".join(f"{name + ' p50(ms)':>24}" for name in methods))
+    for history in args.history:
+        user_id = add_user(Session, history)
+        # claim giống token do /auth/login tạo
+        token = create_access_token({"sub": str(user_id), "email": f"bench{history}@example.com", "role": "user"})
+        row = []
+        for name, fn in methods.items():
+            iters = max(5, args.iters // 20) if name == "selectin" and history >= 10000 else args.iters
+            bench(Session, fn, token, 3)
+            row.append(statistics.median(bench(Session, fn, token, iters)))
+        print(f"{history:>8} " + " ".join(f"{v:>24.3f}" for v in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+So sánh latency / throughput của các engine suy luận trên CPU.
+
+Chạy từ thư mục backend/ (sau khi export_model):
+    python -m benchmarks.bench_backends --batch-sizes 1 8 --iters 50
+"""
+
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from app.ml.gesture_model import IMAGE_SIZE, load_inference_backend
+
+
+def bench(backend, batch_size: int, iters: int, warmup: int = 5):
+    x = torch.randn(batch_size, 3, IMAGE_SIZE, IMAGE_SIZE)
+    for _ in range(warmup):
+        backend(x)
+    times = []
+    for _ in range(iters):
+        t0 = time.perf_counter()
+        backend(x)
+        times.append(time.perf_counter() - t0)
+    return np.array(times) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--engines", nargs="+", default=["eager", "torchscript", "onnx", "int8"])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--iters", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"torch_threads={torch.get_num_threads()}")
+    print(f"{'engine':<12} {'batch':>5} {'p50(ms)':>9} {'p99(ms)':>9} {'img/s':>9}")
+    for engine in args.engines:
+        try:
+            backend = load_inference_backend(engine)
+        except (RuntimeError, FileNotFoundError, ValueError) as exc:
+            print(f"{engine:<12} bỏ qua: {exc}")
+            continue
+        for bs in args.batch_sizes:
+            ms = bench(backend, bs, args.iters)
+            print(
+                f"{engine:<12} {bs:>5} {np.percentile(ms, 50):>9.2f} "
+                f"{np.percentile(ms, 99):>9.2f} {bs * 1000.0 / ms.mean():>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark micro-batching: throughput vs p99 latency theo (max_batch_size, max_wait_ms).
+
+Chạy từ thư mục backend/:
+    python -m benchmarks.bench_batching --clients 32 --requests 50
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+import torch
+
+from app.ml.batching import MicroBatchScheduler
+from app.ml.gesture_model import IMAGE_SIZE, forward_batch
+
+
+def run_clients(call, num_clients: int, requests_per_client: int):
+    """Mỗi client gửi tuần tự `requests_per_client` crop, trả về (latencies_s, wall_s)."""
+    latencies: list[float] = []
+    lat_lock = threading.Lock()
+    start_barrier = threading.Barrier(num_clients + 1)
+
+    def client():
+        x = torch.randn(3, IMAGE_SIZE, IMAGE_SIZE)
+        local = []
+        start_barrier.wait()
+        for _ in range(requests_per_client):
+            t0 = time.perf_counter()
+            call(x)
+            local.append(time.perf_counter() - t0)
+        with lat_lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(num_clients)]
+    for t in threads:
+        t.start()
+    start_barrier.wait()
+    t_start = time.perf_counter()
+    for t in threads:
+        t.join()
+    return latencies, time.perf_counter() - t_start
+
+
+def summarize(name: str, latencies: list[float], wall: float, avg_batch: float):
+    lat_ms = np.array(latencies) * 1000.0
+    print(
+        f"{name:<22} {len(lat_ms) / wall:>9.1f} "
+        f"{np.percentile(lat_ms, 50):>9.1f} {np.percentile(lat_ms, 99):>9.1f} "
+        f"{avg_batch:>9.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=30, help="số request mỗi client")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--waits", type=float, nargs="+", default=[1.0, 5.0, 10.0])
+    args = parser.parse_args()
+
+    # warm-up để không tính chi phí lần chạy đầu
+    forward_batch([torch.randn(3, IMAGE_SIZE, IMAGE_SIZE)])
+
+    print(f"clients={args.clients} requests/client={args.requests} torch_threads={torch.get_num_threads()}")
+    print(f"{'config':<22} {'fps':>9} {'p50(ms)':>9} {'p99(ms)':>9} {'avg_bs':>9}")
+
+    lats, wall = run_clients(lambda x: forward_batch([x])[0], args.clients, args.requests)
+    summarize("no batching", lats, wall, 1.0)
+
+    for bs in args.batch_sizes:
+        for wait in args.waits:
+            scheduler = MicroBatchScheduler(forward_batch, max_batch_size=bs, max_wait_ms=wait)
+            try:
+                lats, wall = run_clients(scheduler.run, args.clients, args.requests)
+            finally:
+                scheduler.close()
+            summarize(f"bs={bs} wait={wait}ms", lats, wall, scheduler.avg_batch_size)
+
+
+if __name__ == "__main__":
+    main()
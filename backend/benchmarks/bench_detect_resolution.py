@@ -0,0 +1,85 @@
+"""
+Benchmark phát hiện tay ở độ phân giải thấp: latency và IoU bbox so với full-res.
+
+Chạy từ thư mục backend/:
+    python -m benchmarks.bench_detect_resolution --max-sides 0 480 320 256
+    python -m benchmarks.bench_detect_resolution --images path/to/folder
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+import cv2
+
+from app.ml.gesture_model import get_hand_bbox_from_mediapipe, make_static_hands
+from app.ml.sample_store import IMAGE_SUFFIXES, SAMPLES_DIR
+
+TEST_IMAGE = Path(__file__).resolve().parents[2] / "build_model" / "test" / "test5.JPG"
+
+
+def load_images(folder: Path | None):
+    if folder is not None:
+        paths = sorted(p for p in folder.rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES)
+    else:
+        paths = sorted(p for p in SAMPLES_DIR.rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES)
+        paths.append(TEST_IMAGE)
+    frames = []
+    for p in paths:
+        frame = cv2.imread(str(p))
+        if frame is not None:
+            frames.append((p.name, frame, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+    return frames
+
+
+def iou(a, b) -> float:
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    area_a = (a[2] - a[0]) * (a[3] - a[1])
+    area_b = (b[2] - b[0]) * (b[3] - b[1])
+    union = area_a + area_b - inter
+    return inter / union if union else 0.0
+
+
+def detect_all(frames, max_side: int):
+    # detector mới cho mỗi cấu hình, static mode → không phụ thuộc frame trước
+    hands = make_static_hands()
+    bboxes, times = [], []
+    for _, frame_bgr, frame_rgb in frames:
+        t0 = time.perf_counter()
+        bbox = get_hand_bbox_from_mediapipe(frame_bgr, hands, frame_rgb=frame_rgb, max_side=max_side)
+        times.append((time.perf_counter() - t0) * 1000.0)
+        bboxes.append(bbox)
+    hands.close()
+    return bboxes, times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=Path, default=None)
+    parser.add_argument("--max-sides", type=int, nargs="+", default=[0, 640, 480, 320, 256])
+    args = parser.parse_args()
+
+    frames = load_images(args.images)
+    if not frames:
+        raise SystemExit("Không có ảnh nào")
+    print(f"images={len(frames)}")
+
+    ref_bboxes, _ = detect_all(frames, 0)
+    print(f"{'max_side':>8} {'p50(ms)':>9} {'mean(ms)':>9} {'same_det':>9} {'IoU mean':>9} {'IoU min':>8}")
+    for max_side in args.max_sides:
+        bboxes, times = detect_all(frames, max_side)
+        same = sum((a is None) == (b is None) for a, b in zip(ref_bboxes, bboxes))
+        ious = [iou(a, b) for a, b in zip(ref_bboxes, bboxes) if a is not None and b is not None]
+        print(
+            f"{max_side or 'full':>8} {statistics.median(times):>9.2f} {statistics.mean(times):>9.2f} "
+            f"{same / len(frames):>9.1%} "
+            f"{(statistics.mean(ious) if ious else float('nan')):>9.3f} "
+            f"{(min(ious) if ious else float('nan')):>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Stress test pool MediaPipe Hands: throughput phát hiện tay theo kích thước pool.
+
+Chạy từ thư mục backend/:
+    python -m benchmarks.bench_detector_pool --threads 8 --pool-sizes 1 2 4 8
+"""
+
+import argparse
+import os
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from app.ml.detector_pool import HandsDetectorPool
+from app.ml.gesture_model import get_hand_bbox_from_mediapipe, make_static_hands
+
+DEFAULT_IMAGE = Path(__file__).resolve().parents[2] / "build_model" / "test" / "test5.JPG"
+
+
+def load_frame(path: Path) -> np.ndarray:
+    frame = cv2.imread(str(path))
+    if frame is None:
+        # không có ảnh mẫu → frame nhiễu 640x480 (vẫn chạy đủ palm detection)
+        frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+    return cv2.resize(frame, (640, 480))
+
+
+def run(pool: HandsDetectorPool, frame: np.ndarray, num_threads: int, duration: float) -> int:
+    done = [0] * num_threads
+    stop = threading.Event()
+
+    def worker(i):
+        while not stop.is_set():
+            with pool.checkout() as hands:
+                get_hand_bbox_from_mediapipe(frame, hands)
+            done[i] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(num_threads)]
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    return sum(done)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--image", type=Path, default=DEFAULT_IMAGE)
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--duration", type=float, default=5.0, help="giây cho mỗi cấu hình")
+    args = parser.parse_args()
+
+    frame = load_frame(args.image)
+    print(f"threads={args.threads} cpu={os.cpu_count()} frame={frame.shape[1]}x{frame.shape[0]}")
+    print(f"{'pool_size':>9} {'frames':>8} {'fps':>8} {'speedup':>8}")
+
+    base_fps = None
+    for size in args.pool_sizes:
+        pool = HandsDetectorPool(make_static_hands, size=size)
+        # chạy nóng để tạo sẵn đủ detector, không tính chi phí khởi tạo graph
+        run(pool, frame, min(size, args.threads), 0.5)
+
+        frames = run(pool, frame, args.threads, args.duration)
+        fps = frames / args.duration
+        base_fps = base_fps or fps
+        print(f"{size:>9} {frames:>8} {fps:>8.1f} {fps / base_fps:>7.2f}x")
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
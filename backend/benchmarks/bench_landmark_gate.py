@@ -0,0 +1,60 @@
+"""
+Chỉnh ngưỡng landmark gate trên 1 chuỗi frame đã ghi: với mỗi ngưỡng, đo tỉ lệ
+frame bỏ qua CNN, latency trung bình và tỉ lệ nhãn khớp với việc luôn chạy CNN.
+
+Chạy từ thư mục backend/:
+    python -m benchmarks.bench_landmark_gate --video recorded.mp4 --thresholds 0.02 0.04 0.08
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from app.core.config import settings
+from app.ml import gesture_model
+from app.ml.landmarks import LandmarkGate
+from app.ml.sample_store import SAMPLES_DIR
+
+from .bench_tracking import load_sequence
+
+
+def replay(frames, session_id: str):
+    preds, times = [], []
+    for frame in frames:
+        t0 = time.perf_counter()
+        preds.append(gesture_model.predict_from_bgr(frame, session_id=session_id))
+        times.append((time.perf_counter() - t0) * 1000.0)
+    gesture_model.tracking_sessions.remove(session_id)
+    return preds, times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--video", type=Path, default=None)
+    parser.add_argument("--frames", type=Path, default=SAMPLES_DIR / "3" / "0")
+    parser.add_argument("--limit", type=int, default=300)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.02, 0.04, 0.06, 0.1])
+    args = parser.parse_args()
+
+    frames = load_sequence(args.video, args.frames, args.limit)
+    if not frames:
+        raise SystemExit("Không có frame nào")
+    gesture_model.warmup()
+
+    settings.LANDMARK_GATE_ENABLED = False
+    ref, ref_times = replay(frames, "bench-ref")
+    print(f"frames={len(frames)} no-gate mean={statistics.mean(ref_times):.2f}ms")
+
+    settings.LANDMARK_GATE_ENABLED = True
+    print(f"{'threshold':>9} {'hit_rate':>9} {'mean(ms)':>9} {'agree':>7}")
+    for th in args.thresholds:
+        gesture_model.landmark_gate = LandmarkGate(th, settings.LANDMARK_GATE_MAX_AGE_SECONDS)
+        preds, times = replay(frames, f"bench-{th}")
+        stats = gesture_model.landmark_gate.snapshot()
+        agree = sum(a.label == b.label for a, b in zip(ref, preds)) / len(frames)
+        print(f"{th:>9.3f} {stats['hit_rate']:>9.1%} {statistics.mean(times):>9.2f} {agree:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Micro-benchmark tiền xử lý: đường cũ (BGR→RGB 2 lần + PIL + torchvision transforms)
+so với đường gộp (dùng lại frame RGB của MediaPipe, cv2.resize, chuẩn hoá in-place).
+
+Bộ nhớ cấp phát đo bằng tracemalloc (mảng numpy/OpenCV); tensor do torch cấp phát
+không được tracemalloc theo dõi nên số liệu của đường cũ là cận dưới.
+
+Chạy từ thư mục backend/:
+    python -m benchmarks.bench_preprocess --iters 500
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+import torch
+from PIL import Image
+from torchvision import transforms
+
+from app.ml.gesture_model import (
+    IMAGE_SIZE,
+    IMAGENET_MEAN,
+    IMAGENET_STD,
+    preprocess_batch,
+    preprocess_rgb,
+)
+
+legacy_transform = transforms.Compose([
+    transforms.Resize((IMAGE_SIZE, IMAGE_SIZE)),
+    transforms.ToTensor(),
+    transforms.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD),
+])
+
+BBOX = (200, 120, 440, 400)  # crop tay giả trên frame 640x480
+
+
+def legacy(frame_bgr):
+    # như code cũ: 1 lần convert cho MediaPipe, 1 lần trong preprocess_from_cv2
+    _ = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+    x1, y1, x2, y2 = BBOX
+    crop_rgb = cv2.cvtColor(frame_bgr[y1:y2, x1:x2], cv2.COLOR_BGR2RGB)
+    return legacy_transform(Image.fromarray(crop_rgb)).unsqueeze(0)
+
+
+def fused_factory():
+    buf = torch.empty(1, 3, IMAGE_SIZE, IMAGE_SIZE)
+
+    def fused(frame_bgr):
+        frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)  # dùng chung với MediaPipe
+        x1, y1, x2, y2 = BBOX
+        return preprocess_rgb(frame_rgb[y1:y2, x1:x2], out=buf)
+
+    return fused
+
+
+def measure(fn, frame, iters: int):
+    for _ in range(10):
+        fn(frame)
+
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        fn(frame)
+    per_frame_us = (time.perf_counter() - t0) / iters * 1e6
+
+    tracemalloc.start()
+    for _ in range(20):
+        tracemalloc.reset_peak()
+        snap0 = tracemalloc.get_traced_memory()[0]
+        fn(frame)
+        peak = tracemalloc.get_traced_memory()[1] - snap0
+    tracemalloc.stop()
+    return per_frame_us, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iters", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=8)
+    args = parser.parse_args()
+
+    frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+
+    fused = fused_factory()
+    a = legacy(frame)
+    b = fused(frame)
+    print(f"max|legacy - fused| = {float((a - b).abs().max()):.4f} (khác nhau do nội suy resize)")
+
+    print(f"{'path':<14} {'us/frame':>10} {'alloc/frame':>14}")
+    for name, fn in (("legacy", legacy), ("fused", fused)):
+        us, peak = measure(fn, frame, args.iters)
+        print(f"{name:<14} {us:>10.1f} {peak / 1024:>11.1f} KiB")
+
+    # batch: N crop vào 1 tensor cấp phát sẵn
+    x1, y1, x2, y2 = BBOX
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    crops = [frame_rgb[y1:y2, x1:x2]] * args.batch
+    out = torch.empty(args.batch, 3, IMAGE_SIZE, IMAGE_SIZE)
+    us, peak = measure(lambda _: preprocess_batch(crops, out=out), frame, max(1, args.iters // args.batch))
+    print(f"{'fused batch':<14} {us / args.batch:>10.1f} {peak / 1024 / args.batch:>11.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark backend đa process: FPS theo số worker process so với backend thread.
+
+Chạy từ thư mục backend/:
+    python -m benchmarks.bench_process_pool --workers 1 2 4 8 --duration 10
+"""
+
+import argparse
+import os
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from app.ml.gesture_model import predict_from_bgr
+from app.ml.process_pool import InferenceProcessPool
+
+DEFAULT_IMAGE = Path(__file__).resolve().parents[2] / "build_model" / "test" / "test5.JPG"
+
+
+def load_frame(path: Path) -> np.ndarray:
+    frame = cv2.imread(str(path))
+    if frame is None:
+        frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+    return cv2.resize(frame, (640, 480))
+
+
+def measure(call, frame: np.ndarray, num_clients: int, duration: float) -> float:
+    done = [0] * num_clients
+    stop = threading.Event()
+
+    def client(i):
+        while not stop.is_set():
+            call(frame)
+            done[i] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(num_clients)]
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    return sum(done) / duration
+
+
+def main():
+    cpu = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--image", type=Path, default=DEFAULT_IMAGE)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, cpu])
+    parser.add_argument("--slots", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    frame = load_frame(args.image)
+    print(f"cpu={cpu} frame={frame.shape[1]}x{frame.shape[0]}")
+    print(f"{'backend':<16} {'clients':>8} {'fps':>8} {'speedup':>8} {'eff':>6}")
+
+    # baseline: backend thread trong 1 process
+    predict_from_bgr(frame)
+    thread_fps = measure(predict_from_bgr, frame, cpu, args.duration)
+    print(f"{'thread':<16} {cpu:>8} {thread_fps:>8.1f} {1.0:>7.2f}x {'-':>6}")
+
+    one_worker_fps = None
+    for n in sorted(set(args.workers)):
+        pool = InferenceProcessPool(num_workers=n, slots_per_worker=args.slots)
+        pool.start()
+        try:
+            clients = n * args.slots
+            measure(pool.predict, frame, clients, 1.0)  # warm-up
+            fps = measure(pool.predict, frame, clients, args.duration)
+        finally:
+            pool.close()
+        one_worker_fps = one_worker_fps or fps
+        eff = fps / (one_worker_fps * n)
+        print(f"{'process x' + str(n):<16} {clients:>8} {fps:>8.1f} {fps / thread_fps:>7.2f}x {eff:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark thời gian khởi động: lazy (load ở request đầu) vs warm-up lúc startup.
+
+Mỗi chế độ chạy trong 1 process Python mới để đo đúng chi phí import.
+Chạy từ thư mục backend/:
+    python -m benchmarks.bench_startup --repeat 3
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# đo trong process con: import app.main, (warmup), rồi request đầu tiên
+CHILD = r"""
+import json, sys, time
+import numpy as np
+t0 = time.perf_counter()
+import app.main
+from app.ml import gesture_model
+t_import = time.perf_counter() - t0
+
+t_warm = 0.0
+if sys.argv[1] == "warm":
+    t1 = time.perf_counter()
+    gesture_model.warmup()
+    t_warm = time.perf_counter() - t1
+
+frame = np.zeros((480, 640, 3), dtype=np.uint8)
+crop = gesture_model.preprocess_from_cv2(frame[:200, :200])
+t2 = time.perf_counter()
+gesture_model.predict_from_bgr(frame)
+gesture_model.classify_tensor(crop)
+t_first = time.perf_counter() - t2
+
+print(json.dumps({"import": t_import, "warmup": t_warm, "first_request": t_first}))
+"""
+
+
+def run_mode(mode: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, mode],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'import(s)':>10} {'warmup(s)':>10} {'1st req(ms)':>12}")
+    for mode in ("lazy", "warm"):
+        runs = [run_mode(mode) for _ in range(args.repeat)]
+        avg = {k: sum(r[k] for r in runs) / len(runs) for k in runs[0]}
+        print(
+            f"{mode:<6} {avg['import']:>10.2f} {avg['warmup']:>10.2f} "
+            f"{avg['first_request'] * 1000:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
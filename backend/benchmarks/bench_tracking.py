@@ -0,0 +1,90 @@
+"""
+Đo chênh lệch latency phát hiện tay: detector ảnh tĩnh (mỗi frame detect lại)
+vs detector tracking theo session trên 1 chuỗi frame đã ghi.
+
+Chạy từ thư mục backend/:
+    python -m benchmarks.bench_tracking --video recorded.mp4
+    python -m benchmarks.bench_tracking --frames data/user_samples/3/0
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+import cv2
+
+from app.ml.gesture_model import get_hand_bbox_from_mediapipe, make_static_hands, make_tracking_hands
+from app.ml.sample_store import IMAGE_SUFFIXES, SAMPLES_DIR
+from app.ml.session_tracker import SessionTrackerRegistry
+
+
+def load_sequence(video: Path | None, frames_dir: Path, limit: int):
+    frames = []
+    if video is not None:
+        cap = cv2.VideoCapture(str(video))
+        while len(frames) < limit:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frames.append(frame)
+        cap.release()
+    else:
+        for p in sorted(frames_dir.iterdir()):
+            if p.suffix.lower() in IMAGE_SUFFIXES:
+                frame = cv2.imread(str(p))
+                if frame is not None:
+                    frames.append(frame)
+            if len(frames) >= limit:
+                break
+    return frames
+
+
+def run(frames, detect):
+    times, found = [], 0
+    for frame in frames:
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        t0 = time.perf_counter()
+        bbox = detect(frame, rgb)
+        times.append((time.perf_counter() - t0) * 1000.0)
+        found += bbox is not None
+    return times, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--video", type=Path, default=None)
+    parser.add_argument("--frames", type=Path, default=SAMPLES_DIR / "3" / "0")
+    parser.add_argument("--limit", type=int, default=300)
+    args = parser.parse_args()
+
+    frames = load_sequence(args.video, args.frames, args.limit)
+    if not frames:
+        raise SystemExit("Không có frame nào")
+
+    static = make_static_hands()
+    registry = SessionTrackerRegistry(make_tracking_hands, max_sessions=4)
+
+    def detect_static(frame, rgb):
+        return get_hand_bbox_from_mediapipe(frame, static, frame_rgb=rgb)
+
+    def detect_tracking(frame, rgb):
+        with registry.session("bench") as sess:
+            return get_hand_bbox_from_mediapipe(frame, sess.hands, frame_rgb=rgb)
+
+    print(f"frames={len(frames)}")
+    print(f"{'mode':<10} {'p50(ms)':>9} {'p90(ms)':>9} {'mean(ms)':>9} {'hands':>6}")
+    results = {}
+    for name, fn in (("static", detect_static), ("tracking", detect_tracking)):
+        times, found = run(frames, fn)
+        results[name] = statistics.mean(times)
+        p90 = statistics.quantiles(times, n=10)[-1] if len(times) > 1 else times[0]
+        print(f"{name:<10} {statistics.median(times):>9.2f} {p90:>9.2f} {results[name]:>9.2f} {found:>6}")
+
+    print(f"tracking nhanh hơn {results['static'] / results['tracking']:.2f}x (mean)")
+    static.close()
+    registry.close_all()
+
+
+if __name__ == "__main__":
+    main()
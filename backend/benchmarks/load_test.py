@@ -0,0 +1,122 @@
+"""
+Load test open-loop cho POST /gesture/predict: gửi frame JPEG với tốc độ cố định
+(không chờ response trước khi gửi tiếp), tăng dần tới quá tải. Với admission control,
+p99 của request thành công phải giữ quanh INFER_DEADLINE_MS, phần vượt tải bị trả
+429/503 nhanh thay vì xếp hàng.
+
+Cần server đang chạy. Chạy từ thư mục backend/:
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --email a@b.c --password x \\
+        --rates 5 10 20 40 80 --duration 15
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+DEFAULT_IMAGE = Path(__file__).resolve().parents[2] / "build_model" / "test" / "test5.JPG"
+
+
+def load_jpeg(path: Path) -> bytes:
+    frame = cv2.imread(str(path))
+    if frame is None:
+        frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+    ok, buf = cv2.imencode(".jpg", cv2.resize(frame, (640, 480)), [cv2.IMWRITE_JPEG_QUALITY, 80])
+    return buf.tobytes()
+
+
+def login(base_url: str, email: str, password: str) -> str:
+    req = urllib.request.Request(
+        f"{base_url}/auth/login",
+        data=json.dumps({"email": email, "password": password}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(req) as resp:
+        return json.load(resp)["access_token"]
+
+
+def send(url: str, token: str, body: bytes) -> tuple[int, float]:
+    req = urllib.request.Request(
+        url, data=body, headers={"Content-Type": "image/jpeg", "Authorization": f"Bearer {token}"}
+    )
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            resp.read()
+            code = resp.status
+    except urllib.error.HTTPError as exc:
+        code = exc.code
+    except OSError:
+        code = 0
+    return code, (time.perf_counter() - t0) * 1000.0
+
+
+def pct(values, q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run_rate(url: str, token: str, body: bytes, rate: float, duration: float):
+    results: list[tuple[int, float]] = []
+    lock = threading.Lock()
+
+    def task():
+        r = send(url, token, body)
+        with lock:
+            results.append(r)
+
+    n = int(rate * duration)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=512) as pool:
+        for i in range(n):
+            # open-loop: giữ đúng lịch gửi dù server chậm
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(task)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", default=None)
+    parser.add_argument("--email", default=None)
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--image", type=Path, default=DEFAULT_IMAGE)
+    parser.add_argument("--rates", type=float, nargs="+", default=[5, 10, 20, 40, 80])
+    parser.add_argument("--duration", type=float, default=15.0)
+    args = parser.parse_args()
+
+    token = args.token or login(args.url, args.email, args.password)
+    body = load_jpeg(args.image)
+    url = f"{args.url}/gesture/predict"
+
+    print(f"{'rate/s':>7} {'sent':>6} {'ok':>6} {'429':>5} {'503':>5} {'other':>5} "
+          f"{'ok p50':>8} {'ok p99':>8} {'shed p99':>9} {'goodput':>8}")
+    for rate in args.rates:
+        results = run_rate(url, token, body, rate, args.duration)
+        ok = [ms for code, ms in results if code == 200]
+        shed = [ms for code, ms in results if code in (429, 503)]
+        n429 = sum(code == 429 for code, _ in results)
+        n503 = sum(code == 503 for code, _ in results)
+        other = len(results) - len(ok) - n429 - n503
+        print(
+            f"{rate:>7.1f} {len(results):>6} {len(ok):>6} {n429:>5} {n503:>5} {other:>5} "
+            f"{statistics.median(ok) if ok else float('nan'):>8.1f} {pct(ok, 0.99):>8.1f} "
+            f"{pct(shed, 0.99):>9.1f} {len(ok) / args.duration:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Bộ benchmark tái lập được cho pipeline nhận diện, ghi kết quả JSON và so với baseline.
+
+- Micro: decode JPEG, lấy bbox (MediaPipe), tiền xử lý crop, forward ResNet18 (batch 1 / 8).
+- End-to-end: predict_image_bytes() và route POST /gesture/predict-base64 qua TestClient
+  (SQLite in-memory thay MySQL, không chạy startup event).
+- Ảnh: build_model/test/test5.JPG (ảnh thật có tay) + frame nhiễu cố định (không có tay).
+
+Mặc định tắt micro-batching (1 client thì chỉ cộng thêm INFER_MAX_WAIT_MS) và cố định số
+thread PyTorch để số liệu ổn định giữa các lần chạy.
+
+Chạy từ thư mục backend/:
+    python -m benchmarks.suite --output benchmarks/results.json
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --tolerance 0.15
+Exit code 1 nếu p50 của 1 benchmark chậm hơn baseline quá `tolerance`.
+"""
+
+import argparse
+import base64
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+from app.core.config import machine_fingerprint, settings
+
+TEST_IMAGE = Path(__file__).resolve().parents[2] / "build_model" / "test" / "test5.JPG"
+
+
+def load_images() -> dict[str, bytes]:
+    """JPEG 640x480: ảnh thật (nếu có trong repo) + frame nhiễu seed cố định."""
+    images = {}
+    frame = cv2.imread(str(TEST_IMAGE))
+    if frame is not None:
+        images["test5"] = cv2.imencode(".jpg", cv2.resize(frame, (640, 480)), [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+    noise = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    images["synthetic"] = cv2.imencode(".jpg", noise, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+    return images
+
+
+def bench(fn, iters: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(iters):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000.0)
+    times.sort()
+    return {
+        "iters": iters,
+        "p50_ms": round(statistics.median(times), 4),
+        "p90_ms": round(times[min(len(times) - 1, int(0.9 * len(times)))], 4),
+        "mean_ms": round(statistics.mean(times), 4),
+        "min_ms": round(times[0], 4),
+    }
+
+
+def make_client():
+    """TestClient với SQLite in-memory: 1 user + từ điển cử chỉ mặc định."""
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app import models
+    from app.core.security import create_access_token, get_password_hash
+    from app.db import Base, get_db
+    from app.main import app
+    from app.ml.gesture_model import CLASS_NAMES
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    with Session() as db:
+        user = models.User(email="bench@example.com", password_hash=get_password_hash("bench"), name="bench")
+        db.add(user)
+        for label in CLASS_NAMES:
+            db.add(models.GestureDictionary(model_label=label, default_text=f"Cử chỉ {label}"))
+        db.commit()
+        user_id = user.id
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    # không dùng `with TestClient(app)` → startup event (MySQL, warm-up nền) không chạy
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+    return client, headers
+
+
+def run_suite(iters: int, warmup: int, skip_route: bool) -> dict:
+    from app.ml import gesture_model as gm
+
+    images = load_images()
+    gm.get_active_model()
+    results: dict[str, dict] = {}
+
+    def record(name: str, fn, n: int = iters):
+        results[name] = bench(fn, n, warmup)
+        r = results[name]
+        print(f"{name:<34} p50={r['p50_ms']:>9.3f}ms  p90={r['p90_ms']:>9.3f}ms  mean={r['mean_ms']:>9.3f}ms")
+
+    hands = gm.make_static_hands()
+    for kind, jpeg in images.items():
+        buf = np.frombuffer(jpeg, np.uint8)
+        frame = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        record(f"decode/{kind}", lambda: cv2.imdecode(buf, cv2.IMREAD_COLOR))
+        record(f"bbox/{kind}", lambda: gm.detect_hand(frame, hands, frame_rgb=frame_rgb))
+    hands.close()
+
+    crop = np.ascontiguousarray(np.random.default_rng(1).integers(0, 255, (280, 240, 3), dtype=np.uint8))
+    out = torch.empty(1, 3, gm.IMAGE_SIZE, gm.IMAGE_SIZE)
+    record("preprocess/crop", lambda: gm.preprocess_rgb(crop, out=out))
+
+    x1 = torch.randn(1, 3, gm.IMAGE_SIZE, gm.IMAGE_SIZE, generator=torch.Generator().manual_seed(0))
+    x8 = torch.randn(8, 3, gm.IMAGE_SIZE, gm.IMAGE_SIZE, generator=torch.Generator().manual_seed(0))
+    record("forward/batch1", lambda: gm.forward_batch(x1))
+    record("forward/batch8", lambda: gm.forward_batch(x8), max(3, iters // 4))
+
+    for kind, jpeg in images.items():
+        record(f"e2e/predict_image_bytes/{kind}", lambda: gm.predict_image_bytes(jpeg))
+
+    if not skip_route:
+        client, headers = make_client()
+        for kind, jpeg in images.items():
+            body = {"image": "data:image/jpeg;base64," + base64.b64encode(jpeg).decode()}
+
+            def call():
+                resp = client.post("/gesture/predict-base64", json=body, headers=headers)
+                resp.raise_for_status()
+
+            record(f"e2e/route_predict_base64/{kind}", call)
+        gm.inference_executor.close()
+
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Trả danh sách benchmark có p50 > baseline * (1 + tolerance)."""
+    base_results = baseline.get("results", {})
+    if baseline.get("machine") != machine_fingerprint():
+        print("⚠️ Baseline đo trên máy khác — so sánh chỉ mang tính tham khảo")
+
+    print(f"\n{'benchmark':<34} {'p50':>10} {'baseline':>10} {'ratio':>7}")
+    regressions = []
+    for name, r in results.items():
+        base = base_results.get(name)
+        if base is None:
+            print(f"{name:<34} {r['p50_ms']:>10.3f} {'-':>10} {'new':>7}")
+            continue
+        ratio = r["p50_ms"] / base["p50_ms"] if base["p50_ms"] else float("inf")
+        flag = ""
+        if ratio > 1.0 + tolerance:
+            regressions.append(name)
+            flag = "  ❌"
+        print(f"{name:<34} {r['p50_ms']:>10.3f} {base['p50_ms']:>10.3f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iters", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=1, help="torch.set_num_threads (cố định để tái lập)")
+    parser.add_argument("--batching", action="store_true", help="bật micro-batching như cấu hình server")
+    parser.add_argument("--skip-route", action="store_true", help="bỏ benchmark qua TestClient")
+    parser.add_argument("--output", type=Path, default=Path("benchmarks/results.json"))
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.15, help="0.15 = cho phép chậm hơn 15%%")
+    parser.add_argument("--save-baseline", type=Path, default=None)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    torch.set_num_threads(max(1, args.threads))
+    settings.INFER_BATCHING = args.batching
+    settings.LANDMARK_GATE_ENABLED = False
+    # route benchmark không ghi prediction_logs: thread write-behind sẽ kết nối MySQL
+    # (SessionLocal, không qua dependency override) → lệch số đo / lỗi trên máy không có DB
+    settings.PREDICTION_LOG_ENABLED = False
+
+    results = run_suite(args.iters, args.warmup, args.skip_route)
+    report = {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "machine": machine_fingerprint(),
+        "config": {
+            "engine": settings.INFER_ENGINE,
+            "torch_threads": args.threads,
+            "batching": args.batching,
+            "detect_max_side": settings.DETECT_MAX_SIDE,
+            "torch_version": torch.__version__,
+        },
+        "results": results,
+    }
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"\n✅ Kết quả: {args.output}")
+    if args.save_baseline is not None:
+        args.save_baseline.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"✅ Baseline: {args.save_baseline}")
+
+    if args.baseline is not None:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print(f"\n❌ Chậm hơn baseline quá {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\n✅ Không benchmark nào chậm hơn baseline quá {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Autotune các tham số suy luận CPU cho máy hiện tại.
+
+Quét (torch threads × interop threads × batch size × DETECT_MAX_SIDE × số worker
+gọi predict_from_bgr song song) trên model đang cấu hình với frame mẫu, chọn cấu hình
+throughput cao nhất có p99 <= latency budget, in toàn bộ bảng và ghi profile
+(AUTOTUNE_PROFILE_PATH). Các lần startup sau tự load profile nếu cùng loại máy.
+
+Mỗi giá trị interop chạy trong 1 process con riêng (chỉ đặt được 1 lần mỗi process).
+
+Chạy từ thư mục backend/:
+    python -m scripts.autotune --duration 3 --budget-ms 250
+    python -m scripts.autotune --threads 2 4 --batch-sizes 1 8 --workers 4 8 --dry-run
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import sys
+
+from app.core.config import settings
+from app.ml.autotune import (
+    HEADER,
+    TuneResult,
+    build_profile,
+    default_grid,
+    format_row,
+    pick_best,
+    run_sweep_in_child,
+    save_profile,
+)
+
+
+def main():
+    grid = default_grid()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=grid["torch_threads"])
+    parser.add_argument("--interop", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=grid["batch_size"])
+    parser.add_argument("--max-sides", type=int, nargs="+", default=grid["detect_max_side"])
+    parser.add_argument("--workers", type=int, nargs="+", default=grid["workers"])
+    parser.add_argument("--duration", type=float, default=3.0, help="số giây đo mỗi cấu hình")
+    parser.add_argument("--budget-ms", type=float, default=settings.AUTOTUNE_LATENCY_BUDGET_MS)
+    parser.add_argument("--output", default=settings.AUTOTUNE_PROFILE_PATH)
+    parser.add_argument("--dry-run", action="store_true", help="chỉ in bảng, không ghi profile")
+    args = parser.parse_args()
+
+    grid = {
+        "torch_threads": args.threads,
+        "batch_size": args.batch_sizes,
+        "detect_max_side": args.max_sides,
+        "workers": args.workers,
+    }
+    n_configs = len(args.interop) * len(args.threads) * len(args.batch_sizes) * len(args.max_sides) * len(args.workers)
+    print(f"engine={settings.INFER_ENGINE} configs={n_configs} ~{n_configs * (args.duration + 0.5):.0f}s")
+    print(HEADER)
+
+    ctx = mp.get_context("spawn")
+    rows: list[TuneResult] = []
+    for interop in args.interop:
+        with ctx.Pool(1) as pool:
+            child_rows = pool.apply(run_sweep_in_child, (interop, grid, args.duration, args.budget_ms))
+        rows += [TuneResult(**r) for r in child_rows]
+
+    # bảng đầy đủ, sắp theo throughput
+    print("\n" + HEADER)
+    for r in sorted(rows, key=lambda r: -r.fps):
+        print(format_row(r))
+
+    best = pick_best(rows)
+    if best is None:
+        sys.exit(f"❌ Không cấu hình nào đạt p99 <= {args.budget_ms}ms")
+
+    profile = build_profile(rows, best, args.budget_ms, args.duration)
+    print("\nBest:", json.dumps(profile["settings"]))
+    if not args.dry_run:
+        print(f"✅ Đã ghi profile: {save_profile(profile, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Kiểm tra logits của các engine (torchscript, onnx) khớp với eager trên ảnh mẫu.
+
+Chạy từ thư mục backend/ (sau khi export_model):
+    python -m scripts.check_backend_parity --atol 1e-3
+Trả exit code 1 nếu có engine lệch quá ngưỡng hoặc khác nhãn top-1.
+"""
+
+import argparse
+import sys
+
+import cv2
+import torch
+
+from app.ml.gesture_model import load_inference_backend, preprocess_from_cv2
+from app.ml.sample_store import iter_labeled_samples
+
+
+def load_batch(limit: int) -> torch.Tensor:
+    tensors = []
+    for path, _ in iter_labeled_samples(limit=limit):
+        frame = cv2.imread(str(path))
+        if frame is not None:
+            tensors.append(preprocess_from_cv2(frame)[0])
+    if not tensors:
+        raise SystemExit("Không có ảnh mẫu trong data/user_samples")
+    return torch.stack(tensors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--engines", nargs="+", default=["torchscript", "onnx"])
+    parser.add_argument("--limit", type=int, default=32)
+    parser.add_argument("--atol", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    batch = load_batch(args.limit)
+    ref = load_inference_backend("eager")(batch)
+
+    failed = False
+    for engine in args.engines:
+        out = load_inference_backend(engine)(batch)
+        max_diff = float((out - ref).abs().max())
+        same_top1 = bool((out.argmax(dim=1) == ref.argmax(dim=1)).all())
+        ok = max_diff <= args.atol and same_top1
+        failed |= not ok
+        print(
+            f"{engine:<12} images={len(batch)} max|Δlogit|={max_diff:.2e} "
+            f"top1_match={same_top1} -> {'OK' if ok else 'FAIL'}"
+        )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
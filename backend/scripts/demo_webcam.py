@@ -1,5 +1,5 @@
 import cv2
-from app.ml.gesture_model import model, predict_from_bgr
+from app.ml.gesture_model import predict_from_bgr
 
 def run_webcam(camera_id=0):
     cap = cv2.VideoCapture(camera_id)
@@ -17,8 +17,8 @@ def run_webcam(camera_id=0):
             break
         frame_bgr = cv2.resize(frame_bgr, (960, 540))
 
-        label, prob = predict_from_bgr(frame_bgr, use_static_detector=False)
-        text = f"{label} ({prob:.2f})"
+        pred = predict_from_bgr(frame_bgr, use_static_detector=False)
+        text = f"{pred.label} ({pred.confidence:.2f})"
 
         cv2.putText(frame_bgr, text, (10, 30),
                     cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
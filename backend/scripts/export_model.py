@@ -0,0 +1,39 @@
+"""
+Export checkpoint ResNet18 (.pth) sang TorchScript và/hoặc ONNX.
+
+Chạy từ thư mục backend/:
+    python -m scripts.export_model --engine all
+Sau đó đặt INFER_ENGINE = "torchscript" hoặc "onnx" trong core/config.py.
+"""
+
+import argparse
+
+from app.ml.backends import export_onnx, export_torchscript
+from app.ml.gesture_model import (
+    IMAGE_SIZE,
+    MODEL_PATH,
+    ONNX_PATH,
+    TORCHSCRIPT_PATH,
+    load_trained_model,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--engine", choices=["torchscript", "onnx", "all"], default="all")
+    parser.add_argument("--checkpoint", default=str(MODEL_PATH))
+    args = parser.parse_args()
+
+    model = load_trained_model(args.checkpoint, device="cpu")
+
+    if args.engine in ("torchscript", "all"):
+        export_torchscript(model, TORCHSCRIPT_PATH, image_size=IMAGE_SIZE)
+        print(f"✅ TorchScript: {TORCHSCRIPT_PATH}")
+
+    if args.engine in ("onnx", "all"):
+        export_onnx(model, ONNX_PATH, image_size=IMAGE_SIZE)
+        print(f"✅ ONNX: {ONNX_PATH}")
+
+
+if __name__ == "__main__":
+    main()
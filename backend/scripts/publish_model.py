@@ -0,0 +1,71 @@
+"""
+Đưa 1 checkpoint ResNet18 (.pth) vào registry models/registry/<version>/.
+
+Kèm file export / INT8 / landmark MLP nếu có, ghi metadata.json (sha256, thời gian,
+ghi chú, báo cáo đánh giá). `--activate` ghi CURRENT → server đang chạy tự đổi
+sang version mới (watcher) mà không cần restart; hoặc gọi
+POST /admin/models/<version>/activate.
+
+Chạy từ thư mục backend/:
+    python -m scripts.publish_model --checkpoint models/new.pth --version v2 --export --activate
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from app.ml.backends import export_onnx, export_torchscript
+from app.ml.gesture_model import CLASS_NAMES, IMAGE_SIZE, load_trained_model, model_registry
+from app.ml.model_registry import CHECKPOINT_FILES, LANDMARK_MLP_FILE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--checkpoint", type=Path, required=True)
+    parser.add_argument("--version", required=True)
+    parser.add_argument("--notes", default="")
+    parser.add_argument("--report", type=Path, default=None, help="file JSON đánh giá, ghi vào metadata")
+    parser.add_argument("--export", action="store_true", help="export TorchScript + ONNX từ checkpoint")
+    parser.add_argument("--int8", type=Path, default=None, help="checkpoint INT8 (scripts/quantize_model.py)")
+    parser.add_argument("--landmark-mlp", type=Path, default=None, help="scripts/train_landmark_mlp.py")
+    parser.add_argument("--activate", action="store_true", help="ghi CURRENT sau khi publish")
+    args = parser.parse_args()
+
+    # load thử trước khi publish: checkpoint hỏng thì dừng ở đây
+    model = load_trained_model(args.checkpoint, device="cpu")
+
+    metadata = {"class_names": CLASS_NAMES, "notes": args.notes}
+    if args.report is not None:
+        metadata["report"] = json.loads(args.report.read_text())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        extra: dict[str, Path] = {}
+        if args.export:
+            ts_path = Path(tmp) / CHECKPOINT_FILES["torchscript"]
+            onnx_path = Path(tmp) / CHECKPOINT_FILES["onnx"]
+            export_torchscript(model, ts_path, image_size=IMAGE_SIZE)
+            export_onnx(model, onnx_path, image_size=IMAGE_SIZE)
+            extra[ts_path.name] = ts_path
+            extra[onnx_path.name] = onnx_path
+        if args.int8 is not None:
+            extra[CHECKPOINT_FILES["int8"]] = args.int8
+        if args.landmark_mlp is not None:
+            extra[LANDMARK_MLP_FILE] = args.landmark_mlp
+
+        try:
+            mv = model_registry.publish(args.version, args.checkpoint, metadata, extra)
+        except ValueError as exc:
+            sys.exit(f"❌ {exc}")
+
+    print(json.dumps(mv.metadata, indent=2, ensure_ascii=False))
+    print(f"✅ Đã publish {mv.version}: {mv.path} (engines: {', '.join(mv.engines())})")
+
+    if args.activate:
+        model_registry.set_current(mv.version)
+        print(f"✅ CURRENT = {mv.version}")
+
+
+if __name__ == "__main__":
+    main()
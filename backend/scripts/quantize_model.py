@@ -0,0 +1,149 @@
+"""
+Quantize ResNet18 sang INT8 (post-training static) và chỉ publish nếu accuracy giữ được.
+
+Các bước: fuse conv/bn/relu → calibration trên crop tay từ data/user_samples →
+convert INT8 → so sánh với fp32 (top-1 agreement, accuracy theo nhãn thư mục, latency).
+Ảnh calibration được tách riêng theo phiên thu thập, không nằm trong tập đánh giá.
+Nếu accuracy giảm quá QUANT_MAX_ACCURACY_DROP thì KHÔNG ghi checkpoint.
+
+Chạy từ thư mục backend/:
+    python -m scripts.quantize_model --calib-limit 200
+Sau đó đặt INFER_ENGINE = "int8" trong core/config.py.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import torch
+
+from app.core.config import settings
+from app.ml.gesture_model import (
+    CLASS_NAMES,
+    MODEL_PATH,
+    NUM_CLASSES,
+    QUANTIZED_MODEL_PATH,
+    get_hand_bbox_from_mediapipe,
+    load_trained_model,
+    make_static_hands,
+    preprocess_from_cv2,
+)
+from app.ml.quantize import quantize_static
+from app.ml.sample_store import capture_session_keys, iter_labeled_samples, split_by_group
+
+
+def load_dataset():
+    """Crop tay giống lúc suy luận; không thấy tay thì dùng cả frame."""
+    hands = make_static_hands()
+    tensors, labels, paths = [], [], []
+    for path, label in iter_labeled_samples():
+        if label not in CLASS_NAMES:
+            continue
+        frame = cv2.imread(str(path))
+        if frame is None:
+            continue
+        bbox = get_hand_bbox_from_mediapipe(frame, hands)
+        if bbox is not None:
+            x1, y1, x2, y2 = bbox
+            frame = frame[y1:y2, x1:x2]
+        tensors.append(preprocess_from_cv2(frame)[0])
+        labels.append(CLASS_NAMES.index(label))
+        paths.append(path)
+    hands.close()
+    return tensors, labels, paths
+
+
+def predict_all(model, tensors, batch_size: int) -> torch.Tensor:
+    preds = []
+    with torch.inference_mode():
+        for i in range(0, len(tensors), batch_size):
+            logits = model(torch.stack(tensors[i:i + batch_size]))
+            preds.append(logits.argmax(dim=1))
+    return torch.cat(preds)
+
+
+def median_latency_ms(model, tensors, n: int = 50) -> float:
+    times = []
+    with torch.inference_mode():
+        for x in tensors[:n]:
+            x = x.unsqueeze(0)
+            t0 = time.perf_counter()
+            model(x)
+            times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calib-limit", type=int, default=200, help="số ảnh dùng để calibration")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--max-drop", type=float, default=settings.QUANT_MAX_ACCURACY_DROP)
+    parser.add_argument("--backend", default=settings.QUANT_BACKEND)
+    args = parser.parse_args()
+
+    tensors, labels, paths = load_dataset()
+    if not tensors:
+        sys.exit("Không có ảnh mẫu hợp lệ trong data/user_samples")
+
+    # calibration và đánh giá dùng 2 tập phiên thu thập rời nhau; calibration tối đa nửa dữ liệu
+    calib_idx, eval_idx = split_by_group(
+        range(len(tensors)),
+        capture_session_keys(paths),
+        holdout_size=min(args.calib_limit, len(tensors) // 2),
+        seed=args.seed,
+    )
+    if not calib_idx or not eval_idx:
+        sys.exit("Cần ảnh mẫu từ ít nhất 2 phiên thu thập để tách calibration / đánh giá")
+    calib = [tensors[i] for i in calib_idx][: args.calib_limit]
+    tensors = [tensors[i] for i in eval_idx]
+    labels = torch.tensor([labels[i] for i in eval_idx])
+
+    fp32 = load_trained_model(MODEL_PATH, device="cpu")
+    calib_batches = (
+        torch.stack(calib[i:i + args.batch_size]) for i in range(0, len(calib), args.batch_size)
+    )
+    int8 = quantize_static(fp32.state_dict(), NUM_CLASSES, calib_batches, backend=args.backend)
+
+    pred_fp32 = predict_all(fp32, tensors, args.batch_size)
+    pred_int8 = predict_all(int8, tensors, args.batch_size)
+    acc_fp32 = float((pred_fp32 == labels).float().mean())
+    acc_int8 = float((pred_int8 == labels).float().mean())
+    agreement = float((pred_fp32 == pred_int8).float().mean())
+
+    lat_fp32 = median_latency_ms(fp32, tensors)
+    lat_int8 = median_latency_ms(int8, tensors)
+
+    report = {
+        "images": len(tensors),
+        "calibration_images": len(calib),
+        "backend": args.backend,
+        "top1_agreement": agreement,
+        "accuracy_fp32": acc_fp32,
+        "accuracy_int8": acc_int8,
+        "accuracy_drop": acc_fp32 - acc_int8,
+        "max_drop": args.max_drop,
+        "latency_fp32_ms": lat_fp32,
+        "latency_int8_ms": lat_int8,
+        "speedup": lat_fp32 / lat_int8 if lat_int8 else None,
+    }
+    print(json.dumps(report, indent=2))
+
+    if report["accuracy_drop"] > args.max_drop:
+        print(f"❌ Accuracy giảm {report['accuracy_drop']:.2%} > {args.max_drop:.2%}: KHÔNG publish model INT8")
+        sys.exit(1)
+
+    # ghi file tạm rồi replace để worker không bao giờ đọc checkpoint ghi dở
+    tmp_path = QUANTIZED_MODEL_PATH.with_name(QUANTIZED_MODEL_PATH.name + ".tmp")
+    torch.save(int8.state_dict(), tmp_path)
+    os.replace(tmp_path, QUANTIZED_MODEL_PATH)
+    QUANTIZED_MODEL_PATH.with_suffix(".json").write_text(json.dumps(report, indent=2))
+    print(f"✅ Đã publish model INT8: {QUANTIZED_MODEL_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Dựng lại bảng tổng hợp prediction_daily_stats từ prediction_logs (backfill lần đầu,
+hoặc sau khi xoá log thủ công).
+
+Chạy từ thư mục backend/:
+    python -m scripts.rebuild_prediction_stats                     # toàn bộ
+    python -m scripts.rebuild_prediction_stats --since 2025-01-01 --until 2025-01-31
+    python -m scripts.rebuild_prediction_stats --user-id 3
+
+Chạy được khi server đang chạy: rebuild khoá prediction_logs / prediction_daily_stats tới khi
+commit, thread ghi log của server chờ rồi ghi tiếp (không đếm thiếu / thừa).
+"""
+
+import argparse
+from datetime import date
+
+from app.core.prediction_stats import rebuild
+from app.db import Base, SessionLocal, engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="YYYY-MM-DD (ngày UTC)")
+    parser.add_argument("--until", type=date.fromisoformat, default=None, help="YYYY-MM-DD (ngày UTC, tính cả ngày này)")
+    parser.add_argument("--user-id", type=int, default=None)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        n = rebuild(db, since=args.since, until=args.until, user_id=args.user_id)
+    finally:
+        db.close()
+    print(f"✅ Đã ghi {n} dòng prediction_daily_stats")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Train MLP nhỏ trên landmark MediaPipe (tầng 1 của cascade) và đánh giá cascade.
+
+Các bước: chạy detector tĩnh trên data/user_samples → landmark 21 điểm → chia
+train/val theo user hoặc phiên thu thập (--split-by; frame liên tiếp gần như trùng nhau nên
+không được nằm ở cả 2 phía) → train MLP (augment lật ngang) → trên tập val so sánh
+MLP, ResNet18 và cascade (MLP khi prob >= ngưỡng, còn lại ResNet18) theo từng ngưỡng:
+tỉ lệ fast-path, accuracy, latency trung bình.
+
+Chạy từ thư mục backend/:
+    python -m scripts.train_landmark_mlp --epochs 200 --thresholds 0.8 0.9 0.95
+Kết quả ghi vào models/landmark_mlp.pth (+ .json báo cáo); chỉnh
+LANDMARK_CASCADE_THRESHOLD trong core/config.py theo báo cáo.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+import torch
+import torch.nn as nn
+
+from app.ml.gesture_model import (
+    CLASS_NAMES,
+    LANDMARK_MLP_PATH,
+    MODEL_PATH,
+    detect_hand,
+    load_trained_model,
+    make_static_hands,
+    preprocess_from_cv2,
+)
+from app.ml.landmark_classifier import (
+    LandmarkClassifier,
+    build_mlp,
+    landmark_features,
+    mirror_points,
+    save_classifier,
+)
+from app.ml.sample_store import capture_session_keys, iter_labeled_samples, split_by_group
+
+
+def load_dataset():
+    """Chỉ giữ ảnh detect được tay: cascade chỉ chạy khi có landmark."""
+    hands = make_static_hands()
+    samples = []
+    for path, label in iter_labeled_samples():
+        if label not in CLASS_NAMES:
+            continue
+        frame = cv2.imread(str(path))
+        if frame is None:
+            continue
+        detection = detect_hand(frame, hands)
+        if detection is None:
+            continue
+        (x1, y1, x2, y2), points = detection
+        samples.append((points, frame[y1:y2, x1:x2], CLASS_NAMES.index(label), path))
+    hands.close()
+    return samples
+
+
+def train(train_samples, hidden, epochs: int, lr: float, seed: int) -> nn.Sequential:
+    torch.manual_seed(seed)
+    feats, labels = [], []
+    for points, _, y, _ in train_samples:
+        feats += [landmark_features(points), landmark_features(mirror_points(points))]
+        labels += [y, y]
+    x = torch.from_numpy(np.stack(feats))
+    y = torch.tensor(labels)
+
+    model = build_mlp(len(CLASS_NAMES), hidden)
+    opt = torch.optim.Adam(model.parameters(), lr=lr, weight_decay=1e-4)
+    loss_fn = nn.CrossEntropyLoss()
+    for _ in range(epochs):
+        perm = torch.randperm(len(x))
+        for i in range(0, len(x), 64):
+            idx = perm[i:i + 64]
+            opt.zero_grad()
+            loss_fn(model(x[idx]), y[idx]).backward()
+            opt.step()
+    model.eval()
+    return model
+
+
+def evaluate(clf: LandmarkClassifier, resnet, val_samples, thresholds):
+    mlp_preds, mlp_probs, mlp_ms, cnn_preds, cnn_ms, labels = [], [], [], [], [], []
+    with torch.inference_mode():
+        for points, crop, y, _ in val_samples:
+            t0 = time.perf_counter()
+            probs = clf.predict_proba(landmark_features(points))
+            mlp_ms.append((time.perf_counter() - t0) * 1000.0)
+
+            t0 = time.perf_counter()
+            logits = resnet(preprocess_from_cv2(crop))
+            cnn_ms.append((time.perf_counter() - t0) * 1000.0)
+
+            mlp_preds.append(int(probs.argmax()))
+            mlp_probs.append(float(probs.max()))
+            cnn_preds.append(int(logits.argmax(dim=1)))
+            labels.append(y)
+
+    n = len(labels)
+    mlp_ms_avg = sum(mlp_ms) / n
+    cnn_ms_avg = sum(cnn_ms) / n
+    report = {
+        "val_images": n,
+        "accuracy_mlp": sum(p == y for p, y in zip(mlp_preds, labels)) / n,
+        "accuracy_resnet": sum(p == y for p, y in zip(cnn_preds, labels)) / n,
+        "latency_mlp_ms": mlp_ms_avg,
+        "latency_resnet_ms": cnn_ms_avg,
+        "cascade": [],
+    }
+    for th in thresholds:
+        fast = [p >= th for p in mlp_probs]
+        preds = [m if f else c for m, c, f in zip(mlp_preds, cnn_preds, fast)]
+        rate = sum(fast) / n
+        report["cascade"].append({
+            "threshold": th,
+            "fast_path_rate": rate,
+            "accuracy": sum(p == y for p, y in zip(preds, labels)) / n,
+            # ResNet chỉ chạy cho frame không qua fast-path
+            "latency_ms": mlp_ms_avg + (1.0 - rate) * cnn_ms_avg,
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--hidden", type=int, nargs="+", default=[128, 64])
+    parser.add_argument("--val-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--split-by", choices=["session", "user"], default="session",
+        help="nhóm không được tách giữa train và val: phiên thu thập hoặc cả user",
+    )
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.7, 0.8, 0.9, 0.95, 0.99])
+    args = parser.parse_args()
+
+    samples = load_dataset()
+    if len(samples) < 10:
+        sys.exit("Không đủ ảnh mẫu có tay trong data/user_samples")
+
+    paths = [path for _, _, _, path in samples]
+    if args.split_by == "user":
+        groups = [path.parent.parent.name for path in paths]
+    else:
+        groups = capture_session_keys(paths)
+    val_samples, train_samples = split_by_group(
+        samples, groups, holdout_size=max(1, int(len(samples) * args.val_ratio)), seed=args.seed
+    )
+    if not val_samples:
+        sys.exit(f"Cần ảnh mẫu từ ít nhất 2 nhóm (--split-by {args.split_by}) để tách train / val")
+
+    hidden = tuple(args.hidden)
+    model = train(train_samples, hidden, args.epochs, args.lr, args.seed)
+    clf = LandmarkClassifier(model.state_dict(), CLASS_NAMES)
+    resnet = load_trained_model(MODEL_PATH, device="cpu")
+
+    report = evaluate(clf, resnet, val_samples, args.thresholds)
+    report["train_images"] = len(train_samples)
+    report["split_by"] = args.split_by
+    print(json.dumps(report, indent=2))
+
+    # ghi file tạm rồi replace để server không đọc checkpoint ghi dở
+    tmp_path = LANDMARK_MLP_PATH.with_name(LANDMARK_MLP_PATH.name + ".tmp")
+    save_classifier(model, tmp_path, CLASS_NAMES, hidden)
+    os.replace(tmp_path, LANDMARK_MLP_PATH)
+    LANDMARK_MLP_PATH.with_suffix(".json").write_text(json.dumps(report, indent=2))
+    print(f"✅ Đã lưu landmark MLP: {LANDMARK_MLP_PATH}")
+
+
+if __name__ == "__main__":
+    main()
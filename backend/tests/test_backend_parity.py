@@ -0,0 +1,43 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+torchvision = pytest.importorskip("torchvision")
+
+from app.ml.backends import EagerBackend, OnnxBackend, TorchScriptBackend, export_onnx, export_torchscript
+
+IMAGE_SIZE = 64
+ATOL = 1e-3
+
+
+@pytest.fixture(scope="module")
+def model():
+    torch.manual_seed(0)
+    # cùng kiến trúc với model thật (resnet18, 6 lớp), trọng số ngẫu nhiên → không cần checkpoint
+    return torchvision.models.resnet18(weights=None, num_classes=6).eval()
+
+
+@pytest.fixture(scope="module")
+def batch():
+    torch.manual_seed(1)
+    return torch.randn(4, 3, IMAGE_SIZE, IMAGE_SIZE)
+
+
+def assert_parity(out, ref):
+    assert out.shape == ref.shape
+    assert float((out - ref).abs().max()) <= ATOL
+    assert torch.equal(out.argmax(dim=1), ref.argmax(dim=1))
+
+
+def test_torchscript_matches_eager(model, batch, tmp_path):
+    ref = EagerBackend(model)(batch)
+    path = export_torchscript(model, tmp_path / "model.ts", image_size=IMAGE_SIZE)
+    assert_parity(TorchScriptBackend(path)(batch), ref)
+
+
+def test_onnx_matches_eager(model, batch, tmp_path):
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    ref = EagerBackend(model)(batch)
+    path = export_onnx(model, tmp_path / "model.onnx", image_size=IMAGE_SIZE)
+    # dynamic batch: export với batch 1, chạy batch 4
+    assert_parity(OnnxBackend(path)(batch), ref)
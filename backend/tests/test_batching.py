@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from app.ml.batching import MicroBatchScheduler
+
+
+def test_concurrent_submits_are_batched():
+    batches = []
+    gate = threading.Event()
+
+    def run_batch(items):
+        gate.wait(1.0)
+        batches.append(list(items))
+        return [x * 10 for x in items]
+
+    sched = MicroBatchScheduler(run_batch, max_batch_size=4, max_wait_ms=200)
+    try:
+        futs = [sched.submit(i) for i in range(4)]
+        gate.set()
+        assert [f.result(timeout=2) for f in futs] == [0, 10, 20, 30]
+        assert batches == [[0, 1, 2, 3]]
+        assert sched.batches_run == 1 and sched.items_run == 4
+    finally:
+        sched.close()
+
+
+def test_partial_batch_flushes_after_max_wait():
+    sched = MicroBatchScheduler(lambda items: items, max_batch_size=8, max_wait_ms=20)
+    try:
+        t0 = time.perf_counter()
+        assert sched.submit("a").result(timeout=2) == "a"
+        elapsed = time.perf_counter() - t0
+        # không chờ đủ 8 item: flush sau ~max_wait
+        assert 0.015 <= elapsed < 1.0
+        assert sched.avg_batch_size == 1.0
+    finally:
+        sched.close()
+
+
+def test_short_results_fail_every_future():
+    sched = MicroBatchScheduler(lambda items: items[:-1], max_batch_size=3, max_wait_ms=100)
+    try:
+        futs = [sched.submit(i) for i in range(3)]
+        for f in futs:
+            with pytest.raises(RuntimeError):
+                f.result(timeout=2)
+        assert sched.batches_run == 0
+    finally:
+        sched.close()
+
+
+def test_run_batch_error_propagates_to_callers():
+    def run_batch(items):
+        raise ValueError("boom")
+
+    sched = MicroBatchScheduler(run_batch, max_batch_size=2, max_wait_ms=5)
+    try:
+        with pytest.raises(ValueError):
+            sched.run(1)
+    finally:
+        sched.close()
+
+
+def test_submit_after_close_raises():
+    sched = MicroBatchScheduler(lambda items: items)
+    sched.close()
+    with pytest.raises(RuntimeError):
+        sched.submit(1)
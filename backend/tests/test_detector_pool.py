@@ -0,0 +1,147 @@
+import threading
+import time
+
+import pytest
+
+from app.ml.detector_pool import HandsDetectorPool
+
+
+class FakeHands:
+    """Thay mp.solutions.hands.Hands: đếm số thread gọi process() cùng lúc."""
+
+    def __init__(self):
+        self.closed = False
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def process(self, frame):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.002)
+        with self._lock:
+            self.active -= 1
+        return frame
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(size):
+    made = []
+
+    def factory():
+        det = FakeHands()
+        made.append(det)
+        return det
+
+    return HandsDetectorPool(factory, size), made
+
+
+def test_checkout_under_contention():
+    pool, made = make_pool(3)
+    in_use = 0
+    peak = 0
+    lock = threading.Lock()
+    errors = []
+
+    def worker():
+        nonlocal in_use, peak
+        try:
+            for _ in range(20):
+                with pool.checkout(timeout=5) as hands:
+                    with lock:
+                        in_use += 1
+                        peak = max(peak, in_use)
+                    hands.process(None)
+                    with lock:
+                        in_use -= 1
+        except BaseException as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert peak <= 3
+    assert len(made) == pool.created == 3
+    assert pool.idle_count() == 3
+    # không detector nào bị 2 thread dùng cùng lúc
+    assert all(det.max_active == 1 for det in made)
+
+
+def test_checkout_times_out_when_exhausted():
+    pool, _ = make_pool(1)
+    with pool.checkout():
+        with pytest.raises(TimeoutError):
+            with pool.checkout(timeout=0.05):
+                pass
+    assert pool.idle_count() == 1
+
+
+def test_factory_error_frees_slot():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("init failed")
+        return FakeHands()
+
+    pool = HandsDetectorPool(factory, 1)
+    with pytest.raises(RuntimeError):
+        with pool.checkout():
+            pass
+    assert pool.created == 0
+    with pool.checkout(timeout=1) as hands:
+        assert isinstance(hands, FakeHands)
+
+
+def test_resize_shrink_while_checked_out():
+    pool, made = make_pool(3)
+    pool.prefill()
+    idle_before = pool.idle_count()
+    cms = [pool.checkout(timeout=1) for _ in range(2)]
+    held = [cm.__enter__() for cm in cms]
+    assert idle_before == 3 and pool.idle_count() == 1
+
+    pool.resize(1)
+    # detector rảnh dư bị đóng ngay, detector đang mượn vẫn dùng được
+    assert pool.created == 2
+    assert sum(det.closed for det in made) == 1
+    assert not any(det.closed for det in held)
+
+    for cm in cms:
+        cm.__exit__(None, None, None)
+    assert pool.created == 1
+    assert pool.idle_count() == 1
+    assert sum(det.closed for det in made) == 2
+
+
+def test_resize_grow_allows_more_detectors():
+    pool, made = make_pool(1)
+    with pool.checkout():
+        pool.resize(2)
+        with pool.checkout(timeout=0.5):
+            assert pool.created == 2
+    assert len(made) == 2
+
+
+def test_prefill_creates_up_to_size_once():
+    pool, made = make_pool(4)
+    pool.prefill()
+    assert pool.created == 4 and pool.idle_count() == 4
+    pool.prefill()
+    assert len(made) == 4
+
+    with pool.checkout() as hands:
+        # LIFO: detector vừa tạo cuối cùng được dùng lại trước
+        assert hands is made[-1]
+
+    pool.close()
+    assert pool.created == 0
+    assert all(det.closed for det in made)
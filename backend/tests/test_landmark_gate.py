@@ -0,0 +1,57 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.ml.landmarks import LandmarkGate, landmark_delta, normalize_landmarks
+
+RESULT = ("2", 0.93, "resnet", "v1")
+
+
+@pytest.fixture
+def hand():
+    rng = np.random.default_rng(0)
+    return normalize_landmarks(rng.uniform(0.2, 0.8, size=(21, 3)).astype(np.float32))
+
+
+def test_normalize_is_translation_and_scale_invariant():
+    rng = np.random.default_rng(1)
+    points = rng.uniform(0.2, 0.6, size=(21, 3)).astype(np.float32)
+    moved = points * 1.5 + np.array([0.1, -0.05, 0.0], dtype=np.float32)
+    moved[:, 2] = points[:, 2] * 1.5
+    assert landmark_delta(normalize_landmarks(points), normalize_landmarks(moved)) < 1e-5
+
+
+def test_miss_without_stored_result(hand):
+    gate = LandmarkGate(threshold=0.05, max_age_seconds=1.0)
+    assert gate.lookup({}, hand, now=0.0) is None
+    assert gate.snapshot()["checks"] == 1 and gate.snapshot()["hits"] == 0
+
+
+def test_hit_when_hand_is_still(hand):
+    gate = LandmarkGate(threshold=0.05, max_age_seconds=1.0)
+    state = {}
+    gate.store(state, hand, RESULT, now=0.0, cnn_ms=12.0)
+    jitter = hand + np.float32(0.001)
+    assert gate.lookup(state, jitter, now=0.5) == RESULT
+    snap = gate.snapshot()
+    assert snap["hits"] == 1 and snap["saved_ms_total"] == 12.0
+
+
+def test_miss_when_movement_exceeds_threshold(hand):
+    gate = LandmarkGate(threshold=0.05, max_age_seconds=1.0)
+    state = {}
+    gate.store(state, hand, RESULT, now=0.0, cnn_ms=12.0)
+    moved = hand.copy()
+    moved[:, 0] += 0.051  # dịch đều theo x → delta đúng 0.051
+    assert landmark_delta(hand, moved) == pytest.approx(0.051, abs=1e-4)
+    assert gate.lookup(state, moved, now=0.1) is None
+    slightly = hand.copy()
+    slightly[:, 0] += 0.049
+    assert gate.lookup(state, slightly, now=0.1) == RESULT
+
+
+def test_miss_when_result_too_old(hand):
+    gate = LandmarkGate(threshold=0.05, max_age_seconds=1.0)
+    state = {}
+    gate.store(state, hand, RESULT, now=0.0, cnn_ms=12.0)
+    assert gate.lookup(state, hand, now=1.5) is None
@@ -0,0 +1,36 @@
+from app.core.metrics import Histogram, Registry
+
+
+def make_hist():
+    return Histogram("t_seconds", "test", ["stage"], buckets=(0.01, 0.1), registry=Registry())
+
+
+def test_delta_since_only_reports_new_observations():
+    worker = make_hist()
+    worker.labels("detect").observe(0.005)
+    before = worker.snapshot_all()
+
+    worker.labels("detect").observe(0.05)
+    worker.labels("forward").observe(0.5)
+    deltas = worker.delta_since(before)
+
+    assert set(deltas) == {("detect",), ("forward",)}
+    counts, total = deltas[("detect",)]
+    assert counts == [0, 1, 0] and abs(total - 0.05) < 1e-9
+    assert deltas[("forward",)][0] == [0, 0, 1]
+    assert worker.delta_since(worker.snapshot_all()) == {}
+
+
+def test_merge_deltas_into_parent_histogram():
+    worker, parent = make_hist(), make_hist()
+    before = worker.snapshot_all()
+    for v in (0.005, 0.02, 0.02):
+        worker.labels("preprocess").observe(v)
+    parent.labels("preprocess").observe(0.2)
+
+    parent.merge_deltas(worker.delta_since(before))
+    counts, total = parent.labels("preprocess").snapshot()
+    assert counts == [1, 2, 1]
+    assert abs(total - 0.245) < 1e-9
+    lines = list(parent.collect())
+    assert 't_seconds_count{stage="preprocess"} 4' in lines
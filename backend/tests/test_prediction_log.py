@@ -0,0 +1,142 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("fastapi")
+
+from app.core.prediction_log import PredictionLogSampler, PredictionLogWriter
+
+
+class FakeSession:
+    """Thay SessionLocal: ghi lại các batch INSERT thay vì chạm DB."""
+
+    def __init__(self, sink, fail=False):
+        self.sink = sink
+        self.fail = fail
+        self.rolled_back = False
+
+    def execute(self, stmt, rows):
+        if self.fail:
+            raise RuntimeError("db down")
+        self.sink.append([dict(r) for r in rows])
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        pass
+
+
+def make_writer(batches, **kw):
+    opts = dict(max_queue=100, batch_size=100, flush_interval=10.0)
+    opts.update(kw)
+    return PredictionLogWriter(session_factory=lambda: FakeSession(batches), **opts)
+
+
+def log_rows(writer, n, start=0):
+    for i in range(start, start + n):
+        writer.log(1, str(i), None, 0.9, True, "v1")
+
+
+def wait_for(cond, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            raise AssertionError("timeout")
+        time.sleep(0.005)
+
+
+def test_flushes_when_batch_is_full():
+    batches = []
+    writer = make_writer(batches, batch_size=3)
+    log_rows(writer, 3)
+    wait_for(lambda: batches)
+    assert [r["gesture_label"] for r in batches[0]] == ["0", "1", "2"]
+    assert writer.written == 3 and writer.flushes == 1
+    writer.close()
+
+
+def test_flushes_partial_batch_after_interval():
+    batches = []
+    writer = make_writer(batches, flush_interval=0.05)
+    log_rows(writer, 2)
+    wait_for(lambda: batches)
+    assert len(batches[0]) == 2
+    writer.close()
+
+
+def test_close_flushes_remaining_rows_and_rejects_new_ones():
+    batches = []
+    writer = make_writer(batches, batch_size=4)
+    log_rows(writer, 6)
+    writer.close()
+    assert sum(len(b) for b in batches) == 6
+    log_rows(writer, 1)
+    assert writer.dropped == 1
+
+
+@pytest.mark.parametrize("policy,kept", [("drop_new", ["0", "1"]), ("drop_oldest", ["1", "2"])])
+def test_drop_policy_when_queue_is_full(policy, kept):
+    batches = []
+    writer = make_writer(batches, max_queue=2, drop_policy=policy)
+    log_rows(writer, 3)
+    writer.close()
+    assert [r["gesture_label"] for b in batches for r in b] == kept
+    assert writer.dropped == 1
+
+
+def test_failed_batch_is_counted_and_rolled_back():
+    sessions = []
+
+    def factory():
+        sessions.append(FakeSession([], fail=True))
+        return sessions[-1]
+
+    writer = PredictionLogWriter(max_queue=10, batch_size=2, flush_interval=10.0, session_factory=factory)
+    log_rows(writer, 2)
+    writer.close()
+    assert writer.failed == 2 and writer.written == 0
+    assert sessions[0].rolled_back
+
+
+def test_flush_hook_runs_with_batch_rows():
+    batches, seen = [], []
+    writer = make_writer(batches, batch_size=2)
+    done = threading.Event()
+    writer.add_flush_hook(lambda db, rows: (seen.append(len(rows)), done.set()))
+    log_rows(writer, 2)
+    assert done.wait(2.0)
+    assert seen == [2]
+    writer.close()
+
+
+def test_invalid_drop_policy():
+    with pytest.raises(ValueError):
+        make_writer([], drop_policy="block")
+
+
+def test_sampler_logs_changes_and_repeats_after_interval():
+    sampler = PredictionLogSampler(repeat_interval=5.0)
+    assert sampler.should_log("s1", "2", now=0.0)
+    assert not sampler.should_log("s1", "2", now=1.0)
+    assert sampler.should_log("s1", "no_hand", now=1.5)
+    assert sampler.should_log("s1", "2", now=2.0)  # tay xuất hiện lại
+    assert sampler.should_log("s2", "2", now=2.0)  # stream khác độc lập
+    assert sampler.should_log("s1", "2", now=7.5)
+    assert sampler.snapshot()["skipped"] == 1
+
+
+def test_sampler_is_bounded_and_can_be_disabled():
+    sampler = PredictionLogSampler(repeat_interval=5.0, max_streams=2)
+    for key in ("a", "b", "c"):
+        sampler.should_log(key, "1", now=0.0)
+    assert sampler.snapshot()["streams"] == 2
+    assert sampler.should_log("a", "1", now=0.1)  # "a" đã bị đẩy ra
+
+    always = PredictionLogSampler(repeat_interval=0)
+    assert all(always.should_log("s", "1", now=0.0) for _ in range(3))
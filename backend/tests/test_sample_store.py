@@ -0,0 +1,39 @@
+from pathlib import Path
+
+from app.ml.sample_store import capture_session_keys, split_by_group
+
+
+def p(user, label, stamp):
+    return Path("data/user_samples") / user / label / f"{stamp}.jpg"
+
+
+def test_capture_sessions_split_on_time_gap_user_and_label():
+    paths = [
+        p("3", "0", "20240101_100000_000000"),
+        p("3", "0", "20240101_100001_500000"),  # cùng phiên (cách 1.5s)
+        p("3", "0", "20240101_101000_000000"),  # phiên mới (cách 10 phút)
+        p("3", "1", "20240101_100001_000000"),  # label khác
+        p("4", "0", "20240101_100000_500000"),  # user khác
+        p("4", "0", "not-a-timestamp"),
+    ]
+    keys = capture_session_keys(paths, gap_seconds=5.0)
+    assert keys[0] == keys[1]
+    assert len(set(keys)) == 5
+    assert keys[5] == str(paths[5])
+
+
+def test_split_by_group_keeps_groups_on_one_side():
+    items = list(range(20))
+    groups = [i // 4 for i in items]  # 5 nhóm, mỗi nhóm 4 phần tử
+    holdout, rest = split_by_group(items, groups, holdout_size=6, seed=1)
+    assert sorted(holdout + rest) == items
+    assert len(holdout) == 8  # 2 nhóm trọn vẹn
+    assert not {g for g in map(groups.__getitem__, holdout)} & {g for g in map(groups.__getitem__, rest)}
+    assert split_by_group(items, groups, holdout_size=6, seed=1) == (holdout, rest)
+
+
+def test_split_by_group_leaves_one_group_for_rest():
+    holdout, rest = split_by_group([1, 2, 3], ["a", "a", "b"], holdout_size=10)
+    assert holdout and rest
+    holdout, rest = split_by_group([1, 2], ["a", "a"], holdout_size=1)
+    assert holdout == [] and rest == [1, 2]
@@ -15,7 +15,7 @@ const GESTURE_TEXTS: Record<string, string> = {
 export async function POST(request: NextRequest) {
   try {
     const body = await request.json()
-    const { image } = body
+    const { image, stream_id } = body
 
     if (!image) {
       return NextResponse.json(
@@ -38,8 +38,8 @@ export async function POST(request: NextRequest) {
           // 🔑 FORWARD Authorization xuống backend
           ...(authHeader ? { Authorization: authHeader } : {}),
         },
-        // ⚠️ GesturePredictRequest có field "image"
-        body: JSON.stringify({ image }),
+        // ⚠️ GesturePredictRequest có field "image" (+ "stream_id" cho các frame liên tiếp của webcam)
+        body: JSON.stringify({ image, stream_id }),
       },
     )
 
@@ -36,8 +36,18 @@ interface Sample {
   created_at?: string | null
 }
 
+type SampleCountRow = { label: string | number; count: number }
+
+const SAMPLES_PAGE_SIZE = 100
+const DELETE_PAGE_SIZE = 500
+
+// tham số keyset để lấy trang mẫu (cùng label) cũ hơn `last`
+const cursorParams = (last: Sample) =>
+  `&label=${encodeURIComponent(last.label)}` +
+  `&before_created_at=${encodeURIComponent(last.created_at ?? "")}&before_id=${last.id}`
+
 export default function PrivacyPage() {
-  const { user, isAuthenticated } = useAuth()
+  const { user, token, isAuthenticated } = useAuth()
   const router = useRouter()
 
   // ✅ Hooks luôn nằm trước mọi return để tránh lỗi “Rendered more hooks than during the previous render”
@@ -49,6 +59,9 @@ export default function PrivacyPage() {
 
   const [samples, setSamples] = useState<Sample[]>([])
   const [isSamplesLoading, setIsSamplesLoading] = useState(false)
+  // label đang tải thêm mẫu (null = không)
+  const [loadingMoreLabel, setLoadingMoreLabel] = useState<string | null>(null)
+  const [sampleCounts, setSampleCounts] = useState<Record<string, number>>({})
   const [samplesError, setSamplesError] = useState<string | null>(null)
   const [viewingImage, setViewingImage] = useState<string | null>(null)
 
@@ -72,26 +85,75 @@ export default function PrivacyPage() {
     if (!isAuthenticated) router.push("/login")
   }, [isAuthenticated, router])
 
+  const fetchSamplePage = useCallback(
+    async (cursor: string) => {
+      const res = await fetch(
+        `${API_BASE_URL}/collect/my-samples?user_id=${user?.id}&limit=${SAMPLES_PAGE_SIZE}${cursor}`,
+      )
+      if (!res.ok) {
+        const text = await res.text()
+        throw new Error(text || "Không thể tải danh sách mẫu.")
+      }
+      return (await res.json()) as Sample[]
+    },
+    [user?.id],
+  )
+
+  // tổng số mẫu theo cử chỉ lấy từ server, không phụ thuộc số trang đã tải
+  const fetchSampleCounts = useCallback(async () => {
+    if (!token) return
+    const res = await fetch(`${API_BASE_URL}/collect/my-sample-counts`, {
+      headers: { Authorization: `Bearer ${token}` },
+    })
+    if (!res.ok) throw new Error(await res.text())
+    const rows = (await res.json()) as SampleCountRow[]
+    const counts: Record<string, number> = {}
+    for (const r of rows) counts[String(r.label)] = r.count
+    setSampleCounts(counts)
+  }, [token])
+
+  // tải lại từ trang đầu (dùng khi mở trang, bấm "Tải lại" hoặc sau khi xoá)
   const fetchSamples = useCallback(async () => {
     if (!user?.id) return
     setIsSamplesLoading(true)
     setSamplesError(null)
 
     try {
-      const res = await fetch(`${API_BASE_URL}/collect/my-samples?user_id=${user.id}`)
-      if (!res.ok) {
-        const text = await res.text()
-        throw new Error(text || "Không thể tải danh sách mẫu.")
-      }
-      const data: Sample[] = await res.json()
-      setSamples(data)
+      const [page] = await Promise.all([fetchSamplePage(""), fetchSampleCounts()])
+      setSamples(page)
     } catch (e) {
       console.error(e)
       setSamplesError("Không thể tải danh sách mẫu.")
     } finally {
       setIsSamplesLoading(false)
     }
-  }, [user?.id])
+  }, [user?.id, fetchSamplePage, fetchSampleCounts])
+
+  // trang đầu là các mẫu mới nhất của mọi label → mẫu đã tải của 1 label luôn là phần mới nhất
+  // của label đó; "Tải thêm" trong dialog lấy tiếp các mẫu cũ hơn của đúng label đang xem
+  const loadMoreSamples = useCallback(
+    async (label: string) => {
+      const ofLabel = samples.filter((s) => String(s.label) === label)
+      const last = ofLabel[ofLabel.length - 1]
+      if (!user?.id || !last?.created_at) return
+      setLoadingMoreLabel(label)
+      setSamplesError(null)
+
+      try {
+        const page = await fetchSamplePage(cursorParams(last))
+        setSamples((prev) => {
+          const seen = new Set(prev.map((s) => s.id))
+          return [...prev, ...page.filter((s) => !seen.has(s.id))]
+        })
+      } catch (e) {
+        console.error(e)
+        setSamplesError("Không thể tải thêm mẫu.")
+      } finally {
+        setLoadingMoreLabel(null)
+      }
+    },
+    [user?.id, samples, fetchSamplePage],
+  )
 
   useEffect(() => {
     fetchSamples()
@@ -137,26 +199,31 @@ export default function PrivacyPage() {
   const confirmDeleteAllForGesture = useCallback(async () => {
     if (!user?.id || !labelToDelete) return
 
-    const list = samplesByLabel[labelToDelete] ?? []
-    if (list.length === 0) {
-      setLabelToDelete(null)
-      return
-    }
-
     setIsDeleting(true)
     setSamplesError(null)
     setSuccessMessage(null)
     try {
-      const results = await Promise.all(
-        list.map((s) =>
-          fetch(`${API_BASE_URL}/collect/sample-file/${user.id}/${labelToDelete}/${s.filename}`, {
-            method: "DELETE",
-          })
+      // xoá cả những mẫu chưa tải về: lấy lần lượt từng trang của label, xoá xong lấy lại trang đầu
+      while (true) {
+        const res = await fetch(
+          `${API_BASE_URL}/collect/my-samples?user_id=${user.id}&label=${encodeURIComponent(labelToDelete)}&limit=${DELETE_PAGE_SIZE}`,
+        )
+        if (!res.ok) throw new Error(await res.text())
+        const list: Sample[] = await res.json()
+        if (list.length === 0) break
+
+        const results = await Promise.all(
+          list.map((s) =>
+            fetch(`${API_BASE_URL}/collect/sample-file/${user.id}/${labelToDelete}/${s.filename}`, {
+              method: "DELETE",
+            })
+          )
         )
-      )
 
-      // nếu có request nào fail
-      if (results.some((r) => !r.ok)) throw new Error("Delete failed")
+        // nếu có request nào fail
+        if (results.some((r) => !r.ok)) throw new Error("Delete failed")
+        if (list.length < DELETE_PAGE_SIZE) break
+      }
 
       await fetchSamples()
       showSuccess(`Đã xoá tất cả mẫu của cử chỉ ${labelToDelete}!`)
@@ -167,7 +234,7 @@ export default function PrivacyPage() {
     } finally {
       setIsDeleting(false)
     }
-  }, [user?.id, labelToDelete, samplesByLabel, fetchSamples])
+  }, [user?.id, labelToDelete, fetchSamples])
 
 
 
@@ -315,6 +382,7 @@ export default function PrivacyPage() {
                   <div className="grid gap-3">
                     {gestureClasses.map((gesture) => {
                       const list = samplesByLabel[gesture.id] ?? []
+                      const total = sampleCounts[gesture.id] ?? list.length
                       return (
                         <Dialog key={gesture.id}>
                           <DialogTrigger asChild>
@@ -332,7 +400,7 @@ export default function PrivacyPage() {
                                 </div>
                               </div>
                               <div className="flex items-center gap-2">
-                                <Badge variant="secondary">{list.length} mẫu</Badge>
+                                <Badge variant="secondary">{total} mẫu</Badge>
                                 <ChevronRight className="w-4 h-4 text-muted-foreground" />
                               </div>
                             </Button>
@@ -342,9 +410,9 @@ export default function PrivacyPage() {
                             <DialogHeader>
                               <DialogTitle className="flex justify-between items-center pr-8">
                                 <span>
-                                  Mẫu cử chỉ: {gesture.name} ({list.length})
+                                  Mẫu cử chỉ: {gesture.name} ({total})
                                 </span>
-                                {list.length > 0 && (
+                                {total > 0 && (
                                   <Button variant="destructive" size="sm" onClick={() => setLabelToDelete(gesture.id)}>
                                     Xóa tất cả
                                   </Button>
@@ -352,7 +420,7 @@ export default function PrivacyPage() {
                               </DialogTitle>
                             </DialogHeader>
 
-                            {list.length === 0 ? (
+                            {total === 0 ? (
                               <div className="text-center py-12 text-muted-foreground">
                                 Chưa có mẫu nào được thu thập cho cử chỉ này.
                               </div>
@@ -389,6 +457,18 @@ export default function PrivacyPage() {
                                 })}
                               </div>
                             )}
+
+                            {list.length > 0 && list.length < total && (
+                              <div className="flex justify-center pb-2">
+                                <Button
+                                  variant="outline"
+                                  onClick={() => loadMoreSamples(gesture.id)}
+                                  disabled={loadingMoreLabel !== null}
+                                >
+                                  {loadingMoreLabel === gesture.id ? "Đang tải..." : `Tải thêm (${list.length}/${total})`}
+                                </Button>
+                              </div>
+                            )}
                           </DialogContent>
                         </Dialog>
                       )
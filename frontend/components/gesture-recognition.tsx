@@ -45,7 +45,7 @@ type UploadPredictResult = {
   has_hand: boolean
 }
 
-type SampleRow = { label: string | number }
+type SampleCountRow = { label: string | number; count: number }
 
 export default function GestureRecognition({ onGestureDetected }: GestureRecognitionProps) {
   // const { token, isAuthenticated } = useAuth()
@@ -56,6 +56,8 @@ export default function GestureRecognition({ onGestureDetected }: GestureRecogni
 
   const videoRef = useRef<HTMLVideoElement>(null)
   const canvasRef = useRef<HTMLCanvasElement>(null)
+  // định danh luồng webcam: backend giữ tracking + landmark gate theo (user, stream_id)
+  const streamIdRef = useRef(`webcam-${Math.random().toString(36).slice(2)}`)
   const [isLoading, setIsLoading] = useState(false)
   const [currentResult, setCurrentResult] = useState<{
     gesture: string
@@ -243,17 +245,17 @@ export default function GestureRecognition({ onGestureDetected }: GestureRecogni
     if (!isAuthenticated || !token || !user?.id) return
 
     try {
-      const res = await fetch(`${API_BASE_URL}/collect/my-samples?user_id=${user.id}`, {
+      // server đếm sẵn theo label (GROUP BY), không cần tải cả danh sách mẫu
+      const res = await fetch(`${API_BASE_URL}/collect/my-sample-counts`, {
         headers: { Authorization: `Bearer ${token}` },
       })
       if (!res.ok) return
 
-      const rows = (await res.json()) as SampleRow[]
+      const rows = (await res.json()) as SampleCountRow[]
       const map: Record<string, number> = {}
 
       for (const r of rows) {
-        const k = String(r.label)
-        map[k] = (map[k] || 0) + 1
+        map[String(r.label)] = r.count
       }
 
       setCollectedSamples(map)
@@ -294,7 +296,7 @@ export default function GestureRecognition({ onGestureDetected }: GestureRecogni
       const response = await fetch("/api/gesture/predict-base64", {
         method: "POST",
         headers: { "Content-Type": "application/json", Authorization: `Bearer ${token}` },
-        body: JSON.stringify({ image: base64Image }),
+        body: JSON.stringify({ image: base64Image, stream_id: streamIdRef.current }),
       })
 
       if (!response.ok) {